@@ -0,0 +1,17 @@
+"""
+Micro-benchmarks for the bot's per-message and per-command hot paths.
+
+    python -m benchmarks [--scale small|medium|large] [--only keywords ...]
+                         [--output results.json] [--baseline old.json]
+
+Each suite module (keywords.py, copypasta.py, config_io.py,
+messages.py) times the real modules on synthetic data (synthetic.py),
+with config.py's storage swapped for an in-memory backend. harness.py
+does the timing and the baseline comparison; the run fails if a case's
+median got slower than --threshold.
+
+Also here, each run on its own: replay.py (a message stream through
+on_message()), loadtest.py (the whole bot against a fake Discord),
+slow_storage.py (a pass/fail event-loop check), copypasta_render.py
+and menu_search.py.
+"""
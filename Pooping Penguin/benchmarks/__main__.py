@@ -0,0 +1,98 @@
+"""
+Command line for the benchmark suite, see benchmarks/__init__.py.
+
+Usage (from the bot directory):
+
+  python -m benchmarks                          # every suite, small scale
+  python -m benchmarks --scale large --only keywords copypasta
+  python -m benchmarks --output base.json       # save a baseline
+  python -m benchmarks --baseline base.json     # compare against it
+"""
+import argparse
+import sys
+import time
+
+from benchmarks import config_io, copypasta, keywords, messages
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD, compare, format_rate, format_seconds, measure, metadata, read_results, write_results)
+from benchmarks.synthetic import SCALES
+
+SUITES = {
+    "keywords": keywords,
+    "copypasta": copypasta,
+    "config": config_io,
+    "messages": messages,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Micro-benchmarks for the bot's hot paths.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="preset data sizes (default: small)")
+    parser.add_argument("--keyword-sets", type=int, help="override the scale's number of keyword sets")
+    parser.add_argument("--templates", type=int, help="override the scale's templates in the big copypasta type")
+    parser.add_argument("--guilds", type=int, help="override the scale's servers in vote_settings / channels")
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="run just these suites")
+    parser.add_argument("--rounds", type=int, default=30, help="timed samples per case (default: 30)")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed calls before sampling (default: 10)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction a median may slow down before it counts as a regression (default: 0.2)")
+    parser.add_argument("--list", action="store_true", help="list the suites and scales, run nothing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for name, module in SUITES.items():
+            print(f"{name:<10} {' '.join(module.__doc__.strip().split(chr(10) * 2)[0].split())}")
+        for scale, sizes in SCALES.items():
+            print(f"--scale {scale:<7} {sizes}")
+        return 0
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        override = getattr(args, key)
+        if override is not None:
+            params[key] = override
+
+    results = {}
+    print(f"scale {args.scale}: {params}, {args.rounds} rounds, {args.warmup} warmup")
+    for name in args.only or SUITES:
+        start = time.perf_counter()
+        cases = SUITES[name].cases(params)
+        print(f"\n{name} (setup {time.perf_counter() - start:.2f} s)")
+        print(f"  {'case':<24} {'p50':>10} {'p90':>10} {'p99':>10} {'ops/s':>12}")
+        for case in cases:
+            result = measure(case, args.warmup, args.rounds)
+            results[f"{name}.{case.name}"] = result
+            print(f"  {case.name:<24} {format_seconds(result['p50']):>10} {format_seconds(result['p90']):>10} "
+                  f"{format_seconds(result['p99']):>10} {format_rate(result['ops_per_sec']):>12}")
+
+    meta = metadata(args.scale, params)
+    if args.output:
+        write_results(args.output, meta, results)
+        print(f"\nresults written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    baseline = read_results(args.baseline)
+    if baseline.get("meta", {}).get("params") != params:
+        print(f"\nwarning: the baseline was run with {baseline.get('meta', {}).get('params')}, not {params}")
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nagainst {args.baseline} (regression: p50 more than {args.threshold:.0%} slower)")
+    print(f"  {'case':<34} {'baseline':>10} {'now':>10} {'change':>8}")
+    for case, before, now, ratio, regressed in rows:
+        print(f"  {case:<34} {format_seconds(before):>10} {format_seconds(now):>10} "
+              f"{ratio - 1:>+8.0%}{'  REGRESSION' if regressed else ''}")
+    regressions = sum(1 for row in rows if row[4])
+    if regressions:
+        print(f"\n{regressions} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+config.py's document cache, on a vote_settings document for --guilds
+servers.
+
+  load.cached    _load() answered from memory - every language lookup,
+                 every route build
+  load.reload    _load() after the document changed in storage: read,
+                 JSON parse and schema check of the whole thing
+  save           _save() inside a running event loop, as in the bot:
+                 update the cache and mark it dirty, no I/O
+  flush          flush(): serializing and writing the document, which
+                 the bot does once per FLUSH_DELAY on the I/O thread
+
+Storage is synthetic.MemoryBackend, so "write" and "read" are the JSON
+encode/decode without a disk under them.
+"""
+from benchmarks.harness import Case
+from benchmarks.synthetic import settings, use_memory_storage
+
+
+def cases(params: dict) -> list:
+    import config
+
+    path = config.SETTINGS_FILE
+    backend = use_memory_storage({path: settings(params["guilds"])})
+    document = config.load_settings()
+
+    def load_cached():
+        # Keep the cache entry inside RELOAD_CHECK_INTERVAL, so this is
+        # never the once-a-second signature check.
+        config._cache[path][2] = float("inf")
+        return config._load(path, config.DEFAULT_SETTINGS)
+
+    def load_reload():
+        backend.touch(path)
+        config._cache[path][2] = float("-inf")
+        return config._load(path, config.DEFAULT_SETTINGS)
+
+    async def save():
+        # asyncio.run() cancels the delayed flush this leaves scheduled
+        # once the case is done, so nothing is written while it's timed.
+        config._save(path, document)
+
+    def flush():
+        config._dirty[path] = document
+        config.flush()
+
+    return [
+        Case("load.cached", load_cached),
+        Case("load.reload", load_reload, max_rounds=10),
+        Case("save", save),
+        Case("flush", flush, max_rounds=10),
+    ]
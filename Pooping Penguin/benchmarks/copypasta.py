@@ -0,0 +1,49 @@
+"""
+CopypastaManager - the !copypasta commands and the /copypasta info menu.
+
+  pick              a random template of the big type, filled by name
+                    (the Random button's path), game terms included
+  render            a specific template by index (the template select)
+  resolve_game_key  a game alias lookup straight over game_terms, hit
+                    and miss - what pick()/render() do through their
+                    cached index instead
+  type_ids.search   the list menu's Search, through the TextIndex
+
+The big type has --templates templates (synthetic.TEMPLATE_SHAPES),
+plus 200 small types to search through. Templates are compiled before
+timing starts, as they would be after the first use in the bot.
+"""
+import random
+
+from benchmarks.harness import Case, cycling
+from benchmarks.synthetic import (
+    GAME_TERMS, NAMED_VALUES, TEMPLATE_SHAPES, copypasta_types, use_memory_storage)
+
+
+def cases(params: dict) -> list:
+    import config
+    from copypasta_manager import CopypastaManager, resolve_game_key
+
+    use_memory_storage({config.COPYPASTA_FILE: copypasta_types(params["templates"])})
+    manager = CopypastaManager()
+    templates = params["templates"]
+    rng = random.Random(3)
+
+    by_index = [rng.randrange(templates) for _ in range(256)]
+    for index in range(templates):
+        manager.render("bench", index, TEMPLATE_SHAPES[index % len(TEMPLATE_SHAPES)][1])
+
+    def render(index):
+        return manager.render("bench", index, TEMPLATE_SHAPES[index % len(TEMPLATE_SHAPES)][1])
+
+    queries = ["原神", "type_1", "zzzq", "好帥", "{text}", "type_19"]
+    manager.type_ids("warm up")
+
+    return [
+        Case("pick", lambda: manager.pick("bench", NAMED_VALUES)),
+        Case("render", cycling(render, by_index)),
+        Case("resolve_game_key.hit", cycling(lambda raw: resolve_game_key(GAME_TERMS, raw),
+                                             ["chunithm", "MAI", "舞萌", "SDVX"])),
+        Case("resolve_game_key.miss", lambda: resolve_game_key(GAME_TERMS, "osu")),
+        Case("type_ids.search", cycling(manager.type_ids, queries)),
+    ]
@@ -0,0 +1,133 @@
+"""
+Benchmark: copypasta rendering, before vs after compiled templates.
+
+Builds a synthetic copypasta type with a few thousand templates in
+memory (nothing under data/ is touched), checks that the old regex
+substitution and the compiled templates render every one identically,
+then times random renders each way.
+
+Usage (from the bot directory):
+
+  python benchmarks/copypasta_render.py [--templates 5000] [--renders 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copypasta_manager import (  # noqa: E402
+    TERM_RE, build_game_index, compile_template, extract_placeholders, resolve_game_key)
+
+GAME_TERMS = {
+    "chunithm": {"display": "CHUNITHM", "aliases": ["chuni", "中二"], "top_tier": "虹", "full_combo": "AJ"},
+    "maimaidx": {"display": "maimai DX", "aliases": ["mai", "舞萌"], "top_tier": "彩", "full_combo": "AP+"},
+    "sdvx": {"display": "SDVX", "aliases": ["ボルテ"], "top_tier": "暴龍天", "full_combo": "PUC"},
+}
+WORDS = ["今天", "我", "又", "打了", "一整天", "的", "hello", "world", "真的", "很強", "lol", "GG"]
+POOL = ["text", "name", "act", "game", "character"]
+
+
+def legacy_render(game_terms, template, values):
+    """The pre-compilation rendering path, kept verbatim for comparison."""
+    placeholders = extract_placeholders(template) or ["text"]
+    values = list(values)
+    if game_terms and "game" in placeholders:
+        game_index = placeholders.index("game")
+        game_key = resolve_game_key(game_terms, values[game_index])
+        terms = game_terms[game_key]
+
+        def resolve_term(match):
+            key = match.group(1)
+            return str(terms[key]) if key in terms else match.group(0)
+
+        template = TERM_RE.sub(resolve_term, template)
+        if terms.get("display"):
+            values[game_index] = terms["display"]
+    rendered = template
+    for name, value in zip(placeholders, values):
+        rendered = rendered.replace(f"{{{name}}}", value)
+    return rendered
+
+
+def compiled_render(game_terms, game_index, compiled, values):
+    """What CopypastaManager._substitute() does with a compiled template."""
+    if not (game_terms and "game" in compiled.placeholders):
+        return compiled.render(values)
+    values = list(values)
+    i = compiled.placeholders.index("game")
+    game_key = game_index[values[i].strip().lower()]
+    terms = game_terms[game_key]
+    if terms.get("display"):
+        values[i] = terms["display"]
+    variant = compiled.variants.get(game_key)
+    if variant is None:
+        variant = compiled.variants[game_key] = compiled.with_terms(terms)
+    return variant.render(values)
+
+
+def make_template(rng):
+    names = rng.sample(POOL, rng.randint(1, 3))
+    pieces = []
+    for _ in range(rng.randint(8, 30)):
+        roll = rng.random()
+        if roll < 0.15:
+            pieces.append("{" + rng.choice(names) + "}")
+        elif roll < 0.2 and "game" in names:
+            pieces.append("{{" + rng.choice(["top_tier", "full_combo"]) + "}}")
+        else:
+            pieces.append(rng.choice(WORDS))
+    if not any("{" + n + "}" in pieces for n in names):
+        pieces.append("{" + names[0] + "}")
+    return "".join(pieces)
+
+
+def make_values(rng, placeholders):
+    return [rng.choice(["chuni", "mai", "SDVX"]) if name == "game" else rng.choice(WORDS)
+            for name in placeholders]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--templates", type=int, default=5000)
+    parser.add_argument("--renders", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    templates = [make_template(rng) for _ in range(args.templates)]
+
+    start = time.perf_counter()
+    compiled = [compile_template(t) for t in templates]
+    game_index = build_game_index(GAME_TERMS)
+    compile_seconds = time.perf_counter() - start
+
+    jobs = []
+    for _ in range(args.renders):
+        i = rng.randrange(len(templates))
+        jobs.append((i, make_values(rng, compiled[i].placeholders)))
+
+    for i, values in jobs[:len(templates)]:
+        assert legacy_render(GAME_TERMS, templates[i], values) == compiled_render(GAME_TERMS, game_index, compiled[i], values)
+
+    start = time.perf_counter()
+    for i, values in jobs:
+        legacy_render(GAME_TERMS, templates[i], values)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, values in jobs:
+        compiled_render(GAME_TERMS, game_index, compiled[i], values)
+    compiled_seconds = time.perf_counter() - start
+
+    print(f"{args.templates} templates, {args.renders} random renders")
+    print(f"  compile (one-off): {compile_seconds * 1000:8.1f} ms")
+    print(f"  legacy:            {args.renders / legacy_seconds:10.0f} renders/s")
+    print(f"  compiled:          {args.renders / compiled_seconds:10.0f} renders/s "
+          f"({legacy_seconds / compiled_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,598 @@
+"""
+A local stand-in for Discord's gateway and REST API, for load-testing
+the real bot on one machine with no network - see loadtest.py, which
+drives it.
+
+One aiohttp server serves the REST endpoints the cogs use under
+/api/v10 (anything else is a 404, counted as "unhandled") and the
+gateway at /gateway, for a generated world of `guilds` servers.
+send_message(), add_reaction() and interact() push events at the bot;
+its API calls are matched back to them as latency samples. REST rate
+limits are modelled per bucket, with a global cap, as Discord does
+(see RATE_LIMITS).
+"""
+import asyncio
+import json
+import random
+import time
+import zlib
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from urllib.parse import unquote
+
+from aiohttp import WSMsgType, web
+
+API_PREFIX = "/api/v10"
+DISCORD_EPOCH = 1420070400000
+BOT_ID = 10**16
+OWNER_ID = 10**16 + 1
+APPLICATION_ID = BOT_ID
+ADMINISTRATOR = str(1 << 3)
+EVERYONE_PERMISSIONS = str((1 << 6) | (1 << 10) | (1 << 11) | (1 << 16))  # react, view, send, history
+HEARTBEAT_INTERVAL_MS = 41250
+
+# (method, route template) -> (requests, per seconds), one window per
+# major parameter - roughly what Discord hands a bot for each.
+RATE_LIMITS = {
+    ("POST", "/channels/{channel_id}/messages"): (5, 5.0),
+    ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"): (1, 0.25),
+    ("PATCH", "/guilds/{guild_id}/members/{user_id}"): (10, 10.0),
+}
+GLOBAL_RATE_LIMIT = (50, 1.0)
+
+
+def snowflakes():
+    """An endless supply of increasing snowflake ids."""
+    increment = 0
+    while True:
+        ms = int(time.time() * 1000)
+        increment = (increment + 1) & 0xFFF
+        yield ((ms - DISCORD_EPOCH) << 22) | increment
+
+
+def json_response(data, status: int = 200, headers: dict = None) -> web.Response:
+    # discord.py only parses a body as JSON when Content-Type is exactly
+    # application/json, without the charset aiohttp's own helper adds.
+    headers = dict(headers or {}, **{"Content-Type": "application/json"})
+    return web.Response(body=json.dumps(data).encode("utf-8"), status=status, headers=headers)
+
+
+def timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Window:
+    """One rate-limit bucket: `limit` requests per `per` seconds."""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.started = 0.0
+        self.count = 0
+
+    def hit(self, now: float):
+        """(allowed, remaining, seconds until the window resets)."""
+        if now - self.started >= self.per:
+            self.started = now
+            self.count = 0
+        reset_after = self.per - (now - self.started)
+        if self.count >= self.limit:
+            return False, 0, reset_after
+        self.count += 1
+        return True, self.limit - self.count, reset_after
+
+
+class Stats:
+    """Everything the report is built from."""
+
+    def __init__(self):
+        self.requests = Counter()         # "METHOD /route/template" -> count
+        self.statuses = Counter()         # HTTP status -> count
+        self.unhandled = Counter()        # "METHOD /path" -> count
+        self.rate_limited = Counter()     # bucket -> 429s sent
+        self.global_limited = 0
+        self.retry_waits = []             # (waited, retry_after) per 429 that was retried
+        self.latency = defaultdict(list)  # kind -> [seconds, ...]
+        self.events = Counter()           # gateway dispatches sent, by type
+        self.gateway = Counter()          # opcodes received, by name
+        self.unexpected = Counter()       # bot API calls nothing was waiting for
+        self.milestones = {}              # name -> perf_counter() time
+
+
+class FakeDiscord:
+    def __init__(self, guilds: int = 100, members: int = 10, channels: int = 2, seed: int = 1,
+                 rate_limits: bool = True, global_rate_limit=GLOBAL_RATE_LIMIT):
+        rng = random.Random(seed)
+        self.stats = Stats()
+        self.rate_limits = rate_limits
+        self._ids = snowflakes()
+        self._buckets = {}
+        self._global = Window(*global_rate_limit) if rate_limits and global_rate_limit else None
+        self._limited_at = {}             # bucket -> (time of last 429, retry_after)
+
+        self.bot_user = self._user(BOT_ID, "Pooping Penguin", bot=True)
+        pool = [self._user(3 * 10**17 + i, f"user{i}") for i in range(max(members * 4, 200))]
+        self.users = {u["id"]: u for u in pool}
+        self.users[self.bot_user["id"]] = self.bot_user
+        self.guilds = {}
+        for i in range(guilds):
+            guild_id = 10**17 + i
+            member_ids = [int(u["id"]) for u in rng.sample(pool, members)]
+            self.guilds[guild_id] = {
+                "id": guild_id,
+                "channels": [2 * 10**17 + i * channels + k for k in range(channels)],
+                "members": member_ids,
+                "bot_role": 5 * 10**17 + i,
+            }
+        self.channel_guild = {c: g["id"] for g in self.guilds.values() for c in g["channels"]}
+        self.commands = {}                # name -> synced command payload
+        self.messages = {}                # message id -> payload (bot-sent ones)
+        self.originals = {}               # interaction token -> original response payload
+
+        # Latency matching, see the module docstring.
+        self._expected_sends = defaultdict(deque)  # channel -> deque of (kind, sent_at)
+        self._expected_reacts = {}                 # message id -> (kind, sent_at)
+        self._expected_callbacks = {}              # interaction id -> (kind, sent_at)
+        self._expected_timeouts = {}               # (guild, user) -> (kind, sent_at)
+        self.bot_reaction_listeners = []           # callables(channel_id, message_id, emoji)
+
+        self.ready = asyncio.Event()      # first presence update after READY, i.e. on_ready ran
+        self.synced = asyncio.Event()
+        self._ws = None
+        self._compress = None
+        self._send_lock = asyncio.Lock()
+        self._seq = 0
+        self.app = self._build_app()
+
+    # -- payloads -----------------------------------------------------------
+    @staticmethod
+    def _user(user_id: int, name: str, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": name, "global_name": None, "discriminator": "0",
+                "avatar": None, "bot": bot, "public_flags": 0}
+
+    def member(self, guild_id: int, user_id: int) -> dict:
+        guild = self.guilds[guild_id]
+        roles = [str(guild["bot_role"])] if user_id == BOT_ID else []
+        return {"user": self.users[str(user_id)], "roles": roles, "joined_at": timestamp(), "nick": None,
+                "avatar": None, "deaf": False, "mute": False, "flags": 0, "pending": False,
+                "communication_disabled_until": None}
+
+    def _guild_create(self, guild: dict) -> dict:
+        guild_id = guild["id"]
+        members = [self.member(guild_id, BOT_ID)] + [self.member(guild_id, u) for u in guild["members"]]
+        return {
+            "id": str(guild_id), "name": f"guild {guild_id - 10**17}", "icon": None, "owner_id": str(OWNER_ID),
+            "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+            "explicit_content_filter": 0, "mfa_level": 0, "nsfw_level": 0, "premium_tier": 0,
+            "preferred_locale": "en-US", "features": [], "emojis": [], "stickers": [],
+            "roles": [
+                {"id": str(guild_id), "name": "@everyone", "permissions": EVERYONE_PERMISSIONS, "position": 0,
+                 "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0},
+                {"id": str(guild["bot_role"]), "name": "penguin", "permissions": ADMINISTRATOR, "position": 1,
+                 "color": 0, "hoist": False, "managed": True, "mentionable": False, "flags": 0},
+            ],
+            "channels": [
+                {"id": str(c), "type": 0, "name": f"channel-{k}", "position": k, "parent_id": None,
+                 "permission_overwrites": [], "nsfw": False, "topic": None, "rate_limit_per_user": 0}
+                for k, c in enumerate(guild["channels"])
+            ],
+            "members": members, "member_count": len(members), "large": False, "unavailable": False,
+            "threads": [], "voice_states": [], "presences": [], "stage_instances": [],
+            "guild_scheduled_events": [], "soundboard_sounds": [], "joined_at": timestamp(),
+        }
+
+    def message(self, channel_id: int, author_id: int, content: str, *, message_id: int = None,
+                mentions=(), embeds=(), components=()) -> dict:
+        guild_id = self.channel_guild.get(channel_id)
+        data = {
+            "id": str(message_id or next(self._ids)), "channel_id": str(channel_id), "type": 0,
+            "author": self.users[str(author_id)], "content": content, "timestamp": timestamp(),
+            "edited_timestamp": None, "tts": False, "mention_everyone": False,
+            "mentions": [self.users[str(u)] for u in mentions], "mention_roles": [], "attachments": [],
+            "embeds": list(embeds), "components": list(components), "pinned": False, "flags": 0,
+        }
+        if guild_id is not None:
+            data["guild_id"] = str(guild_id)
+            data["member"] = self._partial_member(guild_id, author_id)
+            data["mentions"] = [dict(u, member=self._partial_member(guild_id, int(u["id"])))
+                                for u in data["mentions"]]
+        return data
+
+    def _partial_member(self, guild_id: int, user_id: int) -> dict:
+        member = self.member(guild_id, user_id)
+        del member["user"]
+        return member
+
+    # -- scenario side ------------------------------------------------------
+    def expect_send(self, channel_id: int, kind: str, sent_at: float):
+        self._expected_sends[channel_id].append((kind, sent_at))
+
+    def expect_timeout(self, guild_id: int, user_id: int, kind: str, sent_at: float):
+        self._expected_timeouts[(guild_id, user_id)] = (kind, sent_at)
+
+    def add_user(self, user_id: int, name: str, bot: bool = False) -> dict:
+        """A user who isn't in any guild's member list (another bot,
+        say) but can still author messages."""
+        user = self.users[str(user_id)] = self._user(user_id, name, bot=bot)
+        return user
+
+    async def send_message(self, channel_id: int, author_id: int, content: str, *, mentions=(),
+                           expect=(), react: str = None) -> dict:
+        """Dispatch a MESSAGE_CREATE. `expect` names the latency kinds of
+        the bot messages it should cause, in order, `react` that of a
+        reaction on it."""
+        data = self.message(channel_id, author_id, content, mentions=mentions)
+        sent_at = await self.dispatch("MESSAGE_CREATE", data)
+        for kind in expect:
+            self.expect_send(channel_id, kind, sent_at)
+        if react:
+            self._expected_reacts[int(data["id"])] = (react, sent_at)
+        return data
+
+    async def add_reaction(self, channel_id: int, message_id: int, user_id: int, emoji: str) -> float:
+        guild_id = self.channel_guild[channel_id]
+        return await self.dispatch("MESSAGE_REACTION_ADD", {
+            "user_id": str(user_id), "channel_id": str(channel_id), "message_id": str(message_id),
+            "guild_id": str(guild_id), "member": self.member(guild_id, user_id), "burst": False,
+            "type": 0, "emoji": {"id": None, "name": emoji},
+        })
+
+    async def interact(self, channel_id: int, user_id: int, command: str, options: dict,
+                       expect: str = None) -> dict:
+        """Dispatch an INTERACTION_CREATE for slash command `command` with
+        string `options`."""
+        guild_id = self.channel_guild[channel_id]
+        synced = self.commands.get(command)
+        member = self.member(guild_id, user_id)
+        member["permissions"] = EVERYONE_PERMISSIONS
+        data = {
+            "id": str(next(self._ids)), "application_id": str(APPLICATION_ID), "type": 2,
+            "token": f"token-{next(self._ids)}", "version": 1, "guild_id": str(guild_id),
+            "channel_id": str(channel_id),
+            "channel": {"id": str(channel_id), "type": 0, "guild_id": str(guild_id), "name": "channel",
+                        "permissions": EVERYONE_PERMISSIONS},
+            "member": member, "locale": "en-US", "guild_locale": "en-US", "app_permissions": ADMINISTRATOR,
+            "entitlements": [], "attachment_size_limit": 10 * 1024**2, "authorizing_integration_owners": {"0": str(guild_id)}, "context": 0,
+            "data": {"id": synced["id"] if synced else str(next(self._ids)), "name": command, "type": 1,
+                     "options": [{"name": k, "type": 3, "value": v} for k, v in options.items()]},
+        }
+        sent_at = await self.dispatch("INTERACTION_CREATE", data)
+        if expect:
+            self._expected_callbacks[int(data["id"])] = (expect, sent_at)
+        return data
+
+    def _matched(self, pending, now: float):
+        if pending is None:
+            return False
+        kind, sent_at = pending
+        self.stats.latency[kind].append(now - sent_at)
+        return True
+
+    def outstanding(self) -> int:
+        """Expected responses that haven't arrived (yet)."""
+        return (sum(len(q) for q in self._expected_sends.values()) + len(self._expected_reacts)
+                + len(self._expected_callbacks) + len(self._expected_timeouts))
+
+    def missing(self) -> Counter:
+        kinds = Counter(kind for q in self._expected_sends.values() for kind, _ in q)
+        for pending in (self._expected_reacts, self._expected_callbacks, self._expected_timeouts):
+            kinds.update(kind for kind, _ in pending.values())
+        return kinds
+
+    # -- gateway ------------------------------------------------------------
+    async def _send(self, payload: dict):
+        ws = self._ws
+        if ws is None or ws.closed:
+            raise ConnectionError("the bot isn't connected to the gateway")
+        raw = json.dumps(payload, separators=(",", ":"))
+        async with self._send_lock:
+            if self._compress is not None:
+                data = self._compress.compress(raw.encode("utf-8")) + self._compress.flush(zlib.Z_SYNC_FLUSH)
+                await ws.send_bytes(data)
+            else:
+                await ws.send_str(raw)
+
+    async def dispatch(self, event: str, data: dict) -> float:
+        """Send one DISPATCH; returns the perf_counter() time it went out."""
+        self._seq += 1
+        self.stats.events[event] += 1
+        sent_at = time.perf_counter()
+        await self._send({"op": 0, "t": event, "s": self._seq, "d": data})
+        return sent_at
+
+    async def _identify(self, request):
+        self.stats.milestones["identify"] = time.perf_counter()
+        gateway_url = f"ws://{request.host}/gateway"
+        await self.dispatch("READY", {
+            "v": 10, "user": self.bot_user, "session_id": "loadtest", "resume_gateway_url": gateway_url,
+            "guilds": [{"id": str(g), "unavailable": True} for g in self.guilds],
+            "application": {"id": str(APPLICATION_ID), "flags": 0}, "private_channels": [],
+            "relationships": [], "shard": [0, 1],
+        })
+        for guild in self.guilds.values():
+            await self.dispatch("GUILD_CREATE", self._guild_create(guild))
+        self.stats.milestones["guilds_sent"] = time.perf_counter()
+
+    async def _gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self._ws = ws
+        self._compress = zlib.compressobj() if request.query.get("compress") == "zlib-stream" else None
+        self.stats.milestones.setdefault("gateway_connected", time.perf_counter())
+        await self._send({"op": 10, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL_MS}})
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op, d = payload.get("op"), payload.get("d")
+            if op == 1:
+                self.stats.gateway["heartbeat"] += 1
+                await self._send({"op": 11})
+            elif op == 2:
+                self.stats.gateway["identify"] += 1
+                asyncio.create_task(self._identify(request))
+            elif op == 3:
+                self.stats.gateway["presence_update"] += 1
+                if not self.ready.is_set():
+                    self.stats.milestones["ready"] = time.perf_counter()
+                    self.ready.set()
+            elif op == 8:
+                self.stats.gateway["request_members"] += 1
+                guild = self.guilds[int(d["guild_id"])]
+                await self.dispatch("GUILD_MEMBERS_CHUNK", {
+                    "guild_id": str(guild["id"]), "chunk_index": 0, "chunk_count": 1, "not_found": [],
+                    "members": [self.member(guild["id"], u) for u in [BOT_ID] + guild["members"]],
+                    "nonce": d.get("nonce"),
+                })
+            else:
+                self.stats.gateway[f"op {op}"] += 1
+        self._ws = None
+        return ws
+
+    # -- REST ---------------------------------------------------------------
+    def _build_app(self) -> web.Application:
+        app = web.Application(client_max_size=8 * 1024**2)
+        routes = [
+            ("GET", "/users/@me", self._get_me),
+            ("GET", "/oauth2/applications/@me", self._get_application),
+            ("GET", "/gateway", self._get_gateway),
+            ("GET", "/gateway/bot", self._get_gateway),
+            ("GET", "/applications/{app_id}/commands", self._get_commands),
+            ("PUT", "/applications/{app_id}/commands", self._put_commands),
+            ("PUT", "/applications/{app_id}/guilds/{guild_id}/commands", self._put_commands),
+            ("POST", "/channels/{channel_id}/messages", self._post_message),
+            ("GET", "/channels/{channel_id}/messages/{message_id}", self._get_message),
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}", self._patch_message),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}", self._no_content),
+            ("POST", "/channels/{channel_id}/typing", self._no_content),
+            ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self._put_reaction),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}",
+             self._no_content),
+            ("PATCH", "/guilds/{guild_id}/members/{user_id}", self._patch_member),
+            ("POST", "/interactions/{interaction_id}/{token}/callback", self._interaction_callback),
+            ("GET", "/webhooks/{app_id}/{token}/messages/@original", self._get_original),
+            ("PATCH", "/webhooks/{app_id}/{token}/messages/@original", self._patch_original),
+            ("DELETE", "/webhooks/{app_id}/{token}/messages/@original", self._no_content),
+            ("POST", "/webhooks/{app_id}/{token}", self._post_followup),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, API_PREFIX + path, self._limited(method, path, handler))
+        app.router.add_get("/gateway", self._gateway)
+        app.router.add_route("*", "/{tail:.*}", self._unhandled)
+        return app
+
+    def _limited(self, method: str, template: str, handler):
+        route = f"{method} {template}"
+        limit = RATE_LIMITS.get((method, template))
+        # Interaction responses don't count towards the global limit.
+        global_limit = not template.startswith(("/interactions/", "/webhooks/"))
+
+        async def handle(request):
+            self.stats.requests[route] += 1
+            headers = {}
+            if self.rate_limits:
+                now = time.monotonic()
+                major = request.match_info.get("channel_id") or request.match_info.get("guild_id") or ""
+                bucket = f"{route}:{major}"
+                previous = self._limited_at.pop(bucket, None)
+                if previous is not None:
+                    self.stats.retry_waits.append((now - previous[0], previous[1]))
+                if self._global is not None and global_limit:
+                    allowed, _, reset_after = self._global.hit(now)
+                    if not allowed:
+                        self.stats.global_limited += 1
+                        self._limited_at[bucket] = (now, reset_after)
+                        return self._too_many(reset_after, {"X-RateLimit-Global": "true",
+                                                            "X-RateLimit-Scope": "global"}, is_global=True)
+                if limit is not None:
+                    window = self._buckets.get(bucket)
+                    if window is None:
+                        window = self._buckets[bucket] = Window(*limit)
+                    allowed, remaining, reset_after = window.hit(now)
+                    headers = {
+                        "X-RateLimit-Limit": str(window.limit), "X-RateLimit-Remaining": str(remaining),
+                        "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+                        "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                        "X-RateLimit-Bucket": f"{abs(hash(route)):x}",
+                    }
+                    if not allowed:
+                        self.stats.rate_limited[route] += 1
+                        self._limited_at[bucket] = (now, reset_after)
+                        return self._too_many(reset_after, dict(headers, **{"X-RateLimit-Scope": "user"}))
+            response = await handler(request)
+            response.headers.update(headers)
+            self.stats.statuses[response.status] += 1
+            return response
+
+        return handle
+
+    def _too_many(self, retry_after: float, headers: dict, is_global: bool = False):
+        self.stats.statuses[429] += 1
+        # discord.py takes a 429 without a Via header for a Cloudflare ban.
+        headers.update({"Retry-After": f"{retry_after:.3f}", "Via": "1.1 google"})
+        return json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                  "global": is_global}, status=429, headers=headers)
+
+    async def _unhandled(self, request):
+        self.stats.unhandled[f"{request.method} {request.path}"] += 1
+        self.stats.statuses[404] += 1
+        return json_response({"message": "404: Not Found", "code": 0}, status=404)
+
+    @staticmethod
+    async def _body(request) -> dict:
+        if request.content_type.startswith("multipart/"):
+            form = await request.post()
+            return json.loads(form.get("payload_json", "{}"))
+        if request.can_read_body:
+            return await request.json()
+        return {}
+
+    async def _no_content(self, request):
+        return web.Response(status=204)
+
+    async def _get_me(self, request):
+        return json_response(self.bot_user)
+
+    async def _get_application(self, request):
+        return json_response({
+            "id": str(APPLICATION_ID), "name": self.bot_user["username"], "description": "", "icon": None,
+            "bot_public": True, "bot_require_code_grant": False, "verify_key": "0" * 64, "flags": 0,
+            "owner": self._user(OWNER_ID, "owner"), "team": None, "summary": "",
+        })
+
+    async def _get_gateway(self, request):
+        return json_response({
+            "url": f"ws://{request.host}/gateway", "shards": 1,
+            "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1},
+        })
+
+    async def _get_commands(self, request):
+        return json_response(list(self.commands.values()))
+
+    async def _put_commands(self, request):
+        synced = []
+        for command in await self._body(request):
+            command = dict(command, id=str(next(self._ids)), application_id=str(APPLICATION_ID),
+                           version=str(next(self._ids)))
+            command.setdefault("default_member_permissions", None)
+            if "guild_id" in request.match_info:
+                command["guild_id"] = request.match_info["guild_id"]
+            self.commands[command["name"]] = command
+            synced.append(command)
+        self.stats.milestones["commands_synced"] = time.perf_counter()
+        self.synced.set()
+        return json_response(synced)
+
+    def _bot_message(self, channel_id: int, body: dict) -> dict:
+        data = self.message(channel_id, BOT_ID, body.get("content") or "", embeds=body.get("embeds") or (),
+                            components=body.get("components") or ())
+        self.messages[int(data["id"])] = data
+        return data
+
+    async def _post_message(self, request):
+        now = time.perf_counter()
+        channel_id = int(request.match_info["channel_id"])
+        data = self._bot_message(channel_id, await self._body(request))
+        queue = self._expected_sends.get(channel_id)
+        if not self._matched(queue.popleft() if queue else None, now):
+            self.stats.unexpected["send"] += 1
+        return json_response(data)
+
+    async def _get_message(self, request):
+        data = self.messages.get(int(request.match_info["message_id"]))
+        if data is None:
+            return json_response({"message": "Unknown Message", "code": 10008}, status=404)
+        return json_response(data)
+
+    async def _patch_message(self, request):
+        data = self.messages.get(int(request.match_info["message_id"]))
+        if data is None:
+            return json_response({"message": "Unknown Message", "code": 10008}, status=404)
+        body = await self._body(request)
+        data.update({k: v for k, v in body.items() if k in ("content", "embeds", "components")},
+                    edited_timestamp=timestamp())
+        return json_response(data)
+
+    async def _put_reaction(self, request):
+        now = time.perf_counter()
+        channel_id = int(request.match_info["channel_id"])
+        message_id = int(request.match_info["message_id"])
+        emoji = unquote(request.match_info["emoji"])
+        if not self._matched(self._expected_reacts.pop(message_id, None), now):
+            if message_id not in self.messages:
+                self.stats.unexpected["react"] += 1
+        for listener in self.bot_reaction_listeners:
+            listener(channel_id, message_id, emoji)
+        return web.Response(status=204)
+
+    async def _patch_member(self, request):
+        now = time.perf_counter()
+        guild_id = int(request.match_info["guild_id"])
+        user_id = int(request.match_info["user_id"])
+        body = await self._body(request)
+        if not self._matched(self._expected_timeouts.pop((guild_id, user_id), None), now):
+            self.stats.unexpected["member_edit"] += 1
+        member = self.member(guild_id, user_id)
+        member["communication_disabled_until"] = body.get("communication_disabled_until")
+        return json_response(member)
+
+    async def _interaction_callback(self, request):
+        now = time.perf_counter()
+        interaction_id = int(request.match_info["interaction_id"])
+        body = await self._body(request)
+        if not self._matched(self._expected_callbacks.pop(interaction_id, None), now):
+            self.stats.unexpected["callback"] += 1
+        callback = {"interaction": {"id": str(interaction_id), "type": 2, "response_message_loading": False,
+                                    "response_message_ephemeral": False}}
+        message_body = body.get("data") or {}
+        if body.get("type") in (4, 7):
+            message = self.message(0, BOT_ID, message_body.get("content") or "",
+                                   embeds=message_body.get("embeds") or (),
+                                   components=message_body.get("components") or ())
+            message["interaction"] = {"id": str(interaction_id), "type": 2, "name": "",
+                                      "user": self.bot_user}
+            self.originals[request.match_info["token"]] = message
+            callback["interaction"]["response_message_id"] = message["id"]
+            callback["interaction"]["response_message_ephemeral"] = bool((message_body.get("flags") or 0) & 64)
+            callback["resource"] = {"type": body["type"], "message": message}
+        elif body.get("type") == 5:
+            callback["interaction"]["response_message_loading"] = True
+            callback["resource"] = {"type": 5}
+        else:
+            callback["resource"] = {"type": body.get("type", 4)}
+        if "with_response" not in request.query:
+            return web.Response(status=204)
+        return json_response(callback)
+
+    async def _get_original(self, request):
+        data = self.originals.get(request.match_info["token"])
+        if data is None:
+            return json_response({"message": "Unknown Message", "code": 10008}, status=404)
+        return json_response(data)
+
+    async def _patch_original(self, request):
+        token = request.match_info["token"]
+        body = await self._body(request)
+        data = self.originals.get(token) or self.message(0, BOT_ID, "")
+        data.update({k: v for k, v in body.items() if k in ("content", "embeds", "components")})
+        self.originals[token] = data
+        return json_response(data)
+
+    async def _post_followup(self, request):
+        body = await self._body(request)
+        return json_response(self.message(0, BOT_ID, body.get("content") or "",
+                                              embeds=body.get("embeds") or ()))
+
+    # -- lifecycle ----------------------------------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving; returns the port."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+        await self._runner.cleanup()
@@ -0,0 +1,186 @@
+"""
+Timing, results files and baseline comparison for `python -m benchmarks`.
+
+A Case is one named zero-argument callable (or coroutine function).
+measure() warms it up, batches calls so each sample lasts at least
+MIN_SAMPLE_SECONDS, and reports seconds per call as p50/p90/p99 over
+the samples. compare() checks a run against an earlier results file,
+case by case, on the median.
+"""
+import asyncio
+import inspect
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+
+# Shortest a timed batch of calls is allowed to be.
+MIN_SAMPLE_SECONDS = 0.0005
+# Cap on calls per batch, for cases so fast that even this many is short.
+MAX_BATCH = 10_000
+# A median this much slower than the baseline's (0.2 = 20%) is a regression.
+DEFAULT_THRESHOLD = 0.2
+
+
+class Case:
+    """`max_rounds` caps the samples taken for a case that's slow by
+    nature (a full rebuild or re-read), so it doesn't dominate the run."""
+
+    def __init__(self, name: str, fn, max_rounds: int = None):
+        self.name = name
+        self.fn = fn
+        self.max_rounds = max_rounds
+        self.is_async = inspect.iscoroutinefunction(fn)
+
+
+def cycling(fn, inputs):
+    """A Case callable running fn(input) on each of `inputs` in turn,
+    so a case isn't timing the same cached input over and over."""
+    it = itertools.cycle(inputs)
+    if inspect.iscoroutinefunction(fn):
+        async def run():
+            return await fn(next(it))
+    else:
+        def run():
+            return fn(next(it))
+    return run
+
+
+def percentile(ordered: list, q: float) -> float:
+    """q-th percentile (0-100) of an already sorted list, interpolating
+    between the two nearest samples."""
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * q / 100
+    low = math.floor(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(samples: list, batch: int) -> dict:
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    return {
+        "unit": "s/call",
+        "rounds": len(ordered),
+        "batch": batch,
+        "mean": mean,
+        "min": ordered[0],
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+        "ops_per_sec": 1 / mean if mean else float("inf"),
+    }
+
+
+def _calibrate(fn, warmup: int) -> int:
+    for _ in range(warmup):
+        fn()
+    batch = 1
+    while batch < MAX_BATCH:
+        start = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            break
+        batch *= 2
+    return batch
+
+
+async def _calibrate_async(fn, warmup: int) -> int:
+    for _ in range(warmup):
+        await fn()
+    batch = 1
+    while batch < MAX_BATCH:
+        start = time.perf_counter()
+        for _ in range(batch):
+            await fn()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            break
+        batch *= 2
+    return batch
+
+
+def _measure_sync(fn, warmup: int, rounds: int) -> dict:
+    batch = _calibrate(fn, warmup)
+    perf_counter = time.perf_counter
+    samples = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(batch):
+            fn()
+        samples.append((perf_counter() - start) / batch)
+    return summarize(samples, batch)
+
+
+async def _measure_async(fn, warmup: int, rounds: int) -> dict:
+    # Timed inside one running loop, the way the handlers actually run -
+    # not one asyncio.run() per call, which would swamp what's measured.
+    batch = await _calibrate_async(fn, warmup)
+    perf_counter = time.perf_counter
+    samples = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(batch):
+            await fn()
+        samples.append((perf_counter() - start) / batch)
+    return summarize(samples, batch)
+
+
+def measure(case: Case, warmup: int, rounds: int) -> dict:
+    if case.max_rounds is not None:
+        rounds = min(rounds, case.max_rounds)
+        warmup = min(warmup, 1)
+    if case.is_async:
+        return asyncio.run(_measure_async(case.fn, warmup, rounds))
+    return _measure_sync(case.fn, warmup, rounds)
+
+
+def metadata(scale: str, params: dict) -> dict:
+    return {
+        "scale": scale,
+        "params": params,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(path: str, meta: dict, results: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+def read_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """(case, baseline p50, current p50, ratio, regressed) for every case
+    in both runs, in the order they ran."""
+    rows = []
+    old = baseline.get("results", {})
+    for name, current in results.items():
+        before = old.get(name)
+        if before is None:
+            continue
+        ratio = current["p50"] / before["p50"] if before["p50"] else float("inf")
+        rows.append((name, before["p50"], current["p50"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_rate(per_second: float) -> str:
+    return f"{per_second:,.2f}" if per_second < 100 else f"{per_second:,.0f}"
@@ -0,0 +1,42 @@
+"""
+KeywordManager.find_match(), the keyword step of every message in a
+channel with keyword responses on.
+
+  find_match.miss   a 120-character message matching no set - what
+                    most messages are
+  find_match.hit    the same with one keyword in the middle
+  find_match.long   a 2000-character message (Discord's limit) with a
+                    keyword near the end
+  matcher_build     building the Aho-Corasick matcher from scratch, as
+                    after any keyword edit
+
+find_match() runs without a sampler here, so a hit picks its response
+with random.choice() rather than going through the rotation.
+"""
+import random
+
+from benchmarks.harness import Case, cycling
+from benchmarks.synthetic import filler, keyword_sets, use_memory_storage
+
+
+def cases(params: dict) -> list:
+    import config
+    from keyword_manager import KeywordManager, KeywordMatcher
+
+    data, keywords = keyword_sets(params["keyword_sets"])
+    use_memory_storage({config.KEYWORDS_FILE: data})
+    manager = KeywordManager()
+    rng = random.Random(2)
+
+    misses = [filler(rng, 120) for _ in range(64)]
+    hits = [f"{filler(rng, 60)}{rng.choice(keywords)}{filler(rng, 50)}" for _ in range(64)]
+    longs = [f"{filler(rng, 1980)}{rng.choice(keywords)}" for _ in range(16)]
+    sets = config.load_keywords()["sets"]
+
+    manager.find_match(misses[0])  # build the matcher outside the timings
+    return [
+        Case("find_match.miss", cycling(manager.find_match, misses)),
+        Case("find_match.hit", cycling(manager.find_match, hits)),
+        Case("find_match.long", cycling(manager.find_match, longs)),
+        Case("matcher_build", lambda: KeywordMatcher(sets), max_rounds=5),
+    ]
@@ -0,0 +1,413 @@
+"""
+End-to-end load test: the real bot, started the way bot.py starts it,
+connected to a fake Discord on localhost (fake_discord.py) and driven
+with a scripted scenario. No network, no token, nothing under data/
+written.
+
+    python -m benchmarks.loadtest [--guilds 5000] [--rate 200] [--duration 30]
+                                  [--votes 50] [--interactions 20]
+                                  [--scenario mixed|messages|commands|votes|startup]
+                                  [--output run.json] [--baseline old.json]
+
+The bot runs in its own process (`python -m benchmarks.loadtest bot`)
+against an in-memory copy of its data. "mixed", the default, runs
+message traffic, slash commands and !vto votes at once; the other
+scenarios run one stream alone, or just startup. The report has startup
+times, per-kind response latency, rate limiting and anything that
+never got an answer.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+
+from benchmarks import replay, synthetic
+from benchmarks.fake_discord import BOT_ID, FakeDiscord
+from benchmarks.harness import compare, format_seconds, metadata, read_results, summarize, write_results
+
+SCENARIOS = {
+    "mixed": ("messages", "commands", "votes"),
+    "messages": ("messages",),
+    "commands": ("commands",),
+    "votes": ("votes",),
+    "startup": (),
+}
+OTHER_BOT_ID = 4 * 10**17
+VOTE_EMOJI = "🖕"
+VOTE_DELAY = 1.0  # seconds from the bot's vote reaction to the members'
+TEXT_COMMANDS = ["!ask will it work", "!rng 1 100", "!pick tea, coffee, water", "!rcg"]
+SLASH_COMMANDS = [("ask", {"question": "will it work"}), ("rng", {"min_val": "1", "max_val": "6"}),
+                  ("pick", {"choices": "tea, coffee, water"})]
+
+
+# -- the bot process ----------------------------------------------------------
+def run_bot(port: int, documents_path: str):
+    """Run bot.main() against the fake server on `port`."""
+    sys.modules["key"] = types.SimpleNamespace(api="loadtest-token")
+
+    import discord.http
+    import yarl
+    from discord.gateway import DiscordWebSocket
+
+    discord.http.Route.BASE = f"http://127.0.0.1:{port}/api/v10"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{port}/gateway")
+
+    with open(documents_path, "r", encoding="utf-8") as f:
+        synthetic.use_memory_storage(json.load(f))
+
+    import bot
+
+    try:
+        asyncio.run(bot.main())
+    except KeyboardInterrupt:
+        pass
+
+
+async def spawn_bot(port: int, documents_path: str, workdir: str):
+    env = dict(os.environ, LOG_CONSOLE="0", LOG_FILE=os.path.join(workdir, "bot_responses.log"),
+               PYTHONUNBUFFERED="1")
+    env.pop("DEV_GUILD_ID", None)
+    output = open(os.path.join(workdir, "bot_output.log"), "wb")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.loadtest", "bot", "--port", str(port), "--documents", documents_path,
+        stdout=output, stderr=asyncio.subprocess.STDOUT, env=env)
+    output.close()
+    return process
+
+
+async def stop_bot(process):
+    if process.returncode is not None:
+        return
+    process.send_signal(signal.SIGINT)  # bot.main()'s finally: config.stop(), stop_logging()
+    try:
+        await asyncio.wait_for(process.wait(), 10)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+# -- the scenario -------------------------------------------------------------
+class Scenario:
+    def __init__(self, server: FakeDiscord, documents: dict, args):
+        self.server = server
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.sent = Counter()
+
+        import config
+        from keyword_manager import KeywordManager
+
+        synthetic.use_memory_storage(documents)
+        self.keywords = KeywordManager()
+        sets = config.load_keywords()["sets"]
+        self.keyword_list = [kw for s in sets.values() if s.get("enabled", True)
+                             for kw in s.get("keywords", []) if kw]
+        settings = config.load_settings()
+        self.required_votes = settings.get("required_votes", 3)
+
+        guild_ids = list(server.guilds)
+        votes = args.votes if "votes" in SCENARIOS[args.scenario] else 0
+        self.vote_guilds = guild_ids[:votes]
+        traffic = guild_ids[votes:] or guild_ids
+        self.channels = [c for g in traffic for c in server.guilds[g]["channels"]]
+        self._votes = {}  # vote channel -> {"guild", "target", "voters", "carried", "message"}
+        self._tasks = set()
+        server.bot_reaction_listeners.append(self._on_bot_reaction)
+
+    def _keyword_hit(self, content: str) -> bool:
+        return self.keywords.has_active_sets() and self.keywords.find_match(content) is not None
+
+    def _chatter(self) -> str:
+        return " ".join(self.rng.choices(replay.CHATTER, k=self.rng.randint(3, 8)))
+
+    async def _message(self, channel: int, author: int, content: str, expect: str = None, mentions=()):
+        # Anything but a mention of the bot can contain a keyword, and the
+        # bot answers those too.
+        answered = author != OTHER_BOT_ID and BOT_ID not in mentions
+        expected = ["message.keyword"] if answered and self._keyword_hit(content) else []
+        if expect:
+            expected.append(expect)
+        self.sent["messages"] += 1
+        return await self.server.send_message(channel, author, content, mentions=mentions, expect=expected)
+
+    async def _one_message(self) -> int:
+        rng = self.rng
+        channel = rng.choice(self.channels)
+        members = self.server.guilds[self.server.channel_guild[channel]]["members"]
+        roll = rng.random()
+        if roll < 0.15 and self.keyword_list:
+            await self._message(channel, rng.choice(members),
+                                f"{self._chatter()} {rng.choice(self.keyword_list)} {self._chatter()}")
+        elif roll < 0.20:
+            content = self._chatter()
+            authors = rng.sample(members, 3)
+            for author in authors[:2]:
+                await self._message(channel, author, content)
+            await self._message(channel, authors[2], content, expect="message.echo")
+            return 3
+        elif roll < 0.25:
+            await self._message(channel, rng.choice(members), f"<@{BOT_ID}> {rng.choice(['', 'help', 'vto'])}",
+                                expect="message.mention", mentions=[BOT_ID])
+        elif roll < 0.35:
+            await self._message(channel, rng.choice(members), rng.choice(TEXT_COMMANDS), expect="command.text")
+        elif roll < 0.45:
+            await self._message(channel, OTHER_BOT_ID, self._chatter())
+        else:
+            await self._message(channel, rng.choice(members), self._chatter())
+        return 1
+
+    async def _one_interaction(self) -> int:
+        channel = self.rng.choice(self.channels)
+        members = self.server.guilds[self.server.channel_guild[channel]]["members"]
+        command, options = self.rng.choice(SLASH_COMMANDS)
+        await self.server.interact(channel, self.rng.choice(members), command, options, expect="command.slash")
+        self.sent["interactions"] += 1
+        return 1
+
+    async def _paced(self, rate: float, emit):
+        loop = asyncio.get_running_loop()
+        interval = 1 / rate
+        next_at = loop.time()
+        end = next_at + self.args.duration
+        while next_at < end:
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_at += interval * await emit()
+
+    async def _open_votes(self):
+        await asyncio.sleep(self.args.duration / 4)
+        for guild_id in self.vote_guilds:
+            guild = self.server.guilds[guild_id]
+            channel = guild["channels"][0]
+            target, opener, *voters = guild["members"]
+            self._votes[channel] = {"guild": guild_id, "target": target, "voters": voters[:self.required_votes],
+                                    "carried": asyncio.Event()}
+            await self._message(channel, opener, f"!vto <@{target}> 60s", expect="vote.open", mentions=[target])
+            self.sent["votes"] += 1
+        # Votes the bot never reacted to show up as missing vote.open/
+        # vote.timeout responses; the rest have to be in before the drain.
+        waiting = [vote["carried"].wait() for vote in self._votes.values()]
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiting), self.args.drain)
+        except asyncio.TimeoutError:
+            pass
+
+    def _on_bot_reaction(self, channel_id: int, message_id: int, emoji: str):
+        vote = self._votes.get(channel_id)
+        if emoji != VOTE_EMOJI or vote is None or "message" in vote:
+            return
+        vote["message"] = message_id
+        task = asyncio.get_running_loop().create_task(self._carry_vote(channel_id, vote))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _carry_vote(self, channel_id: int, vote: dict):
+        # The bot only opens the vote session once add_reaction() returns,
+        # and discord.py holds that until the reaction bucket (1 per
+        # 0.25 s, see fake_discord.RATE_LIMITS) resets - votes inside that
+        # window find no session and don't count. Real voters are slower.
+        await asyncio.sleep(VOTE_DELAY)
+        sent_at = None
+        for voter in vote["voters"]:
+            sent_at = await self.server.add_reaction(channel_id, vote["message"], voter, VOTE_EMOJI)
+        self.server.expect_timeout(vote["guild"], vote["target"], "vote.timeout", sent_at)
+        self.server.expect_send(channel_id, "vote.result", sent_at)
+        vote["carried"].set()
+
+    async def run(self) -> float:
+        streams = SCENARIOS[self.args.scenario]
+        tasks = []
+        if "messages" in streams and self.args.rate > 0:
+            tasks.append(self._paced(self.args.rate, self._one_message))
+        if "commands" in streams and self.args.interactions > 0:
+            tasks.append(self._paced(self.args.interactions, self._one_interaction))
+        if "votes" in streams and self.vote_guilds:
+            tasks.append(self._open_votes())
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+
+# -- report -------------------------------------------------------------------
+def report(server: FakeDiscord, scenario: Scenario, started: float, seconds: float) -> dict:
+    stats = server.stats
+    milestones = stats.milestones
+    results = {}
+
+    print(f"{len(server.guilds)} guilds, scenario {scenario.args.scenario}:")
+    if "commands_synced" in milestones:
+        print(f"  slash commands synced {milestones['commands_synced'] - started:.2f} s after launch "
+              f"({len(server.commands)} commands)")
+    if "ready" in milestones:
+        print(f"  ready {milestones['ready'] - started:.2f} s after launch "
+              f"({milestones['ready'] - milestones['gateway_connected']:.2f} s from gateway connect)")
+        results["loadtest.startup"] = {"launch_to_ready": milestones["ready"] - started,
+                                       "connect_to_ready": milestones["ready"] - milestones["gateway_connected"]}
+    if seconds:
+        sent = scenario.sent
+        print(f"  sent over {seconds:.1f} s: {sent['messages']} messages ({sent['messages'] / seconds:.1f}/s), "
+              f"{sent['interactions']} interactions ({sent['interactions'] / seconds:.1f}/s), {sent['votes']} votes")
+        results["loadtest.sent"] = {"seconds": seconds, **sent}
+
+    missing = server.missing()
+    kinds = sorted(set(stats.latency) | set(missing))
+    if kinds:
+        print(f"  {'response':<16} {'count':>7} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10} {'missing':>8}")
+    for kind in kinds:
+        samples = stats.latency.get(kind)
+        if not samples:
+            print(f"  {kind:<16} {0:>7} {'':>10} {'':>10} {'':>10} {'':>10} {missing[kind]:>8}")
+            continue
+        result = results[f"loadtest.{kind}"] = summarize(samples, 1)
+        result["missing"] = missing[kind]
+        print(f"  {kind:<16} {len(samples):>7} {format_seconds(result['p50']):>10} "
+              f"{format_seconds(result['p90']):>10} {format_seconds(result['p99']):>10} "
+              f"{format_seconds(result['max']):>10} {missing[kind]:>8}")
+
+    total = sum(stats.requests.values())
+    limited = sum(stats.rate_limited.values()) + stats.global_limited
+    print(f"  REST: {total} requests, {limited} rate limited ({stats.global_limited} global)")
+    for route, count in stats.rate_limited.most_common():
+        print(f"    429 x{count:<6} {route}")
+    early = [(waited, told) for waited, told in stats.retry_waits if waited < told - 0.01]
+    if stats.retry_waits:
+        ratios = sorted(waited / told for waited, told in stats.retry_waits if told > 0)
+        print(f"    after a 429, the bucket's next request came {ratios[len(ratios) // 2]:.2f}x retry_after later "
+              f"(median); {len(early)} of {len(stats.retry_waits)} came early")
+    results["loadtest.rest"] = {"requests": total, "rate_limited": limited, "global_limited": stats.global_limited,
+                                "retries": len(stats.retry_waits), "early_retries": len(early),
+                                "by_route": dict(stats.requests), "statuses": {str(k): v for k, v in stats.statuses.items()}}
+    print(f"  gateway: sent " + ", ".join(f"{count} {event}" for event, count in stats.events.most_common()))
+    print(f"           received " + ", ".join(f"{count} {op}" for op, count in sorted(stats.gateway.items())))
+    if stats.unexpected:
+        print("  unexpected bot calls: " + ", ".join(f"{n} {k}" for k, n in stats.unexpected.items()))
+    if stats.unhandled:
+        print("  calls the fake doesn't serve (404):")
+        for route, count in stats.unhandled.most_common():
+            print(f"    x{count:<6} {route}")
+    results["loadtest.errors"] = {"unexpected": dict(stats.unexpected), "unhandled": dict(stats.unhandled),
+                                  "missing": dict(missing)}
+    return results
+
+
+# -- runner -------------------------------------------------------------------
+async def wait_for_responses(server: FakeDiscord, timeout: float):
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while server.outstanding() and loop.time() < end:
+        await asyncio.sleep(0.1)
+
+
+async def run(args):
+    """Returns (results, whether the scenario ran)."""
+    documents = replay.load_documents("live", {})
+    import config
+
+    documents.pop(config.VOTES_FILE, None)  # no open votes to recover at startup
+    server = FakeDiscord(guilds=args.guilds, members=args.members, seed=args.seed,
+                         rate_limits=not args.no_rate_limits)
+    server.add_user(OTHER_BOT_ID, "another bot", bot=True)
+    scenario = Scenario(server, json.loads(json.dumps(documents)), args)
+    port = await server.start()
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        documents_path = os.path.join(workdir, "documents.json")
+        with open(documents_path, "w", encoding="utf-8") as f:
+            json.dump(documents, f, ensure_ascii=False)
+        started = time.perf_counter()
+        process = await spawn_bot(port, documents_path, workdir)
+        seconds, completed = 0.0, False
+        try:
+            ready = asyncio.ensure_future(server.ready.wait())
+            exited = asyncio.ensure_future(process.wait())
+            await asyncio.wait({ready, exited}, timeout=args.startup_timeout, return_when=asyncio.FIRST_COMPLETED)
+            exited.cancel()
+            if not server.ready.is_set():
+                ready.cancel()
+                raise RuntimeError("the bot didn't get ready" + (
+                    f" (exited with {process.returncode})" if process.returncode is not None else
+                    f" within {args.startup_timeout:.0f} s"))
+            seconds = await scenario.run()
+            await wait_for_responses(server, args.drain)
+            completed = True
+        except (RuntimeError, ConnectionError) as e:
+            print(f"load test aborted: {e}")
+            with open(os.path.join(workdir, "bot_output.log"), "r", encoding="utf-8", errors="replace") as f:
+                print("".join(f.readlines()[-30:]))
+        finally:
+            await stop_bot(process)
+            await server.stop()
+            if args.bot_log:
+                with open(os.path.join(workdir, "bot_output.log"), "rb") as src, open(args.bot_log, "wb") as dst:
+                    dst.write(src.read())
+    return report(server, scenario, started, seconds), completed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest",
+                                     description="Load-test the whole bot against a local fake Discord.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed",
+                        help="which streams to run (default: mixed, all of them)")
+    parser.add_argument("--guilds", type=int, default=5000, help="guilds the bot is in (default: 5000)")
+    parser.add_argument("--members", type=int, default=10, help="members per guild (default: 10)")
+    parser.add_argument("--rate", type=float, default=200, help="messages per second (default: 200)")
+    parser.add_argument("--interactions", type=float, default=20, help="slash commands per second (default: 20)")
+    parser.add_argument("--votes", type=int, default=50, help="concurrent !vto votes (default: 50)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic (default: 30)")
+    parser.add_argument("--drain", type=float, default=15,
+                        help="seconds to wait for outstanding responses afterwards (default: 15)")
+    parser.add_argument("--startup-timeout", type=float, default=300,
+                        help="seconds to wait for the bot to get ready (default: 300)")
+    parser.add_argument("--no-rate-limits", action="store_true",
+                        help="don't enforce REST rate limits (with them, latency under load includes "
+                             "discord.py's backoff)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the world and the traffic")
+    parser.add_argument("--bot-log", help="keep the bot process's console output in this file")
+    parser.add_argument("--output", help="write the report to this JSON results file")
+    parser.add_argument("--baseline", help="compare latencies against this JSON results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fraction a median may slow down before it counts as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+    if args.votes and args.votes >= args.guilds and "votes" in SCENARIOS[args.scenario]:
+        parser.error("--votes needs more --guilds than votes (each vote gets a guild to itself)")
+    return args
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["bot"]:
+        bot_args = argparse.ArgumentParser(prog="python -m benchmarks.loadtest bot")
+        bot_args.add_argument("--port", type=int, required=True)
+        bot_args.add_argument("--documents", required=True)
+        parsed = bot_args.parse_args(argv[1:])
+        run_bot(parsed.port, parsed.documents)
+        return 0
+
+    args = parse_args(argv)
+    results, completed = asyncio.run(run(args))
+    if args.output:
+        meta = metadata("live", {key: getattr(args, key) for key in
+                                 ("scenario", "guilds", "members", "rate", "interactions", "votes", "duration")})
+        write_results(args.output, meta, results)
+        print(f"results written to {args.output}")
+
+    failed = not completed
+    if args.baseline:
+        latencies = {k: v for k, v in results.items() if "p50" in v}
+        for case, before, now, ratio, regressed in compare(latencies, read_results(args.baseline), args.threshold):
+            print(f"  {case:<26} {format_seconds(before):>10} -> {format_seconds(now):>10} "
+                  f"{ratio - 1:>+6.0%}{'  REGRESSION' if regressed else ''}")
+            failed = failed or regressed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
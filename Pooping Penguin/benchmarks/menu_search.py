@@ -0,0 +1,88 @@
+"""
+Benchmark: menu Search, linear scan vs the n-gram TextIndex.
+
+Builds synthetic copypasta types (mixed English/Chinese template text)
+in memory (nothing under data/ is touched), checks that a substring
+scan and TextIndex.search() find the same types for every query, then
+times both. Building the index is timed separately.
+
+Usage (from the bot directory):
+
+  python benchmarks/menu_search.py [--types 200] [--templates 100] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_index import TextIndex  # noqa: E402
+
+CJK_WORDS = ["哭哭", "好帥", "音遊", "原神", "打機", "很弱智", "手元", "理論值", "鳥加", "全連"]
+
+
+def build(types: int, templates: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(5000)]
+    words += CJK_WORDS
+    return {
+        f"type_{i}": [
+            "{text} " + " ".join(rng.choices(words, k=rng.randint(5, 30)))
+            for _ in range(templates)
+        ]
+        for i in range(types)
+    }
+
+
+def scan(data: dict, query: str) -> list:
+    query = query.casefold()
+    return sorted(
+        type_id for type_id, templates in data.items()
+        if query in type_id.casefold() or any(query in t.casefold() for t in templates)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menu search: linear scan vs TextIndex")
+    parser.add_argument("--types", type=int, default=200)
+    parser.add_argument("--templates", type=int, default=100, help="templates per type")
+    parser.add_argument("--rounds", type=int, default=20, help="times each query is run")
+    args = parser.parse_args()
+
+    data = build(args.types, args.templates)
+    all_templates = [t for templates in data.values() for t in templates]
+    rng = random.Random(2)
+    queries = ["哭", "原神", "type_1", "{text}", "zzzq"]
+    queries += [rng.choice(rng.choice(all_templates).split()[1:])[:4] for _ in range(5)]
+
+    start = time.perf_counter()
+    index = TextIndex()
+    for type_id, templates in data.items():
+        index.add(type_id, "id", type_id)
+        for template in templates:
+            index.add(type_id, "template", template)
+    build_time = time.perf_counter() - start
+
+    for query in queries:
+        if sorted(index.search(query)) != scan(data, query):
+            raise SystemExit(f"results differ for {query!r}")
+
+    print(f"{args.types} types x {args.templates} templates = {len(all_templates)} templates, "
+          f"{args.rounds} rounds per query")
+    print(f"index build: {build_time * 1000:.0f} ms")
+    print(f"{'query':>12} {'types':>6} {'scan ms':>9} {'index ms':>9}")
+    for query in queries:
+        times = []
+        for fn in (lambda q: scan(data, q), index.search):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                found = fn(query)
+            times.append((time.perf_counter() - start) / args.rounds * 1000)
+        print(f"{query!r:>12} {len(found):>6} {times[0]:>9.3f} {times[1]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
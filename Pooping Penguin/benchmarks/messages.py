@@ -0,0 +1,40 @@
+"""
+MessagesCog._handle_repeats(), the repeat-echo step of every message in
+a channel with the echo on.
+
+  handle_repeats.quiet   different messages spread over --guilds
+                         channels: a RepeatTracker lookup and push each,
+                         and past MAX_TRACKED_CHANNELS, LRU eviction too
+  handle_repeats.streak  one channel where three users keep saying the
+                         same thing, so every third message is echoed
+                         (send() plus a reset)
+
+The cog is built without a bot (this step doesn't use it) and the
+messages are standins.py's, with nothing recording their sends.
+"""
+import random
+
+from benchmarks.harness import Case, cycling
+from benchmarks.standins import Channel, Message, User
+from benchmarks.synthetic import filler
+
+
+def cases(params: dict) -> list:
+    from cogs.messages_cog import MessagesCog
+
+    cog = MessagesCog(None)
+    rng = random.Random(4)
+    channels = [Channel(2 * 10**17 + i) for i in range(params["guilds"])]
+    authors = [User(3 * 10**17 + i) for i in range(50)]
+
+    quiet = [Message(rng.choice(channels), rng.choice(authors), filler(rng, 40)) for _ in range(4096)]
+    streak_channel = Channel(1)
+    streak = [Message(streak_channel, authors[i], "好帥") for i in range(3)]
+
+    async def handle(message):
+        await cog._handle_repeats(message, 3)
+
+    return [
+        Case("handle_repeats.quiet", cycling(handle, quiet)),
+        Case("handle_repeats.streak", cycling(handle, streak)),
+    ]
@@ -0,0 +1,299 @@
+"""
+Offline message replay: drive MessagesCog.on_message() with a recorded
+or synthetic stream of messages, no Discord connection involved.
+
+    python -m benchmarks.replay --generate 20000 stream.jsonl
+    python -m benchmarks.replay stream.jsonl [--loops 5] [--output run.json]
+    python -m benchmarks.replay stream.jsonl --record expected.jsonl
+    python -m benchmarks.replay stream.jsonl --expect expected.jsonl
+
+The stream is JSON lines, one message each:
+
+    {"guild": 123, "channel": 456, "author": 789, "content": "gg",
+     "bot": false, "mentions": [1], "mention_everyone": false}
+
+Each message goes through the real cog against an in-memory copy of the
+live (or --data synthetic) data; what would have gone to the API is
+recorded (standins.py). Reports throughput and per-stage latency;
+--record/--expect compare a run's responses against an earlier one.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+from benchmarks import synthetic
+from benchmarks.harness import compare, format_seconds, metadata, read_results, summarize, write_results
+from benchmarks.standins import Bot, Channel, Guild, Message, Recorder, User
+
+BOT_USER_ID = 1
+STAGES = ("route", "autoreact", "mention", "keywords", "echo", "on_message")
+CHATTER = ["lol", "ok", "same", "what", "today", "morning", "nice", "bruh", "ya", "no way",
+           "我", "今天", "真的", "好", "吃飯", "睡覺", "哈哈哈"]
+
+
+# -- data -----------------------------------------------------------------
+def load_documents(source: str, params: dict) -> dict:
+    """path -> document for config.py's MemoryBackend."""
+    import config
+
+    if source == "synthetic":
+        keyword_doc, _ = synthetic.keyword_sets(params["keyword_sets"])
+        return {config.KEYWORDS_FILE: keyword_doc, config.SETTINGS_FILE: synthetic.settings(params["guilds"])}
+
+    from storage import open_backend
+
+    backend = open_backend(config.STORAGE_BACKEND, config.DATABASE_FILE)
+    try:
+        return {path: doc for path in config.DOCUMENT_FILES if (doc := backend.read(path)) is not None}
+    finally:
+        backend.close()
+
+
+# -- stream -------------------------------------------------------------
+def generate(count: int, seed: int) -> list:
+    """A synthetic stream of `count` message records around the loaded
+    keyword sets and autoreact channels."""
+    import config
+
+    rng = random.Random(seed)
+    sets = config.load_keywords()["sets"]
+    keywords = [kw for s in sets.values() if s.get("enabled", True) for kw in s.get("keywords", []) if kw]
+    autoreact_channels = [int(c) for c in config.load_settings()["autoreact"]]
+    autoreact_channels = rng.sample(autoreact_channels, min(20, len(autoreact_channels)))
+    guilds = [10**17 + i for i in range(20)]
+    channels = [(guilds[i % len(guilds)], 2 * 10**17 + 10**6 + i) for i in range(200)]
+    channels += [(rng.choice(guilds), channel_id) for channel_id in autoreact_channels]
+    authors = [3 * 10**17 + i for i in range(500)]
+
+    def record(guild, channel, author, content, bot=False, mentions=()):
+        return {"guild": guild, "channel": channel, "author": author, "content": content,
+                "bot": bot, "mentions": list(mentions), "mention_everyone": False}
+
+    def chatter():
+        return " ".join(rng.choices(CHATTER, k=rng.randint(1, 8)))
+
+    stream = []
+    while len(stream) < count:
+        guild, channel = rng.choice(channels)
+        roll = rng.random()
+        if roll < 0.10:
+            stream.append(record(guild, channel, 4 * 10**17, chatter(), bot=True))
+        elif roll < 0.25 and keywords:
+            stream.append(record(guild, channel, rng.choice(authors), f"{chatter()} {rng.choice(keywords)} {chatter()}"))
+        elif roll < 0.30:
+            content = chatter()
+            for author in rng.sample(authors, 3):
+                stream.append(record(guild, channel, author, content))
+        elif roll < 0.33:
+            command = rng.choice(["", "help", "vto", "copypasta", "not a command"])
+            stream.append(record(guild, channel, rng.choice(authors), f"<@{BOT_USER_ID}> {command}".strip(),
+                                 mentions=[BOT_USER_ID]))
+        else:
+            stream.append(record(guild, channel, rng.choice(authors), chatter()))
+    return stream[:count]
+
+
+def read_stream(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_lines(path: str, items: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def build_messages(records: list, recorder: Recorder, bot_user: User) -> list:
+    guilds, channels, users = {}, {}, {bot_user.id: bot_user}
+
+    def user(user_id, bot=False):
+        if user_id not in users:
+            users[user_id] = User(user_id, bot=bot)
+        return users[user_id]
+
+    messages = []
+    for r in records:
+        guild = None
+        if r.get("guild") is not None:
+            guild = guilds.setdefault(r["guild"], Guild(r["guild"]))
+        channel = channels.get(r["channel"])
+        if channel is None:
+            channel = channels[r["channel"]] = Channel(r["channel"], recorder)
+        messages.append(Message(
+            channel, user(r["author"], r.get("bot", False)), r.get("content", ""), guild,
+            mentions=[user(m) for m in r.get("mentions", [])],
+            mention_everyone=r.get("mention_everyone", False)))
+    return messages
+
+
+# -- replay -------------------------------------------------------------
+def _timed_async(fn, samples: list):
+    async def run(*args):
+        start = time.perf_counter()
+        try:
+            return await fn(*args)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return run
+
+
+def _timed(fn, samples: list):
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return run
+
+
+async def replay(cog, messages: list, recorder: Recorder, loops: int):
+    """Feed every message through cog.on_message() `loops` times; returns
+    (seconds, {stage: [seconds per call, ...]}, responses of the first
+    pass)."""
+    timings = {stage: [] for stage in STAGES}
+    # Instance attributes shadow the methods on_message() looks up, so
+    # each stage is timed where it's actually called.
+    cog.routes.get = _timed(cog.routes.get, timings["route"])
+    cog._handle_autoreact = _timed_async(cog._handle_autoreact, timings["autoreact"])
+    cog._handle_mention = _timed_async(cog._handle_mention, timings["mention"])
+    cog._handle_keywords = _timed_async(cog._handle_keywords, timings["keywords"])
+    cog._handle_repeats = _timed_async(cog._handle_repeats, timings["echo"])
+    total = timings["on_message"]
+
+    first_pass = None
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    for _ in range(loops):
+        for index, message in enumerate(messages):
+            recorder.current = index
+            start = perf_counter()
+            await cog.on_message(message)
+            total.append(perf_counter() - start)
+        if first_pass is None:
+            first_pass = list(recorder.responses)
+    return perf_counter() - started, timings, first_pass
+
+
+def diff(expected: list, actual: list, limit: int = 10) -> list:
+    """Human-readable lines for the first `limit` differences."""
+    lines = []
+    for i in range(max(len(expected), len(actual))):
+        want = expected[i] if i < len(expected) else None
+        got = actual[i] if i < len(actual) else None
+        if want != got:
+            lines.append(f"  response {i}: expected {want}, got {got}")
+            if len(lines) >= limit:
+                break
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay",
+                                     description="Replay a message stream through MessagesCog without Discord.")
+    parser.add_argument("stream", help="JSONL message stream to replay (or to write, with --generate)")
+    parser.add_argument("--generate", type=int, metavar="N", help="write a synthetic stream of N messages and exit")
+    parser.add_argument("--data", choices=("live", "synthetic"), default="live",
+                        help="keyword/settings data: a copy of the bot's current storage (default) or synthetic")
+    parser.add_argument("--scale", choices=sorted(synthetic.SCALES), default="small",
+                        help="sizes for --data synthetic (default: small)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for generation and the bot's random picks")
+    parser.add_argument("--loops", type=int, default=1, help="replay the stream this many times (default: 1)")
+    parser.add_argument("--record", help="write the first pass's responses to this JSONL file")
+    parser.add_argument("--expect", help="compare the first pass's responses with this JSONL file")
+    parser.add_argument("--show", type=int, default=0, metavar="N", help="print the first N responses")
+    parser.add_argument("--output", help="write throughput and stage timings to this JSON results file")
+    parser.add_argument("--baseline", help="compare the timings against this JSON results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fraction a median may slow down before it counts as a regression (default: 0.2)")
+    parser.add_argument("--verbose", action="store_true", help="let the cog's console prints through")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    import config
+
+    params = dict(synthetic.SCALES[args.scale])
+    synthetic.use_memory_storage(load_documents(args.data, params))
+
+    if args.generate is not None:
+        stream = generate(args.generate, args.seed)
+        write_lines(args.stream, stream)
+        print(f"wrote {len(stream)} messages to {args.stream}")
+        return 0
+
+    from cogs.help_cog import COMMAND_LIST
+    from cogs.messages_cog import MessagesCog
+
+    random.seed(args.seed)
+    recorder = Recorder()
+    bot = Bot(recorder, BOT_USER_ID, [entry["name"] for entry in COMMAND_LIST])
+    cog = MessagesCog(bot)
+    records = read_stream(args.stream)
+    messages = build_messages(records, recorder, bot.user)
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        seconds, timings, responses = asyncio.run(replay(cog, messages, recorder, args.loops))
+    config._dirty.clear()  # rotation saves made during the replay; memory only anyway
+
+    handled = len(messages) * args.loops
+    print(f"{len(messages)} messages x {args.loops} loop(s) in {seconds:.2f} s: "
+          f"{handled / seconds:,.0f} messages/s ({args.data} data, seed {args.seed})")
+    results = {}
+    print(f"  {'stage':<12} {'calls':>8} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}")
+    for stage in STAGES:
+        samples = timings[stage]
+        if not samples:
+            print(f"  {stage:<12} {0:>8}")
+            continue
+        result = results[f"replay.{stage}"] = summarize(samples, 1)
+        print(f"  {stage:<12} {len(samples):>8} {format_seconds(result['p50']):>10} "
+              f"{format_seconds(result['p90']):>10} {format_seconds(result['p99']):>10} "
+              f"{format_seconds(result['max']):>10}")
+    results["replay.throughput"] = {"messages": handled, "seconds": seconds,
+                                    "messages_per_sec": handled / seconds}
+
+    kinds = Counter(r["kind"] for r in responses)
+    print(f"responses (first pass): {len(responses)} - "
+          + ", ".join(f"{kinds[k]} {k}" for k in ("send", "react", "help")))
+    for response in responses[:args.show]:
+        print(f"  {response}")
+
+    if args.output:
+        meta = metadata(args.scale if args.data == "synthetic" else "live",
+                        {"stream": args.stream, "messages": len(messages), "loops": args.loops, "data": args.data})
+        write_results(args.output, meta, results)
+        print(f"results written to {args.output}")
+    if args.record:
+        write_lines(args.record, responses)
+        print(f"responses written to {args.record}")
+
+    failed = False
+    if args.expect:
+        differences = diff(read_stream(args.expect), responses)
+        if differences:
+            print(f"responses differ from {args.expect}:")
+            print("\n".join(differences))
+            failed = True
+        else:
+            print(f"responses match {args.expect}")
+    if args.baseline:
+        stage_results = {k: v for k, v in results.items() if "p50" in v}
+        for case, before, now, ratio, regressed in compare(stage_results, read_results(args.baseline), args.threshold):
+            print(f"  {case:<22} {format_seconds(before):>10} -> {format_seconds(now):>10} "
+                  f"{ratio - 1:>+6.0%}{'  REGRESSION' if regressed else ''}")
+            failed = failed or regressed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Checks that config.py keeps storage I/O off the event loop: with every
+storage call slowed down to --delay seconds, the loop must never fall
+more than --bound seconds behind.
+
+    python -m benchmarks.slow_storage [--delay 0.2] [--bound 0.05] [--saves 200]
+
+Runs config.start(), a burst of save_*() calls and their flush, and an
+outside edit picked up by the _watch() poll, against a MemoryBackend
+whose signature()/read()/commit() sleep first. Exits non-zero if the
+loop lag (measured by loop_monitor.py) goes over the bound, or the edit
+is never picked up.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks import synthetic
+
+
+class SlowBackend(synthetic.MemoryBackend):
+    """A MemoryBackend whose storage calls each take `delay` seconds, like
+    a slow or overloaded disk."""
+
+    name = "slow"
+    delay = 0.0
+
+    def signature(self, path):
+        time.sleep(self.delay)
+        return super().signature(path)
+
+    def read(self, path):
+        time.sleep(self.delay)
+        return super().read(path)
+
+    def commit(self, path, payload):
+        time.sleep(self.delay)
+        return super().commit(path, payload)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.slow_storage",
+                                     description="Check that slow storage never blocks the event loop.")
+    parser.add_argument("--delay", type=float, default=0.2,
+                        help="seconds every storage call takes (default: 0.2)")
+    parser.add_argument("--bound", type=float, default=0.05,
+                        help="most the event loop may lag, in seconds (default: 0.05)")
+    parser.add_argument("--saves", type=int, default=200, help="save_*() calls in the burst (default: 200)")
+    parser.add_argument("--guilds", type=int, default=1_000, help="servers in the settings document (default: 1000)")
+    return parser.parse_args(argv)
+
+
+async def run(args, backend) -> dict:
+    import config
+    from loop_monitor import LoopMonitor
+
+    monitor = LoopMonitor(interval=0.005, slow_seconds=args.bound, heartbeat_warn_seconds=float("inf"))
+    monitor.start()
+    result = {}
+
+    started = time.perf_counter()
+    await config.start()
+    result["start"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(args.saves):
+        settings = config.load_settings()
+        settings["required_votes"] = i % 10 + 1
+        config.save_settings(settings)
+        votes = config.load_votes()
+        votes["sessions"][str(i)] = {"voters": [i]}
+        config.save_votes(votes)
+        if i % 10 == 0:
+            await asyncio.sleep(0)
+    await config.flush_async()
+    result["saves"] = time.perf_counter() - started
+
+    # An edit made outside the bot: only the _watch() poll can notice it.
+    path = config.KEYWORDS_FILE
+    before = config.reloads(path)
+    backend.touch(path)
+    started = time.perf_counter()
+    deadline = started + config.RELOAD_CHECK_INTERVAL + 10 * args.delay + 2.0
+    while config.reloads(path) == before and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    result["reloaded"] = config.reloads(path) != before
+    result["reload"] = time.perf_counter() - started
+
+    await config.stop()
+    await monitor.stop()
+    result["lag"] = monitor.snapshot()["lag"]
+    result["samples"] = monitor.snapshot()["samples"]
+    return result
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    import config
+
+    keywords, _ = synthetic.keyword_sets(100)
+    backend = synthetic.use_memory_storage({
+        config.SETTINGS_FILE: synthetic.settings(args.guilds),
+        config.KEYWORDS_FILE: keywords,
+    }, backend_class=SlowBackend)
+    backend.delay = args.delay
+
+    result = asyncio.run(run(args, backend))
+    lag = result["lag"]
+    print(f"storage calls delayed {args.delay * 1000:.0f} ms each:")
+    print(f"  config.start()          {result['start']:.2f} s")
+    print(f"  {args.saves} x 2 saves + flush  {result['saves']:.2f} s")
+    print(f"  outside edit reloaded   {'after %.2f s' % result['reload'] if result['reloaded'] else 'NEVER'}")
+    print(f"  loop lag over {result['samples']} samples: p50 {lag['recent_p50'] * 1000:.2f} ms, "
+          f"p99 {lag['recent_p99'] * 1000:.2f} ms, max {lag['max'] * 1000:.2f} ms "
+          f"(bound {args.bound * 1000:.0f} ms)")
+
+    failed = False
+    if lag["max"] > args.bound:
+        print(f"FAIL: the event loop lagged {lag['max'] * 1000:.1f} ms, over the {args.bound * 1000:.0f} ms bound")
+        failed = True
+    if not result["reloaded"]:
+        print("FAIL: the outside edit was never picked up")
+        failed = True
+    if not failed:
+        print("ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
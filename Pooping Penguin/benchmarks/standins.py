@@ -0,0 +1,113 @@
+"""
+Lightweight stand-ins for the discord.py objects MessagesCog touches,
+for driving it without a gateway (messages.py, replay.py).
+
+They only have the attributes and methods the on_message pipeline
+actually uses. Everything that would hit the API - channel.send(),
+message.add_reaction(), the help command a mention triggers - is
+appended to a Recorder instead, tagged with the index of the message
+being handled, so a run's output can be printed, saved and compared.
+"""
+
+
+class Recorder:
+    def __init__(self):
+        # [{"message": index, "kind": ..., "channel": id, ...}, ...]
+        self.responses = []
+        # index of the message being handled, set by the driver
+        self.current = None
+
+    def record(self, kind: str, channel_id: int, **fields):
+        self.responses.append({"message": self.current, "kind": kind, "channel": channel_id, **fields})
+
+
+class Guild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class Channel:
+    def __init__(self, channel_id: int, recorder: Recorder = None):
+        self.id = channel_id
+        self.recorder = recorder
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        if self.recorder is not None:
+            self.recorder.record("send", self.id, content=content)
+
+
+class User:
+    def __init__(self, user_id: int, bot: bool = False):
+        self.id = user_id
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+
+    def mentioned_in(self, message) -> bool:
+        if message.mention_everyone:
+            return True
+        return any(user.id == self.id for user in message.mentions)
+
+
+class Message:
+    def __init__(self, channel: Channel, author: User, content: str, guild: Guild = None,
+                 mentions=(), mention_everyone: bool = False):
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.guild = guild
+        self.mentions = list(mentions)
+        self.mention_everyone = mention_everyone
+
+    async def add_reaction(self, emoji):
+        recorder = self.channel.recorder
+        if recorder is not None:
+            recorder.record("react", self.channel.id, emoji=str(emoji))
+
+
+class HelpCommand:
+    """What bot.get_command("help") returns: records the call instead of
+    rendering the help embed (that's the help cog's job, not the
+    pipeline's)."""
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+
+    async def __call__(self, ctx, command=None):
+        self.recorder.record("help", ctx.channel.id, command=command)
+
+
+class HelpCog:
+    def __init__(self, command_names):
+        self._names = frozenset(command_names)
+
+    def command_names(self):
+        return self._names
+
+
+class Context:
+    def __init__(self, message: Message):
+        self.message = message
+        self.channel = message.channel
+        self.guild = message.guild
+        self.author = message.author
+
+
+class Bot:
+    """The slice of commands.Bot MessagesCog uses: its own user (for
+    mentions), get_context(), get_command("help") and get_cog("help")."""
+
+    def __init__(self, recorder: Recorder, user_id: int = 1, command_names=()):
+        self.user = User(user_id, bot=True)
+        self._help = HelpCommand(recorder)
+        self._help_cog = HelpCog(command_names)
+
+    async def get_context(self, message):
+        return Context(message)
+
+    def get_command(self, name):
+        return self._help if name == "help" else None
+
+    def get_cog(self, name):
+        return self._help_cog if name == "help" else None
@@ -0,0 +1,174 @@
+"""
+Synthetic data for `python -m benchmarks`, and the in-memory storage
+backend it's served from.
+
+Every generator is seeded, so the same scale always builds the same
+documents. SCALES are the presets for --scale. The documents are shaped
+like the real ones, at the current schema_version, with made-up text;
+filler() uses characters no keyword does, so a "miss" message really
+matches nothing.
+"""
+import json
+import random
+import string
+
+from migrations import document_name, upgrade
+
+SCALES = {
+    "small": {"keyword_sets": 10, "templates": 100, "guilds": 100},
+    "medium": {"keyword_sets": 1_000, "templates": 1_000, "guilds": 5_000},
+    "large": {"keyword_sets": 100_000, "templates": 10_000, "guilds": 50_000},
+}
+
+CJK_KEYWORDS = ["哭哭", "好帥", "音遊", "原神", "打機", "手元", "理論值", "鳥加", "全連", "很弱智"]
+# Nothing in a keyword is drawn from these, see filler().
+FILLER_CHARS = "0123456789 .,!?-_~ 的了是我你他在有這個"
+
+GAME_TERMS = {
+    "chunithm": {"display": "CHUNITHM", "aliases": ["chuni", "中二"], "top_tier": "虹", "full_combo": "AJ"},
+    "maimaidx": {"display": "maimai DX", "aliases": ["mai", "舞萌"], "top_tier": "彩", "full_combo": "AP+"},
+    "sdvx": {"display": "SDVX", "aliases": ["ボルテ"], "top_tier": "暴龍天", "full_combo": "PUC"},
+}
+# The copypasta template shapes, cycled through in order: template i of
+# the big type has shape i % len(TEMPLATE_SHAPES), and these are the
+# values each one takes positionally (for render()).
+TEMPLATE_SHAPES = [
+    ("{text} 真的很強 {filler}", ["hello"]),
+    ("{people}的{act}很弱智 {filler}", ["我", "打機"]),
+    ("{game} 又打了一整天 {{top_tier}} {{full_combo}} {filler}", ["chuni"]),
+    ("{name} 在 {game} 拿了 {{top_tier}}, {text} {filler}", ["penguin", "mai", "gg"]),
+]
+# Every placeholder any shape uses, for pick() with named values.
+NAMED_VALUES = {"text": "hello", "people": "我", "act": "打機", "game": "sdvx", "name": "penguin"}
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+
+
+def filler(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(FILLER_CHARS, k=length))
+
+
+def keyword_sets(count: int, seed: int = 1):
+    """A keyword_sets document with `count` sets of 1-3 keywords and 1-3
+    responses each, and the list of every keyword in it."""
+    rng = random.Random(seed)
+    sets = {}
+    keywords = []
+    for i in range(count):
+        kws = [rng.choice(CJK_KEYWORDS) if rng.random() < 0.05 else _word(rng) for _ in range(rng.randint(1, 3))]
+        keywords += kws
+        sets[f"set_{i}"] = {
+            "keywords": kws,
+            "responses": [f"response {i}.{j} {filler(rng, 20)}" for j in range(rng.randint(1, 3))],
+            "enabled": rng.random() > 0.05,
+        }
+    return {"sets": sets}, keywords
+
+
+def copypasta_types(templates: int, small_types: int = 200, seed: int = 1) -> dict:
+    """A copypasta_sets document: one type "bench" with `templates`
+    templates in TEMPLATE_SHAPES order and GAME_TERMS, plus
+    `small_types` ordinary ones (10 {text} templates each) for the
+    search cases."""
+    rng = random.Random(seed)
+    types = {
+        "bench": {
+            "templates": [
+                TEMPLATE_SHAPES[i % len(TEMPLATE_SHAPES)][0].replace("{filler}", filler(rng, rng.randint(10, 60)))
+                for i in range(templates)
+            ],
+            "placeholders": ["text", "people", "act", "game", "name"],
+            "enabled": True,
+            "game_terms": GAME_TERMS,
+        },
+    }
+    for i in range(small_types):
+        words = [_word(rng) for _ in range(20)] + CJK_KEYWORDS
+        types[f"type_{i}"] = {
+            "templates": ["{text} " + " ".join(rng.choices(words, k=rng.randint(5, 20))) for _ in range(10)],
+            "placeholders": ["text"],
+            "enabled": True,
+        }
+    return {"types": types}
+
+
+def settings(guilds: int, seed: int = 1) -> dict:
+    """A vote_settings document for `guilds` servers: every one has a
+    language, and some have autoreact channels, !feature switches and
+    !setrepeat overrides, roughly in the proportions a real bot sees."""
+    rng = random.Random(seed)
+    doc = {"required_votes": 3, "admin_only": False, "language": {}, "autoreact": {},
+           "repeat_threshold": {}, "features": {}}
+    for i in range(guilds):
+        guild_id = str(10**17 + i)
+        doc["language"][guild_id] = rng.choice(("english", "chinese"))
+        if rng.random() < 0.05:
+            channel_id = str(2 * 10**17 + i)
+            doc["autoreact"][channel_id] = {"emoji": "🐧", "user_id": rng.choice((None, str(3 * 10**17 + i)))}
+        if rng.random() < 0.1:
+            doc["features"][guild_id] = {"echo": False}
+        if rng.random() < 0.1:
+            doc["repeat_threshold"][guild_id] = rng.randint(2, 10)
+    return doc
+
+
+class MemoryBackend:
+    """Storage backend (see storage.py) over a dict of serialized
+    documents: reads parse the stored JSON and writes serialize it, like
+    the JSON backend minus the disk. touch() changes a document's
+    signature without changing it, to force the next load to re-read."""
+
+    name = "memory"
+    read_size = 0
+
+    def __init__(self, documents: dict):
+        self._payloads = {}
+        self._versions = {}
+        for path, document in documents.items():
+            self.write(path, document)
+
+    def signature(self, path):
+        version = self._versions.get(path)
+        return None if version is None else (version, len(self._payloads[path]))
+
+    def read(self, path):
+        payload = self._payloads.get(path)
+        if payload is None:
+            return None
+        self.read_size = len(payload)
+        return json.loads(payload)
+
+    def prepare(self, path, data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def write(self, path, data):
+        return self.commit(path, self.prepare(path, data))
+
+    def commit(self, path, payload):
+        self._payloads[path] = payload
+        self.touch(path)
+        return len(payload)
+
+    def touch(self, path):
+        self._versions[path] = self._versions.get(path, 0) + 1
+
+    def close(self):
+        pass
+
+
+def use_memory_storage(documents: dict, backend_class=MemoryBackend) -> MemoryBackend:
+    """Point config.py at a MemoryBackend (or `backend_class`, a subclass)
+    holding `documents` (path -> document, upgraded in place to the
+    current schema first), dropping whatever it had cached. Anything not
+    in `documents` starts out as its default, as a missing file would."""
+    import config
+
+    for path, document in documents.items():
+        upgrade(document_name(path), document)
+    backend = backend_class(documents)
+    config._backend = backend
+    config._cache.clear()
+    config._dirty.clear()
+    return backend
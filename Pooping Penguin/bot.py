@@ -3,7 +3,12 @@ Bot entry point.
 
 Everything that used to be one 1000-line vto.py is now:
   - config.py            settings/votes/keywords JSON persistence
-  - i18n.py               t() / get_guild_language() translation helper
+  - log_pipeline.py       queued, sampled, rotating JSON-lines logging
+  - loop_monitor.py       event-loop lag histogram and stall detection
+  - metrics.py            counters/gauges/histograms, served on localhost
+                           in the Prometheus text format
+  - i18n.py               t() message catalog (locales/) / get_guild_language()
+  - guild_settings.py     in-memory per-guild language + vote config for the cogs
   - keyword_manager.py    engine behind the global keyword-triggered responses
   - legacy_copypasta.py   the original hardcoded copypasta strings (only
                            used by migrate_keywords.py now, kept for reference)
@@ -41,30 +46,27 @@ bot.tree.sync(). A few things to know about this:
     other setup items still needed.
 """
 import asyncio
-import logging  # Logs for debugging, Comment out this line if not needed
 import os
 
 import discord
 from discord.ext import commands
 
+import config
+import loop_monitor
+import metrics
 from key import api  # api = "your-bot-token-here", see key.py.example
+from log_pipeline import get_logger, setup_logging, stop_logging
 
 # Optional: set this env var to a server ID you control for instant
 # (guild-scoped) slash command sync during development. Leave unset to
 # sync globally (works everywhere, but can take up to ~1h to appear).
 DEV_GUILD_ID = os.environ.get("DEV_GUILD_ID")
 
-# Configure logging format and level, Comment out this section if not needed
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(),                # Output to terminal
-        logging.FileHandler('bot_responses.log') # Save to a file
-    ]
-)
-logger = logging.getLogger('DiscordBot')
-# L__________
+# Logging goes through a background writer thread with size-based
+# rotation, JSON-lines output and per-category sampling, all configured
+# through LOG_* env vars - see log_pipeline.py.
+setup_logging()
+logger = get_logger("commands")
 
 
 # Cog modules to load. Order doesn't matter for these - none of them
@@ -94,6 +96,19 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 # help_cog.py provides its own !help, so the default one has to go.
 bot.remove_command("help")
 
+# outcome: invoked, completed, error - see the listeners below
+COMMANDS = metrics.counter("poopenguin_commands_total", "Commands run, per command and outcome.",
+                           ("command", "outcome"))
+# Read off the bot whenever /metrics is scraped, see metrics.py.
+metrics.gauge("poopenguin_gateway_latency_seconds",
+              "Time between the last gateway heartbeat and its acknowledgement.").set_function(
+    lambda: bot.latency if bot.ws is not None else None)
+metrics.gauge("poopenguin_guilds", "Guilds the bot is in.").set_function(lambda: len(bot.guilds))
+
+def _command_name(ctx):
+    # ctx.command is None for "!something" that isn't a command
+    return ctx.command.qualified_name if ctx.command is not None else "unknown"
+
 async def rotate_status():
     while True:
         for status in STATUS_MESSAGES:
@@ -149,24 +164,45 @@ async def on_ready():
 @bot.event
 async def on_command(ctx):
     # Logs when a command is received
-    logger.info(f"User {ctx.author} ({ctx.author.id}) invoked command: !{ctx.command}")
+    logger.info("User %s (%s) invoked command: !%s", ctx.author, ctx.author.id, ctx.command)
+    COMMANDS.labels(_command_name(ctx), "invoked").inc()
 
 @bot.event
 async def on_command_completion(ctx):
     # Logs when a command successfully finished executing
-    logger.info(f"Successfully responded to {ctx.author} for command: !{ctx.command}")
+    logger.info("Successfully responded to %s for command: !%s", ctx.author, ctx.command)
+    COMMANDS.labels(_command_name(ctx), "completed").inc()
 
 @bot.event
 async def on_command_error(ctx, error):
     # Logs errors/failures
-    logger.error(f"Error executing !{ctx.command} for {ctx.author}: {error}")
+    logger.error("Error executing !%s for %s: %s", ctx.command, ctx.author, error)
+    COMMANDS.labels(_command_name(ctx), "error").inc()
 # L__________
 
 async def main():
-    async with bot:
-        for extension in INITIAL_EXTENSIONS:
-            await bot.load_extension(extension)
-        await bot.start(api)
+    # Load every data file into memory off the event loop before any cog
+    # touches one, so no cog ever waits on disk (see config.py).
+    await config.start()
+    # Event-loop lag sampling and stall detection for the whole run, see
+    # loop_monitor.py (LOOP_MONITOR=0 turns it off).
+    loop_monitor.start(bot)
+    # Counters and gauges on http://127.0.0.1:9464/metrics, see
+    # metrics.py (METRICS=0 leaves the listener off).
+    await metrics.start()
+    try:
+        async with bot:
+            for extension in INITIAL_EXTENSIONS:
+                await bot.load_extension(extension)
+            await bot.start(api)
+    finally:
+        # config.py batches writes for a moment before putting them on
+        # disk (see its docstring) - make sure nothing saved in the last
+        # second before shutdown gets lost.
+        await metrics.stop()
+        await loop_monitor.stop()
+        await config.stop()
+        stop_logging()
 
 
 if __name__ == "__main__":
@@ -1,30 +1,25 @@
 """
 Guild-configuration commands: !setperms/​/setperms (grant a role access
 to a channel), !autoreact/​/autoreact (configure/disable per-channel
-auto-reactions), and !lang/​/lang (toggle the guild's help/response
-language).
-
-These mirror their old on_message.py behaviour exactly, including the
-fact that !lang and !autoreact are NOT admin-restricted in the
-original bot (only !setperms is) - that's preserved here rather than
-"fixed", since tightening permissions wasn't asked for and could lock
-people out of features they're used to.
-
-Converted to commands.hybrid_command so the text and slash versions
-share one implementation. channel_id/role_id are kept as plain string
-IDs (rather than discord.TextChannel/discord.Role converters) so
-!setperms keeps accepting raw IDs exactly like before - see GAPS.md
-for the option of upgrading these to native slash channel/role pickers.
-
-Also adds `!sync` (bot owner only, prefix-only - see its docstring for
-why it's not a hybrid/slash command) for manually re-registering slash
-commands with Discord on demand, instead of only on bot startup.
+auto-reactions), !lang/​/lang (toggle the guild's help/response
+language), !setrepeat/​/setrepeat (repeat-echo threshold) and
+!feature/​/feature (switch keyword responses or the echo off per
+server/channel), plus the owner-only, prefix-only !sync and !loop.
+
+As in the original bot, !lang and !autoreact aren't admin-restricted;
+the others are. Commands that change a channel's route dispatch
+"routing_update", so messages_cog.py rebuilds just the affected
+channel(s).
 """
 import discord
 from discord.ext import commands
 
+import loop_monitor
 from config import load_settings, save_settings
-from i18n import t, get_guild_language
+from guild_settings import guild_settings
+from i18n import available_languages, t
+from repeat_tracker import MAX_REPEAT_THRESHOLD, MIN_REPEAT_THRESHOLD, REPEAT_THRESHOLD, get_repeat_threshold
+from routing import FEATURE_FLAGS, feature_enabled
 
 
 class AdminCog(commands.Cog, name="admin"):
@@ -32,7 +27,7 @@ class AdminCog(commands.Cog, name="admin"):
         self.bot = bot
 
     def _lang(self, ctx):
-        return get_guild_language(load_settings(), ctx.guild.id)
+        return guild_settings.language(ctx.guild.id)
 
     @commands.hybrid_command(
         name="setperms",
@@ -50,8 +45,7 @@ class AdminCog(commands.Cog, name="admin"):
             role_id_int = int(role_id)
         except ValueError:
             await ctx.send(t(language,
-                "Channel ID and Role ID must be valid numbers.",
-                "頻道 ID 和角色 ID 必須是有效數字。"))
+                "admin.channel_id_and_role"))
             return
 
         channel = ctx.guild.get_channel_or_thread(channel_id_int)
@@ -59,19 +53,16 @@ class AdminCog(commands.Cog, name="admin"):
 
         if not channel:
             await ctx.send(t(language,
-                "Channel not found. Please provide a valid channel ID.",
-                "找不到頻道。請提供有效的頻道 ID。"))
+                "admin.channel_not_found_please"))
             return
         if not role:
             await ctx.send(t(language,
-                "Role not found. Please provide a valid role ID.",
-                "找不到角色。請提供有效的角色 ID。"))
+                "admin.role_not_found_please"))
             return
 
         if not ctx.guild.me.guild_permissions.manage_channels:
             await ctx.send(t(language,
-                "I don't have permission to manage channels!",
-                "我沒有管理頻道的權限！"))
+                "admin.i_dont_have_permission"))
             return
 
         try:
@@ -84,14 +75,13 @@ class AdminCog(commands.Cog, name="admin"):
             }
             await channel.edit(overwrites={**channel.overwrites, **permissions})
             await ctx.send(t(language,
-                f"Permissions updated: Role {role.mention} can now view and send messages in {channel.mention}.",
-                f"權限已更新：角色 {role.mention} 現在可以在 {channel.mention} 中查看和發送消息。"))
+                "admin.permissions_updated_role_can",
+                role_mention=role.mention, channel_mention=channel.mention))
         except discord.Forbidden:
             await ctx.send(t(language,
-                "Failed to update permissions. Missing permissions.",
-                "無法更新權限。缺少權限。"))
+                "admin.failed_to_update_permissions"))
         except Exception as e:
-            await ctx.send(t(language, f"An error occurred: {str(e)}", f"發生錯誤：{str(e)}"))
+            await ctx.send(t(language, "admin.an_error_occurred", e=e))
 
     @commands.hybrid_command(
         name="autoreact",
@@ -102,11 +92,11 @@ class AdminCog(commands.Cog, name="admin"):
     async def autoreact(self, ctx, emoji: str = None, user: discord.Member = None):
         """Sets an emoji to auto-react to messages from a specific user or all messages in the channel, or disables auto-reactions."""
         settings = load_settings()
-        language = get_guild_language(settings, ctx.guild.id)
+        language = guild_settings.language(ctx.guild.id)
         channel_id = str(ctx.channel.id)
 
         if not ctx.guild.me.guild_permissions.add_reactions:
-            await ctx.send(t(language, "I don't have permission to add reactions!", "我沒有添加反應的權限！"))
+            await ctx.send(t(language, "admin.i_dont_have_permission_2"))
             return
 
         settings["autoreact"] = settings.get("autoreact", {})
@@ -117,10 +107,10 @@ class AdminCog(commands.Cog, name="admin"):
                 await temp_message.add_reaction(emoji)
                 await temp_message.delete()
             except discord.HTTPException:
-                await ctx.send(t(language, "Invalid emoji. Please provide a valid emoji.", "無效的表情符號。請提供有效的表情符號。"))
+                await ctx.send(t(language, "admin.invalid_emoji_please_provide"))
                 return
             except discord.Forbidden:
-                await ctx.send(t(language, "I don't have permission to add reactions!", "我沒有添加反應的權限！"))
+                await ctx.send(t(language, "admin.i_dont_have_permission_2"))
                 return
 
             settings["autoreact"][channel_id] = {
@@ -128,39 +118,141 @@ class AdminCog(commands.Cog, name="admin"):
                 "user_id": str(user.id) if user else None,
             }
             save_settings(settings)
+            self.bot.dispatch("routing_update", ctx.guild.id, ctx.channel.id)
             if user:
                 await ctx.send(t(language,
-                    f"Auto-reactions enabled: Will react with {emoji} to messages from {user.mention} in {ctx.channel.mention}.",
-                    f"自動反應已啟用：將對 {ctx.channel.mention} 中 {user.mention} 的消息使用 {emoji} 進行反應。"))
+                    "admin.auto_reactions_enabled_will",
+                    emoji=emoji, user_mention=user.mention, channel_mention=ctx.channel.mention))
             else:
                 await ctx.send(t(language,
-                    f"Auto-reactions enabled: Will react with {emoji} to all messages in {ctx.channel.mention}.",
-                    f"自動反應已啟用：將對 {ctx.channel.mention} 中的所有消息使用 {emoji} 進行反應。"))
+                    "admin.auto_reactions_enabled_will_2", emoji=emoji, channel_mention=ctx.channel.mention))
         else:
             if channel_id in settings["autoreact"]:
                 del settings["autoreact"][channel_id]
                 save_settings(settings)
+                self.bot.dispatch("routing_update", ctx.guild.id, ctx.channel.id)
                 await ctx.send(t(language,
-                    f"Auto-reactions disabled in {ctx.channel.mention}.",
-                    f"已在 {ctx.channel.mention} 中禁用自動反應。"))
+                    "admin.auto_reactions_disabled_in", channel_mention=ctx.channel.mention))
             else:
                 await ctx.send(t(language,
-                    f"Auto-reactions were not enabled in {ctx.channel.mention}.",
-                    f"{ctx.channel.mention} 中尚未啟用自動反應。"))
+                    "admin.auto_reactions_were_not", channel_mention=ctx.channel.mention))
 
     @commands.hybrid_command(
         name="lang",
-        description="Toggles the language of the bot's help panel between English and Chinese.")
-    async def lang(self, ctx):
-        """Toggles the language of the bot's help panel between English and Chinese."""
+        description="Switches the bot's language for this server (toggles English/Chinese by default).")
+    @discord.app_commands.describe(
+        language="Language to switch to, e.g. 'english' or 'chinese' (omit to switch to the next one)")
+    async def lang(self, ctx, language: str = None):
+        """Switches the bot's language for this server (toggles English/Chinese by default)."""
+        languages = available_languages()
+        current_language = guild_settings.language(ctx.guild.id)
+        if language is None:
+            # Cycle through every installed catalog - with just english
+            # and chinese that's the original toggle.
+            position = languages.index(current_language) if current_language in languages else -1
+            new_language = languages[(position + 1) % len(languages)]
+        else:
+            new_language = language.strip().lower()
+            if new_language not in languages:
+                await ctx.send(t(current_language, "admin.unknown_language",
+                                 language=language, languages=", ".join(f"`{lang}`" for lang in languages)))
+                return
+        guild_settings.set_language(ctx.guild.id, new_language)
+        await ctx.send(t(new_language, "admin.language_set_to", language_name=t(new_language, "language.name")))
+
+    @commands.hybrid_command(
+        name="setrepeat",
+        description="Sets how many different users must repeat a message before the bot echoes it (Admin only).")
+    @discord.app_commands.describe(
+        count=f"Number of different users ({MIN_REPEAT_THRESHOLD}-{MAX_REPEAT_THRESHOLD}), or 'default'",
+        scope="'server' (default) for the whole server, or 'channel' for just this channel")
+    @commands.has_permissions(administrator=True)
+    async def setrepeat(self, ctx, count: str, scope: str = "server"):
+        """Sets how many different users must repeat a message before the bot echoes it (Admin only)."""
+        settings = load_settings()
+        language = guild_settings.language(ctx.guild.id)
+
+        scope = scope.lower()
+        if scope not in ("server", "channel"):
+            await ctx.send(t(language,
+                "admin.scope_must_be_server"))
+            return
+        key = str(ctx.channel.id) if scope == "channel" else str(ctx.guild.id)
+        where = ctx.channel.mention if scope == "channel" else t(language, "admin.this_server")
+        overrides = settings.setdefault("repeat_threshold", {})
+        changed_channel = ctx.channel.id if scope == "channel" else None
+
+        if count.lower() == "default":
+            overrides.pop(key, None)
+            save_settings(settings)
+            self.bot.dispatch("routing_update", ctx.guild.id, changed_channel)
+            current = get_repeat_threshold(settings, ctx.guild.id, ctx.channel.id)
+            await ctx.send(t(language,
+                "admin.repeat_threshold_for_reset", where=where, current=current))
+            return
+
+        try:
+            num = int(count)
+        except ValueError:
+            num = None
+        if num is None or not MIN_REPEAT_THRESHOLD <= num <= MAX_REPEAT_THRESHOLD:
+            await ctx.send(t(language,
+                "admin.use_a_number_from",
+                min_repeat_threshold=MIN_REPEAT_THRESHOLD, max_repeat_threshold=MAX_REPEAT_THRESHOLD,
+                repeat_threshold=REPEAT_THRESHOLD))
+            return
+
+        overrides[key] = num
+        save_settings(settings)
+        self.bot.dispatch("routing_update", ctx.guild.id, changed_channel)
+        await ctx.send(t(language,
+            "admin.the_bot_will_now", num=num, where=where))
+
+    @commands.hybrid_command(
+        name="feature",
+        description="Turns keyword responses or the repeat echo on/off for this server or channel (Admin only).")
+    @discord.app_commands.describe(
+        feature="'keywords' (keyword-triggered responses) or 'echo' (repeating repeated messages)",
+        state="'on', 'off', or 'default' to drop this scope's setting",
+        scope="'server' (default) for the whole server, or 'channel' for just this channel")
+    @commands.has_permissions(administrator=True)
+    async def feature(self, ctx, feature: str, state: str, scope: str = "server"):
+        """Turns keyword responses or the repeat echo on/off for this server or channel (Admin only)."""
         settings = load_settings()
-        guild_id = str(ctx.guild.id)
-        current_language = get_guild_language(settings, guild_id)
-        new_language = "chinese" if current_language == "english" else "english"
-        settings["language"] = settings.get("language", {})
-        settings["language"][guild_id] = new_language
+        language = guild_settings.language(ctx.guild.id)
+
+        feature, state, scope = feature.lower(), state.lower(), scope.lower()
+        if feature not in FEATURE_FLAGS:
+            await ctx.send(t(language,
+                "admin.feature_must_be_keywords"))
+            return
+        if state not in ("on", "off", "default"):
+            await ctx.send(t(language,
+                "admin.state_must_be_on"))
+            return
+        if scope not in ("server", "channel"):
+            await ctx.send(t(language,
+                "admin.scope_must_be_server"))
+            return
+
+        key = str(ctx.channel.id) if scope == "channel" else str(ctx.guild.id)
+        where = ctx.channel.mention if scope == "channel" else t(language, "admin.this_server")
+        features = settings.setdefault("features", {})
+        if state == "default":
+            entry = features.get(key, {})
+            entry.pop(feature, None)
+            if not entry:
+                features.pop(key, None)
+        else:
+            features.setdefault(key, {})[feature] = state == "on"
         save_settings(settings)
-        await ctx.send(t(new_language, f"Language set to {new_language.capitalize()}.", "語言設置為中文。"))
+        self.bot.dispatch("routing_update", ctx.guild.id, ctx.channel.id if scope == "channel" else None)
+
+        enabled = feature_enabled(settings, feature, ctx.guild.id, ctx.channel.id)
+        status = t(language, "admin.state_on" if enabled else "admin.state_off")
+        await ctx.send(t(language,
+            "admin.updated_for_now_in",
+            feature=feature, where=where, status=status, channel_mention=ctx.channel.mention))
 
     @commands.command(name="sync", hidden=True)
     @commands.is_owner()
@@ -254,6 +346,68 @@ class AdminCog(commands.Cog, name="admin"):
         except discord.HTTPException as e:
             await ctx.send(f"Sync failed: {e}")
 
+    @commands.command(name="loop", hidden=True)
+    @commands.is_owner()
+    async def loop(self, ctx, arg: str = None):
+        """Event-loop health from loop_monitor.py (bot owner only).
+
+        Prefix-only like !sync: it's for diagnosing a slow or
+        disconnecting bot, which is exactly when slash commands might
+        not be getting through.
+
+          !loop        - lag percentiles and histogram, gateway heartbeat,
+                         and the most recent stalls (the loop held for
+                         LOOP_SLOW_SECONDS or longer) with where it was
+          !loop <n>    - the loop thread's stack during recent stall <n>
+          !loop reset  - start counting from now
+        """
+        snap = loop_monitor.snapshot()
+        if not snap["running"]:
+            await ctx.send("The loop monitor isn't running (LOOP_MONITOR=0?).")
+            return
+        if arg == "reset":
+            loop_monitor.monitor.reset()
+            await ctx.send("Loop monitor stats reset.")
+            return
+
+        stalls = list(reversed(snap["recent_stalls"]))
+        if arg is not None:
+            if not arg.isdigit() or not 1 <= int(arg) <= len(stalls):
+                await ctx.send(f"Usage: `!loop [reset|1-{len(stalls)}]`" if stalls else "No stalls recorded.")
+                return
+            stall = stalls[int(arg) - 1]
+            header = f"Stall {arg}: {stall['duration']:.3f} s in {stall['where']} (task {stall['task']})\n"
+            stack = stall["stack"][-(1900 - len(header)):]
+            await ctx.send(f"{header}```\n{stack}```")
+            return
+
+        def ms(seconds):
+            return f"{seconds * 1000:.1f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+        lag = snap["lag"]
+        lines = [
+            f"Event loop since <t:{int(snap['since'])}:R>: {snap['samples']} samples, one every {snap['interval']} s",
+            f"Lag: mean {ms(lag['mean'])}, max {ms(lag['max'])}; last 5 min p50 {ms(lag['recent_p50'])}, "
+            f"p90 {ms(lag['recent_p90'])}, p99 {ms(lag['recent_p99'])}",
+        ]
+        heartbeat = snap["heartbeat"]
+        if heartbeat["interval"] and heartbeat["latency"] != float("inf"):
+            lines.append(f"Gateway heartbeat every {heartbeat['interval']:.1f} s, latency {ms(heartbeat['latency'])}")
+        lines.append(f"Stalls of {ms(snap['slow_seconds'])}+: {snap['stalls']}, "
+                     f"heartbeat warnings: {snap['heartbeat_warnings']}")
+        for i, stall in enumerate(stalls[:5], 1):
+            lines.append(f"  {i}. {stall['duration']:.3f} s <t:{int(stall['at'])}:R> in "
+                         f"`{stall['where']}` ({stall['task']})")
+        buckets = snap["histogram"]["buckets"]
+        histogram = []
+        for bound, count in buckets:
+            if count:
+                label = f"<= {ms(bound)}" if bound is not None else f"> {ms(buckets[-2][0])}"
+                histogram.append(f"{label:>12} {count}")
+        if histogram:
+            lines.append("```\n" + "\n".join(histogram) + "```")
+        await ctx.send("\n".join(lines))
+
 
 async def setup(bot):
     await bot.add_cog(AdminCog(bot))
\ No newline at end of file
@@ -17,13 +17,16 @@ Three seed types ship in data/copypasta_sets.json:
 Each type has its own pool of templates (see copypasta_manager.py), and a
 template is only ever picked from the pool matching the requested type -
 that's what stops a "tag" line accidentally getting used to answer a
-"song" request or similar mismatches. On top of that, the cog remembers
-the last template used per (server, type) so the exact same line doesn't
-fire twice back-to-back.
+"song" request or similar mismatches. On top of that, each (server, type)
+rotates through its pool (see shuffle_bag.py), so no line fires again
+until every other line in the pool has had its turn - and that rotation
+survives restarts.
 
 Management subcommands (`!copypasta add/remove/create/delete/enable/
 disable/list/info`) let admins grow each pool live, the same way
 !keyword manages keyword sets - no redeploy needed to add more lines.
+The `list` and `info` menus are persistent button menus (menus.py),
+rendered per click from the manager's data, so they survive restarts.
 
 --- Slash commands ---
 This is a commands.hybrid_group with no fallback:
@@ -42,6 +45,8 @@ This is a commands.hybrid_group with no fallback:
   - `type` now offers autocomplete (suggests existing type names only -
     aliases still work if typed by hand, but aren't suggested, so the
     dropdown doesn't show two entries for what's really one type).
+    Suggestions come from an in-memory name index (name_index.py):
+    exact match, then prefix matches, then substring matches.
 
 `values` used to be `*values` (any number of positional arguments),
 which slash commands can't do - Discord options are a fixed list, not
@@ -59,9 +64,11 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from config import load_settings
-from i18n import t, get_guild_language
+from guild_settings import guild_settings
+from i18n import t
 from copypasta_manager import CopypastaManager, CopypastaError, extract_placeholders
+from menus import Menu, MenuSelect, SearchModal, register_menu, unregister_menu
+from shuffle_bag import ShuffleBagSampler
 
 # How many copypasta types are shown per page in the `!copypasta list` menu.
 COPYPASTA_PAGE_SIZE = 5
@@ -85,106 +92,53 @@ RESERVED_NAMES = {"list", "info", "show", "create", "delete", "enable", "disable
 AUTOCOMPLETE_LIMIT = 25
 
 
-class CopypastaJumpModal(discord.ui.Modal):
-    """Popup asking for a page number, used by the Jump button on both
-    CopypastaMenu and CopypastaInfoMenu. Only needs `menu.current_page`,
-    `menu._total_pages()`, `menu.get_embed()` and `menu.language` on the
-    menu it's attached to (plus an optional `template_select` to refresh
-    on CopypastaInfoMenu), so one modal class covers both."""
-
-    def __init__(self, menu, language: str):
-        total = menu._total_pages()
-        super().__init__(title=t(language, "Jump to Page", "跳至頁面"))
-        self.menu = menu
-        self.total = total
-        self.page_input = discord.ui.TextInput(
-            label=t(language, f"Page number (1-{total})", f"頁碼（1-{total}）"),
-            placeholder="1",
-            required=True,
-            max_length=10,
-        )
-        self.add_item(self.page_input)
-
-    async def on_submit(self, interaction: discord.Interaction):
-        language = self.menu.language
-        raw = self.page_input.value.strip()
-        if not raw.isdigit() or not (1 <= int(raw) <= self.total):
-            await interaction.response.send_message(
-                t(language, f"Please enter a page number between 1 and {self.total}.",
-                  f"請輸入介於 1 到 {self.total} 之間的頁碼。"),
-                ephemeral=True)
-            return
-        self.menu.current_page = int(raw) - 1
-        if getattr(self.menu, "template_select", None):
-            self.menu.template_select.refresh()
-        await interaction.response.edit_message(embed=self.menu.get_embed(), view=self.menu)
-
+class CopypastaListMenu(Menu):
+    """Paginated, searchable browser for copypasta types, in the same
+    style as KeywordListMenu in keywords_cog.py (Previous/Next/Close
+    buttons), plus a Search button that finds types by name or template
+    text, best match first (CopypastaManager.type_ids()). Needed
+    because a plain embed with one field per type runs into Discord's
+    25-field cap once there are enough types to matter."""
 
-class CopypastaSearchModal(discord.ui.Modal):
-    """Popup text box used by the Search button on CopypastaMenu."""
+    key = "cpl"
+    closed_message = "copypasta.copypasta_menu_closed"
+    close_row = 1
 
-    def __init__(self, menu: "CopypastaMenu", language: str):
-        super().__init__(title=t(language, "Search Copypasta Types", "搜尋迷因文本類型"))
-        self.menu = menu
-        self.term = discord.ui.TextInput(
-            label=t(language, "Type name", "類型名稱"),
-            placeholder=t(language, "e.g. tag", "例如：tag"),
-            required=True,
-            max_length=100,
-        )
-        self.add_item(self.term)
+    def __init__(self, manager: CopypastaManager, page_size: int = COPYPASTA_PAGE_SIZE):
+        self.manager = manager
+        self.page_size = page_size
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await self.menu.apply_search(interaction, self.term.value)
+    def page_count(self, language: str, arg: str) -> int:
+        return max(1, math.ceil(len(self.manager.type_ids(arg)) / self.page_size))
 
+    def extra_buttons(self, language: str, page: int, arg: str) -> list:
+        return [
+            ("search", t(language, "menus.search"), discord.ButtonStyle.blurple, 1),
+            ("clear", t(language, "menus.clear_search"), discord.ButtonStyle.grey, 1),
+        ]
 
-class CopypastaMenu(discord.ui.View):
-    """Paginated, searchable browser for copypasta types, in the same
-    style as KeywordMenu in keywords_cog.py (Previous/Next/Close
-    buttons), plus a Search button that filters by type name. Needed
-    because a plain embed with one field per type runs into Discord's
-    25-field cap once there are enough types to matter."""
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        type_ids = self.manager.type_ids(arg)
+        total_pages = max(1, math.ceil(len(type_ids) / self.page_size))
+        start = page * self.page_size
+        types = self.manager.list_types()
 
-    def __init__(self, ctx, types: dict, language: str, page_size: int = COPYPASTA_PAGE_SIZE, timeout: int = 180):
-        super().__init__(timeout=timeout)
-        self.ctx = ctx
-        self.language = language
-        self.page_size = page_size
-        self.all_items = sorted(types.items())
-        self.filtered_items = self.all_items
-        self.search_term = None
-        self.current_page = 0
-
-        self.previous_button.label = t(language, "Previous", "上一頁")
-        self.next_button.label = t(language, "Next", "下一頁")
-        self.jump_button.label = t(language, "🔢 Jump", "🔢 跳頁")
-        self.search_button.label = t(language, "🔍 Search", "🔍 搜尋")
-        self.clear_button.label = t(language, "Clear Search", "清除搜尋")
-        self.close_button.label = t(language, "Close", "關閉")
-
-    def _total_pages(self):
-        return max(1, math.ceil(len(self.filtered_items) / self.page_size))
-
-    def get_embed(self):
-        total_pages = self._total_pages()
-        self.current_page = max(0, min(self.current_page, total_pages - 1))
-        start = self.current_page * self.page_size
-        page_items = self.filtered_items[start:start + self.page_size]
-
-        title = t(self.language, "Copypasta Types", "迷因文本類型")
-        if self.search_term:
-            title += t(self.language, f' — search: "{self.search_term}"', f'－搜尋：「{self.search_term}」')
+        title = t(language, "copypasta.copypasta_types")
+        if arg:
+            title += t(language, "copypasta.search_2", search_term=arg)
 
         embed = discord.Embed(title=title, color=discord.Color.blue())
 
-        if not page_items:
-            embed.description = t(self.language,
-                "No copypasta types match that search.", "沒有符合搜尋條件的迷因文本類型。")
+        page_ids = type_ids[start:start + self.page_size]
+        if not page_ids:
+            embed.description = t(language,
+                "copypasta.no_copypasta_types_match")
         else:
-            for type_id, s in page_items:
+            for type_id in page_ids:
+                s = types[type_id]
                 enabled = s.get("enabled", True)
-                status = t(self.language, "✅ enabled", "✅ 已啟用") if enabled else \
-                    t(self.language, "❌ disabled", "❌ 已停用")
+                status = t(language, "copypasta.enabled") if enabled else \
+                    t(language, "copypasta.disabled")
                 count = len(s.get("templates", []))
                 placeholders = s.get("placeholders") or ["text"]
                 # This is the union of placeholders across every template
@@ -197,60 +151,24 @@ class CopypastaMenu(discord.ui.View):
                     inline=False
                 )
 
-        embed.set_footer(text=t(self.language,
-            f"Page {self.current_page + 1}/{total_pages} | {len(self.filtered_items)} type(s) | "
-            f"Use `!copypasta info <type>` for full details.",
-            f"第 {self.current_page + 1}/{total_pages} 頁 | 共 {len(self.filtered_items)} 個類型 | "
-            f"使用 `!copypasta info <類型>` 查看完整詳情。"))
+        embed.set_footer(text=t(language,
+            "copypasta.page_type_s_use",
+            current_page=page + 1, total_pages=total_pages,
+            filtered_items_count=len(type_ids)))
         return embed
 
-    async def apply_search(self, interaction: discord.Interaction, term: str):
-        term = term.strip().lower()
-        self.search_term = term
-        self.filtered_items = [
-            (type_id, s) for type_id, s in self.all_items if term in type_id.lower()
-        ]
-        self.current_page = 0
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.ctx.author.id:
-            await interaction.response.send_message(
-                t(self.language, "This isn't your menu to control.", "這不是您可以操作的選單。"),
-                ephemeral=True)
-            return False
-        return True
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(CopypastaJumpModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.blurple, row=1)
-    async def search_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(CopypastaSearchModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=1)
-    async def clear_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.search_term = None
-        self.filtered_items = self.all_items
-        self.current_page = 0
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.red, row=1)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.edit_message(
-            content=t(self.language, "Copypasta menu closed.", "迷因文本選單已關閉。"), embed=None, view=None)
-        self.stop()
+    async def on_action(self, interaction: discord.Interaction, action: str, owner_id: int, page: int, arg: str):
+        if action == "search":
+            language = guild_settings.language(interaction.guild_id)
+            await interaction.response.send_modal(SearchModal(
+                self, owner_id, language,
+                title=t(language, "copypasta.search_copypasta_types"),
+                label=t(language, "copypasta.type_name_or_template"),
+                placeholder=t(language, "copypasta.e_g_tag")))
+        elif action == "clear":
+            await self.show(interaction, owner_id, 0, "")
+        else:
+            await super().on_action(interaction, action, owner_id, page, arg)
 
 
 class CopypastaValuesModal(discord.ui.Modal):
@@ -262,10 +180,8 @@ class CopypastaValuesModal(discord.ui.Modal):
     single field split on whitespace, the same way `!copypasta <type>
     <values>` already handles multi-placeholder values."""
 
-    def __init__(self, menu: "CopypastaInfoMenu", index: int, placeholders: list):
-        language = menu.language
-        type_id = menu.type_id
-        super().__init__(title=t(language, f"Fill in {type_id} #{index}", f"填入 {type_id} #{index}")[:45])
+    def __init__(self, menu: "CopypastaInfoMenu", type_id: str, index: int, placeholders: list, language: str):
+        super().__init__(title=t(language, "copypasta.fill_in", type_id=type_id, index=index)[:45])
         self.menu = menu
         self.type_id = type_id
         self.index = index
@@ -273,8 +189,7 @@ class CopypastaValuesModal(discord.ui.Modal):
         self.single_field = len(placeholders) > 5
 
         if self.single_field:
-            label = t(language, f"Values ({' '.join(placeholders)}), space-separated",
-                      f"值（{' '.join(placeholders)}），以空格分隔")
+            label = t(language, "copypasta.values_space_separated", placeholders=' '.join(placeholders))
             self.combined = discord.ui.TextInput(label=label[:45], required=True, max_length=200)
             self.add_item(self.combined)
         else:
@@ -288,20 +203,20 @@ class CopypastaValuesModal(discord.ui.Modal):
         values = self.combined.value.split() if self.single_field else [f.value for f in self.fields]
 
         try:
-            rendered = self.menu.cog.manager.render(self.type_id, self.index, values)
+            rendered = self.menu.manager.render(self.type_id, self.index, values)
         except CopypastaError as e:
             await interaction.response.send_message(str(e), ephemeral=True)
             return
 
-        # Keep the "don't repeat the same template twice in a row"
-        # tracking in sync with a manually-picked template too, so a
-        # regular !copypasta right after doesn't immediately reuse it.
-        self.menu.cog._last_used[(self.menu.ctx.guild.id, self.type_id)] = self.index
+        # Keep the server's template rotation in sync with a
+        # manually-picked template too, so a regular !copypasta right
+        # after doesn't immediately reuse it.
+        self.menu.manager.mark_used(self.type_id, self.index, interaction.guild_id)
         await interaction.response.send_message(rendered)
         # Close the menu afterwards so its Select/buttons go dead instead
         # of sitting there ready to spam out another generation from the
         # same message.
-        await self.menu.close_menu()
+        await self.menu.close_message(interaction, self.language)
 
 
 class CopypastaRandomModal(discord.ui.Modal):
@@ -314,25 +229,21 @@ class CopypastaRandomModal(discord.ui.Modal):
     pool. One field per placeholder when there's room, same 5-component
     cap/fallback as CopypastaValuesModal."""
 
-    def __init__(self, menu: "CopypastaInfoMenu"):
-        language = menu.language
-        type_id = menu.type_id
-        super().__init__(title=t(language, f"Random {type_id}", f"隨機 {type_id}")[:45])
+    def __init__(self, menu: "CopypastaInfoMenu", type_id: str, s: dict, language: str):
+        super().__init__(title=t(language, "copypasta.random", type_id=type_id)[:45])
         self.menu = menu
         self.type_id = type_id
         self.language = language
 
-        placeholders = menu.s.get("placeholders") or ["text"]
+        placeholders = s.get("placeholders") or ["text"]
         self.single_field = len(placeholders) > 5
 
         if self.single_field:
             needed = " ".join(f"{{{name}}}" for name in placeholders)
-            label = t(language, f"Values ({needed}), space-separated",
-                      f"值（{needed}），以空格分隔")
+            label = t(language, "copypasta.values_space_separated_2", needed=needed)
             self.combined = discord.ui.TextInput(
                 label=label[:45], required=True, max_length=200,
-                placeholder=t(language, "exact values needed depend on which template gets picked",
-                              "實際所需的值視隨機抽中的模板而定"))
+                placeholder=t(language, "copypasta.exact_values_needed_depend"))
             self.add_item(self.combined)
         else:
             self.fields = []
@@ -351,130 +262,94 @@ class CopypastaRandomModal(discord.ui.Modal):
         # so it stays positional, same limitation the text command has.
         values = self.combined.value.split() if self.single_field \
             else {f.label: f.value for f in self.fields}
-        key = (self.menu.ctx.guild.id, self.type_id)
 
         try:
-            index, rendered = self.menu.cog.manager.pick(
-                self.type_id, values, avoid_index=self.menu.cog._last_used.get(key))
+            _, rendered = self.menu.manager.pick(self.type_id, values, guild_id=interaction.guild_id)
         except CopypastaError as e:
             await interaction.response.send_message(str(e), ephemeral=True)
             return
 
-        self.menu.cog._last_used[key] = index
         await interaction.response.send_message(rendered)
         # Same reasoning as CopypastaValuesModal: close the menu once a
         # copypasta has actually been generated from it.
-        await self.menu.close_menu()
-
+        await self.menu.close_message(interaction, self.language)
 
-class CopypastaTemplateSelect(discord.ui.Select):
-    """Dropdown listing the templates on the current page of a
-    CopypastaInfoMenu. Picking one opens CopypastaValuesModal to collect
-    that template's placeholder value(s), then posts the rendered result."""
 
-    def __init__(self, menu: "CopypastaInfoMenu"):
-        self.menu = menu
-        super().__init__(
-            placeholder=t(menu.language, "Pick a template to generate...", "選擇一個模板來生成..."),
-            options=self._build_options(), row=2)
-
-    def _build_options(self):
-        start = self.menu.current_page * TEMPLATE_PAGE_SIZE
-        page_templates = self.menu.templates[start:start + TEMPLATE_PAGE_SIZE]
+class CopypastaInfoMenu(Menu):
+    """Shows one copypasta type's full detail, with its templates
+    paginated 5 at a time (flip buttons only appear if there's more
+    than one page), the same way KeywordShowMenu paginates responses
+    in keywords_cog.py. Needed because a type with a lot of templates
+    can otherwise blow past an embed's practical size. The type id is
+    the buttons' custom_id `arg`.
+
+    Also includes a dropdown of the page's templates so one can be
+    picked and generated directly from here (CopypastaValuesModal),
+    instead of having to close the menu and type out a full !copypasta
+    command by hand, plus a Random button (CopypastaRandomModal) for
+    when any template from the pool is fine, mirroring plain
+    `!copypasta <type> <values>`. Either path posts the generated
+    copypasta and then closes this menu (see close_message()), so the
+    same message's Select/buttons can't be reused to keep spamming out
+    more generations."""
+
+    key = "cpi"
+    closed_message = "copypasta.copypasta_menu_closed"
+    always_paged = False
+
+    def __init__(self, manager: CopypastaManager):
+        self.manager = manager
+
+    def _type(self, type_id: str):
+        return self.manager.list_types().get(type_id)
+
+    def _templates(self, type_id: str) -> list:
+        return (self._type(type_id) or {}).get("templates", [])
+
+    def page_count(self, language: str, arg: str) -> int:
+        return max(1, math.ceil(len(self._templates(arg)) / TEMPLATE_PAGE_SIZE))
+
+    def extra_buttons(self, language: str, page: int, arg: str) -> list:
+        if not self._templates(arg):
+            return []
+        return [("random", t(language, "copypasta.random_2"), discord.ButtonStyle.green, 1)]
+
+    def select(self, language: str, owner_id: int, page: int, arg: str):
+        start = page * TEMPLATE_PAGE_SIZE
+        page_templates = self._templates(arg)[start:start + TEMPLATE_PAGE_SIZE]
+        if not page_templates:
+            return None
         options = []
         for i, tmpl in enumerate(page_templates):
             index = start + i
             preview = tmpl if len(tmpl) <= 100 else tmpl[:97] + "..."
             options.append(discord.SelectOption(label=f"#{index}", description=preview, value=str(index)))
-        return options
+        return MenuSelect(self.key, owner_id, page, arg, options=options,
+                          placeholder=t(language, "copypasta.pick_a_template_to"), row=2)
 
-    def refresh(self):
-        """Called after Previous/Next flips the page, so the dropdown's
-        options match the templates actually shown on the new page."""
-        self.options = self._build_options()
-
-    async def callback(self, interaction: discord.Interaction):
-        index = int(self.values[0])
-        # Ask only for the placeholders THIS template actually contains,
-        # not the type's full placeholder pool - a template that doesn't
-        # use every placeholder the type has ever seen shouldn't make the
-        # user fill in ones it's going to ignore.
-        template = self.menu.templates[index]
-        placeholders = extract_placeholders(template) or ["text"]
-        await interaction.response.send_modal(
-            CopypastaValuesModal(self.menu, index, placeholders))
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        type_id, s = arg, self._type(arg)
+        embed = discord.Embed(
+            title=t(language, "copypasta.copypasta_type", type_id=type_id),
+            color=discord.Color.blue()
+        )
+        if s is None:
+            # Deleted since this menu was opened.
+            embed.description = t(language, "copypasta.type_no_longer_exists", type_id=type_id)
+            return embed
 
+        templates = s.get("templates", [])
+        total_pages = max(1, math.ceil(len(templates) / TEMPLATE_PAGE_SIZE))
+        start = page * TEMPLATE_PAGE_SIZE
+        page_templates = templates[start:start + TEMPLATE_PAGE_SIZE]
 
-class CopypastaInfoMenu(discord.ui.View):
-    """Shows one copypasta type's full detail, with its templates
-    paginated 5 at a time (flip buttons only appear if there's more
-    than one page), the same way KeywordShowMenu paginates responses
-    in keywords_cog.py. Needed because a type with a lot of templates
-    can otherwise blow past an embed's practical size.
-
-    Also includes a dropdown (CopypastaTemplateSelect) so a template can
-    be picked and generated directly from here, instead of having to
-    close the menu and type out a full !copypasta command by hand, plus
-    a Random button (CopypastaRandomModal) for when any template from
-    the pool is fine, mirroring plain `!copypasta <type> <values>`.
-    Either path posts the generated copypasta and then closes this menu
-    (see close_menu()), so the same message's Select/buttons can't be
-    reused to keep spamming out more generations."""
-
-    def __init__(self, ctx, cog: "CopypastaCog", type_id: str, s: dict, language: str, timeout: int = 180):
-        super().__init__(timeout=timeout)
-        self.ctx = ctx
-        self.cog = cog
-        self.type_id = type_id
-        self.s = s
-        self.language = language
-        self.templates = s.get("templates", [])
-        self.current_page = 0
-        # Set by the command handler right after ctx.send(...) returns, so
-        # close_menu() can edit this exact message from inside a modal's
-        # on_submit (a different interaction than the one that opened the
-        # modal, so it can't just re-use interaction.response for that).
-        self.message = None
-
-        self.previous_button.label = t(language, "Previous", "上一頁")
-        self.next_button.label = t(language, "Next", "下一頁")
-        self.jump_button.label = t(language, "🔢 Jump", "🔢 跳頁")
-        self.random_button.label = t(language, "🎲 Random", "🎲 隨機")
-        self.close_button.label = t(language, "Close", "關閉")
-
-        if self._total_pages() <= 1:
-            self.remove_item(self.previous_button)
-            self.remove_item(self.next_button)
-            self.remove_item(self.jump_button)
-
-        if not self.templates:
-            self.remove_item(self.random_button)
-
-        self.template_select = None
-        if self.templates:
-            self.template_select = CopypastaTemplateSelect(self)
-            self.add_item(self.template_select)
-
-    def _total_pages(self):
-        return max(1, math.ceil(len(self.templates) / TEMPLATE_PAGE_SIZE))
-
-    def get_embed(self):
-        total_pages = self._total_pages()
-        self.current_page = max(0, min(self.current_page, total_pages - 1))
-        start = self.current_page * TEMPLATE_PAGE_SIZE
-        page_templates = self.templates[start:start + TEMPLATE_PAGE_SIZE]
-
-        placeholders = self.s.get("placeholders") or ["text"]
+        placeholders = s.get("placeholders") or ["text"]
         needed = " ".join(f"{{{name}}}" for name in placeholders)
 
-        embed = discord.Embed(
-            title=t(self.language, f"Copypasta Type: {self.type_id}", f"迷因文本類型：{self.type_id}"),
-            color=discord.Color.blue()
-        )
         embed.add_field(
-            name=t(self.language, "Status", "狀態"),
-            value=t(self.language, "Enabled", "已啟用") if self.s.get("enabled", True)
-            else t(self.language, "Disabled", "已停用"),
+            name=t(language, "copypasta.status"),
+            value=t(language, "copypasta.enabled_2") if s.get("enabled", True)
+            else t(language, "copypasta.disabled_2"),
             inline=False
         )
         if page_templates:
@@ -500,91 +375,84 @@ class CopypastaInfoMenu(discord.ui.View):
                 )
         else:
             embed.add_field(
-                name=t(self.language, "Templates", "模板"),
-                value=t(self.language, "(no templates)", "（無模板）"),
+                name=t(language, "copypasta.templates"),
+                value=t(language, "copypasta.no_templates"),
                 inline=False
             )
-        embed.set_footer(text=t(self.language,
-            f"Template page {self.current_page + 1}/{total_pages} | {len(self.templates)} template(s) total | "
-            f"Pick one below to generate it (only asks for what that template needs), or hit Random for a "
-            f"random one, same as: !copypasta {self.type_id} <value for {needed}> (values needed vary by "
-            f"which template gets picked). Generating either way closes this menu.",
-            f"模板第 {self.current_page + 1}/{total_pages} 頁 | 共 {len(self.templates)} 個模板 | "
-            f"從下方選擇一個來生成（只會詢問該模板實際需要的值），或按「隨機」隨機生成一個，等同於："
-            f"!copypasta {self.type_id} <對應 {needed} 的值>（實際所需的值視隨機抽中的模板而定）。"
-            f"無論哪種方式生成後，此選單都會自動關閉。"))
+        embed.set_footer(text=t(language,
+            "copypasta.template_page_template_s",
+            current_page=page + 1, total_pages=total_pages, templates_count=len(templates),
+            type_id=type_id, needed=needed))
         return embed
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.ctx.author.id:
-            await interaction.response.send_message(
-                t(self.language, "This isn't your menu to control.", "這不是您可以操作的選單。"),
-                ephemeral=True)
-            return False
-        return True
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self._total_pages()
-        if self.template_select:
-            self.template_select.refresh()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self._total_pages()
-        if self.template_select:
-            self.template_select.refresh()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(CopypastaJumpModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.green, row=1)
-    async def random_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def on_action(self, interaction: discord.Interaction, action: str, owner_id: int, page: int, arg: str):
+        if action != "random":
+            await super().on_action(interaction, action, owner_id, page, arg)
+            return
         # Opens CopypastaRandomModal instead of picking a specific
         # template's own placeholders - this asks for the type's whole
         # placeholder pool up front, same as `!copypasta <type> <values>`,
         # since which template actually gets picked (and therefore which
         # of those placeholders are used) is only decided on submit.
-        await interaction.response.send_modal(CopypastaRandomModal(self))
-
-    @discord.ui.button(style=discord.ButtonStyle.red, row=0)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.edit_message(
-            content=t(self.language, "Copypasta menu closed.", "迷因文本選單已關閉。"), embed=None, view=None)
-        self.stop()
+        language = guild_settings.language(interaction.guild_id)
+        s = self._type(arg)
+        if s is None:
+            await self.show(interaction, owner_id, page, arg)
+            return
+        await interaction.response.send_modal(CopypastaRandomModal(self, arg, s, language))
+
+    async def on_select(self, interaction: discord.Interaction, owner_id: int, page: int, arg: str, value: str):
+        language = guild_settings.language(interaction.guild_id)
+        index = int(value)
+        templates = self._templates(arg)
+        if index >= len(templates):
+            # Templates were removed since this page was rendered.
+            await self.show(interaction, owner_id, page, arg)
+            return
+        # Ask only for the placeholders THIS template actually contains,
+        # not the type's full placeholder pool - a template that doesn't
+        # use every placeholder the type has ever seen shouldn't make the
+        # user fill in ones it's going to ignore.
+        placeholders = extract_placeholders(templates[index]) or ["text"]
+        await interaction.response.send_modal(
+            CopypastaValuesModal(self, arg, index, placeholders, language))
 
-    async def close_menu(self):
-        """Closes this menu's message (drops the embed/Select/buttons)
+    async def close_message(self, interaction: discord.Interaction, language: str):
+        """Closes the menu's message (drops the embed/Select/buttons)
         after a copypasta has actually been generated from it via a
         modal, so the same message can't be used to spam out more
         generations - the user has to re-run !copypasta info for another
-        one. Called from CopypastaValuesModal/CopypastaRandomModal, whose
-        on_submit interaction is separate from the one that opened the
-        modal, so it edits the stored message directly instead of going
-        through interaction.response like close_button does."""
-        self.stop()
-        if self.message is not None:
-            try:
-                await self.message.edit(
-                    content=t(self.language, "Copypasta menu closed.", "迷因文本選單已關閉。"),
-                    embed=None, view=None)
-            except discord.HTTPException:
-                pass
+        one. The modal's submit interaction has already been answered
+        with the copypasta itself, so this edits the message the modal
+        was opened from (interaction.message) directly."""
+        if interaction.message is None:
+            return
+        try:
+            await interaction.message.edit(
+                content=t(language, self.closed_message), embed=None, view=None)
+        except discord.HTTPException:
+            pass
 
 
 class CopypastaCog(commands.Cog, name="copypasta"):
     def __init__(self, bot):
         self.bot = bot
-        self.manager = CopypastaManager()
-        # (guild_id, type_id) -> last template index used, so the same
-        # line doesn't repeat twice in a row for that type on that server.
-        self._last_used = {}
+        # Per-(server, type) template rotation, so lines don't repeat
+        # until the type's whole pool has been used (see shuffle_bag.py).
+        self.manager = CopypastaManager(sampler=ShuffleBagSampler())
+        self.list_menu = CopypastaListMenu(self.manager)
+        self.info_menu = CopypastaInfoMenu(self.manager)
+
+    async def cog_load(self):
+        register_menu(self.bot, self.list_menu)
+        register_menu(self.bot, self.info_menu)
+
+    async def cog_unload(self):
+        unregister_menu(self.list_menu.key)
+        unregister_menu(self.info_menu.key)
 
     def _lang(self, ctx):
-        return get_guild_language(load_settings(), ctx.guild.id)
+        return guild_settings.language(ctx.guild.id)
 
     def _resolve_type(self, type_str: str) -> str:
         return TYPE_ALIASES.get(type_str.lower(), type_str.lower())
@@ -596,13 +464,11 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         language = self._lang(ctx) if ctx.guild else "english"
         if isinstance(error, commands.CheckFailure):
             await ctx.send(t(language,
-                "You need administrator permissions to manage copypasta types.",
-                "您需要管理員權限才能管理迷因文本類型。"))
+                "copypasta.you_need_administrator_permissions"))
             return
         if isinstance(error, commands.MissingRequiredArgument):
             await ctx.send(t(language,
-                f"Missing argument: `{error.param.name}`. Use `!help copypasta` for usage.",
-                f"缺少參數：`{error.param.name}`。使用 `!help copypasta` 查看用法。"))
+                "copypasta.missing_argument_use_help", error_param_name=error.param.name))
             return
         if isinstance(error.__cause__, CopypastaError) or isinstance(error, CopypastaError):
             msg = str(error.__cause__ or error)
@@ -619,14 +485,12 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         (see _resolve_type), they're just not offered as suggestions,
         since showing e.g. both "tag" and "name" for the same underlying
         type is more confusing than helpful. Shared by every subcommand
-        below that takes a `type` argument."""
-        current = (current or "").lower()
-        types = self.manager.list_types()
-
-        matches = sorted(name for name in types if current in name.lower())
+        below that takes a `type` argument. Exact match first, then
+        names starting with what's typed, then any other name containing
+        it (CopypastaManager.search_types())."""
         return [
             app_commands.Choice(name=name, value=name)
-            for name in matches[:AUTOCOMPLETE_LIMIT]
+            for name in self.manager.search_types(current, AUTOCOMPLETE_LIMIT)
         ]
 
     @commands.hybrid_group(name="copypasta", aliases=["cp"],
@@ -641,18 +505,10 @@ class CopypastaCog(commands.Cog, name="copypasta"):
             if types:
                 names = ", ".join(f"`{n}`" for n in sorted(types))
                 await ctx.send(t(language,
-                    f"Usage: `!copypasta <type> <value1> [value2 ...]`. Available types: {names}.\n"
-                    f"Example: `!copypasta tag @User`, `!copypasta activity digging`, `!copypasta song a song`.\n"
-                    f"Types with more than one `{{placeholder}}` need one value per placeholder, in order "
-                    f"(see `!copypasta info <type>`).",
-                    f"用法：`!copypasta <類型> <值1> [值2 ...]`。可用類型：{names}。\n"
-                    f"示例：`!copypasta tag @User`、`!copypasta activity digging`、`!copypasta song a song`。\n"
-                    f"若該類型的模板有多於一個 `{{佔位符}}`，需依序提供對應數量的值"
-                    f"（見 `!copypasta info <類型>`）。"))
+                    "copypasta.usage_copypasta_type_value1", names=names))
             else:
                 await ctx.send(t(language,
-                    "No copypasta types exist yet. An admin can create one with `!copypasta create <type>`.",
-                    "尚未建立任何迷因文本類型。管理員可使用 `!copypasta create <類型>` 建立。"))
+                    "copypasta.no_copypasta_types_exist"))
             return
 
         type_id = self._resolve_type(type)
@@ -660,13 +516,10 @@ class CopypastaCog(commands.Cog, name="copypasta"):
 
         if not value_list:
             await ctx.send(t(language,
-                f"Missing argument: at least one value. Usage: `!copypasta {type} <value1> [value2 ...]`.",
-                f"缺少參數：至少需要一個值。用法：`!copypasta {type} <值1> [值2 ...]`。"))
+                "copypasta.missing_argument_at_least", type=type))
             return
 
-        key = (ctx.guild.id, type_id)
-        index, rendered = self.manager.pick(type_id, value_list, avoid_index=self._last_used.get(key))
-        self._last_used[key] = index
+        _, rendered = self.manager.pick(type_id, value_list, guild_id=ctx.guild.id)
         await ctx.send(rendered)
 
     @copypasta.command(name="list", description="Lists all copypasta types in a browsable, searchable menu.")
@@ -677,19 +530,12 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         straight into a filtered view; use the Search button in the menu
         itself to change or clear the filter afterwards."""
         language = self._lang(ctx)
-        types = self.manager.list_types()
-        if not types:
-            await ctx.send(t(language, "No copypasta types exist yet.", "尚未建立任何迷因文本類型。"))
+        if not self.manager.list_types():
+            await ctx.send(t(language, "copypasta.no_copypasta_types_exist_2"))
             return
 
-        menu = CopypastaMenu(ctx, types, language)
-        if search:
-            term = search.strip().lower()
-            menu.search_term = term
-            menu.filtered_items = [
-                (type_id, s) for type_id, s in menu.all_items if term in type_id.lower()
-            ]
-        await ctx.send(embed=menu.get_embed(), view=menu)
+        term = search.strip().lower() if search else ""
+        await ctx.send(**self.list_menu.message(language, ctx.author.id, 0, term))
 
     @copypasta.command(name="info", aliases=["show"], description="Shows every template in one copypasta type.")
     @app_commands.describe(type="Copypasta type to show")
@@ -701,9 +547,8 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         that only appear when there's more than one page."""
         language = self._lang(ctx)
         type_id = self._resolve_type(type)
-        s = self.manager.get_type(type_id)
-        menu = CopypastaInfoMenu(ctx, self, type_id, s, language)
-        menu.message = await ctx.send(embed=menu.get_embed(), view=menu)
+        self.manager.get_type(type_id)  # raises if missing
+        await ctx.send(**self.info_menu.message(language, ctx.author.id, 0, type_id))
 
     @copypasta.command(name="create", description="Creates a new, empty copypasta type.")
     @app_commands.describe(type="Name for the new copypasta type")
@@ -714,9 +559,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         type_id = type.lower()
         self.manager.create_type(type_id)
         await ctx.send(t(language,
-            f"Created copypasta type `{type_id}`. Add templates with "
-            f"`!copypasta add {type_id} <template with {{text}} in it>`.",
-            f"已建立迷因文本類型 `{type_id}`。使用 `!copypasta add {type_id} <包含 {{text}} 的模板>` 新增模板。"))
+            "copypasta.created_copypasta_type_add", type_id=type_id))
 
     @copypasta.command(name="delete", description="Deletes a copypasta type entirely.")
     @app_commands.describe(type="Copypasta type to delete")
@@ -727,7 +570,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         language = self._lang(ctx)
         type_id = self._resolve_type(type)
         self.manager.delete_type(type_id)
-        await ctx.send(t(language, f"Deleted copypasta type `{type_id}`.", f"已刪除迷因文本類型 `{type_id}`。"))
+        await ctx.send(t(language, "copypasta.deleted_copypasta_type", type_id=type_id))
 
     @copypasta.command(name="enable", description="Enables a copypasta type so !copypasta can pick it again.")
     @app_commands.describe(type="Copypasta type to enable")
@@ -738,7 +581,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         language = self._lang(ctx)
         type_id = self._resolve_type(type)
         self.manager.set_enabled(type_id, True)
-        await ctx.send(t(language, f"Enabled copypasta type `{type_id}`.", f"已啟用迷因文本類型 `{type_id}`。"))
+        await ctx.send(t(language, "copypasta.enabled_copypasta_type", type_id=type_id))
 
     @copypasta.command(name="disable", description="Disables a copypasta type without deleting it.")
     @app_commands.describe(type="Copypasta type to disable")
@@ -749,7 +592,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         language = self._lang(ctx)
         type_id = self._resolve_type(type)
         self.manager.set_enabled(type_id, False)
-        await ctx.send(t(language, f"Disabled copypasta type `{type_id}`.", f"已停用迷因文本類型 `{type_id}`。"))
+        await ctx.send(t(language, "copypasta.disabled_copypasta_type", type_id=type_id))
 
     @copypasta.command(name="add", description="Adds a template to a type. Must contain a {text} placeholder.")
     @app_commands.describe(
@@ -765,8 +608,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         s = self.manager.get_type(type_id)
         index = len(s["templates"]) - 1
         await ctx.send(t(language,
-            f"Added template #{index} to `{type_id}`.",
-            f"已將模板 #{index} 加入 `{type_id}`。"))
+            "copypasta.added_template_to", index=index, type_id=type_id))
 
     @copypasta.command(name="remove", description="Removes a template by its index (see `!copypasta info <type>`).")
     @app_commands.describe(
@@ -780,8 +622,7 @@ class CopypastaCog(commands.Cog, name="copypasta"):
         type_id = self._resolve_type(type)
         self.manager.remove_template(type_id, index)
         await ctx.send(t(language,
-            f"Removed template #{index} from `{type_id}`.",
-            f"已將模板 #{index} 從 `{type_id}` 移除。"))
+            "copypasta.removed_template_from", index=index, type_id=type_id))
 
 
 async def setup(bot):
@@ -22,8 +22,8 @@ import shlex
 import discord
 from discord.ext import commands
 
-from config import load_settings
-from i18n import t, get_guild_language
+from guild_settings import guild_settings
+from i18n import t
 
 
 class GeneralCog(commands.Cog, name="general"):
@@ -31,7 +31,7 @@ class GeneralCog(commands.Cog, name="general"):
         self.bot = bot
 
     def _lang(self, ctx):
-        return get_guild_language(load_settings(), ctx.guild.id)
+        return guild_settings.language(ctx.guild.id)
 
     @commands.hybrid_command(
         name="ask",
@@ -44,20 +44,16 @@ class GeneralCog(commands.Cog, name="general"):
 
         if success_rate >= 80:
             response = t(language,
-                f"Regarding '{question}', it looks very likely to succeed!",
-                f"關於 '{question}'，看起來非常有可能成功！")
+                "general.regarding_it_looks_very", question=question)
         elif success_rate >= 50:
             response = t(language,
-                f"For '{question}', there's a decent chance it could happen.",
-                f"對於 '{question}'，有不錯的機會可能會發生。")
+                "general.for_theres_a_decent", question=question)
         elif success_rate >= 20:
             response = t(language,
-                f"About '{question}', it's not very likely, but who knows?",
-                f"關於 '{question}'，不太可能，但誰知道呢？")
+                "general.about_its_not_very", question=question)
         else:
             response = t(language,
-                f"Sorry, for '{question}', it seems quite unlikely.",
-                f"抱歉，對於 '{question}'，看起來相當不可能。")
+                "general.sorry_for_it_seems", question=question)
 
         await ctx.send(response)
 
@@ -71,7 +67,7 @@ class GeneralCog(commands.Cog, name="general"):
         """Randomly selects one option from a list of provided choices."""
         language = self._lang(ctx)
         if not choices:
-            await ctx.send(t(language, "Please provide at least one choice.", "請提供至少一個選項。"))
+            await ctx.send(t(language, "general.please_provide_at_least"))
             return
 
         try:
@@ -82,11 +78,11 @@ class GeneralCog(commands.Cog, name="general"):
             choice_list = choices.split()
 
         if not choice_list:
-            await ctx.send(t(language, "Please provide at least one choice.", "請提供至少一個選項。"))
+            await ctx.send(t(language, "general.please_provide_at_least"))
             return
 
         choice = random.choice(choice_list)
-        await ctx.send(t(language, f"I picked: {choice}", f"我選擇了：{choice}"))
+        await ctx.send(t(language, "general.i_picked", choice=choice))
 
     @commands.hybrid_command(
         name="rng",
@@ -100,20 +96,19 @@ class GeneralCog(commands.Cog, name="general"):
         language = self._lang(ctx)
 
         if type.lower() not in ("int", "float"):
-            await ctx.send(t(language, "Type must be 'int' or 'float'.", "類型必須是 'int' 或 'float'。"))
+            await ctx.send(t(language, "general.type_must_be_int"))
             return
 
         try:
             min_num = float(min_val)
             max_num = float(max_val)
         except ValueError:
-            await ctx.send(t(language, "Min and max must be valid numbers.", "最小值和最大值必須是有效數字。"))
+            await ctx.send(t(language, "general.min_and_max_must"))
             return
 
         if min_num > max_num:
             await ctx.send(t(language,
-                "Minimum value must be less than or equal to maximum value.",
-                "最小值必須小於或等於最大值。"))
+                "general.minimum_value_must_be"))
             return
 
         if type.lower() == "int":
@@ -121,7 +116,7 @@ class GeneralCog(commands.Cog, name="general"):
         else:
             result = round(random.uniform(min_num, max_num), 2)
 
-        await ctx.send(t(language, f"Random number: {result}", f"隨機數：{result}"))
+        await ctx.send(t(language, "general.random_number", result=result))
 
     @commands.hybrid_command(
         name="rcg",
@@ -133,11 +128,11 @@ class GeneralCog(commands.Cog, name="general"):
         color_hex = f"#{r:02x}{g:02x}{b:02x}".upper()
 
         embed = discord.Embed(
-            title=t(language, "Random Color", "隨機顏色"),
+            title=t(language, "general.random_color"),
             description=f"Hex: {color_hex}",
             color=discord.Color.from_rgb(r, g, b)
         )
-        embed.add_field(name=t(language, "RGB", "RGB值"), value=f"({r}, {g}, {b})", inline=True)
+        embed.add_field(name=t(language, "general.rgb"), value=f"({r}, {g}, {b})", inline=True)
         await ctx.send(embed=embed)
 
 
@@ -7,15 +7,25 @@ at the bottom of vto.py, with one real bug fix: the Previous/Next/Close
 button labels used to be decided once, at class-definition time, from
 whatever the *default* guild's language happened to be - so every
 server's help menu showed buttons in the same language regardless of
-their own !lang setting. Labels are now set per-instance in __init__
-based on the language passed in, which is what the rest of the code
-already assumed was happening.
+their own !lang setting. Labels are now picked from the guild's
+language every time a page is rendered, which is what the rest of the
+code already assumed was happening.
+
+Short UI strings come from the message catalog (i18n.t()); the longer
+per-command texts in COMMAND_LIST stay inline, keyed by language, and
+fall back to english for a language that doesn't have them.
+
+The overview, menu pages and per-command embeds are built once per
+language and rebuilt when the registered commands change. The menu is a
+persistent HelpMenu (menus.py). COMMAND_LIST entries with no matching
+command are reported on the console and left out.
 """
 import discord
 from discord.ext import commands
 
-from config import load_settings
-from i18n import t, get_guild_language
+from guild_settings import guild_settings
+from i18n import DEFAULT_LANGUAGE, available_languages, t
+from menus import Menu, register_menu, unregister_menu
 
 # (name, description_en, description_zh, usage, args_en, args_zh, notes_en, notes_zh)
 COMMAND_LIST = [
@@ -51,12 +61,13 @@ COMMAND_LIST = [
     },
     {
         "name": "lang",
-        "description": {"english": "Toggles the language of the bot's help panel between English and Chinese.",
-                         "chinese": "切換機器人幫助面板的語言在英文和中文之間。"},
-        "usage": "`!lang`",
-        "arguments": {"english": "No arguments required.", "chinese": "無需參數。"},
-        "notes": {"english": "- Toggles the language for the entire server.\n- Changes are saved persistently in `vote_settings.json`.\n- Affects only the `!help` command output.",
-                  "chinese": "- 為整個伺服器切換語言。\n- 更改將持久保存到 `vote_settings.json`。\n- 僅影響 `!help` 命令的輸出。"}
+        "description": {"english": "Switches the bot's language for this server (toggles English/Chinese by default).",
+                         "chinese": "切換本伺服器的機器人語言（默認在英文和中文之間切換）。"},
+        "usage": "`!lang [language]`",
+        "arguments": {"english": "**language**: (Optional) The language to switch to (e.g., `english`, `chinese`). If omitted, switches to the next available language.\n- Example: `!lang`, `!lang chinese`",
+                      "chinese": "**語言**：（可選）要切換到的語言（例如，`english`、`chinese`）。如果省略，切換到下一個可用語言。\n- 示例：`!lang`、`!lang chinese`"},
+        "notes": {"english": "- Changes the language for the entire server.\n- Changes are saved persistently in `vote_settings.json`.\n- Any language with a catalog file under `locales/` can be selected; messages it doesn't translate fall back to English.",
+                  "chinese": "- 為整個伺服器切換語言。\n- 更改將持久保存到 `vote_settings.json`。\n- 可選擇 `locales/` 下任何有目錄檔案的語言；未翻譯的訊息將以英文顯示。"}
     },
     {
         "name": "ask",
@@ -104,8 +115,8 @@ COMMAND_LIST = [
         "usage": "`!copypasta <type> <text>` (alias: `!cp`)",
         "arguments": {"english": "**type**: Which pool to pick from - `tag` (aliases: `name`, `person`, `mention`, `user`), `activity` (aliases: `thing`, `action`, `verb`), or `song` (aliases: `music`, `tune`), or any custom type an admin created.\n**text**: The word, name, mention, activity, or song title to slot into the template.\n- Example: `!copypasta tag @User`, `!copypasta activity digging`, `!copypasta song a song`.",
                       "chinese": "**類型**：要從哪個池中選取 - `tag`（別名：`name`、`person`、`mention`、`user`）、`activity`（別名：`thing`、`action`、`verb`）或 `song`（別名：`music`、`tune`），或管理員建立的自訂類型。\n**文字**：要填入模板的詞語、名稱、標註、活動或歌曲名稱。\n- 示例：`!copypasta tag @User`、`!copypasta activity digging`、`!copypasta song a song`。"},
-        "notes": {"english": "- Each type keeps its own separate pool of templates, so a tagging line can never get mixed up with a song line or vice versa.\n- The bot avoids repeating the exact same template twice in a row for the same type on the same server.\n- Admins can manage pools live: `!copypasta list`, `show <type>`, `create <type>`, `delete <type>`, `enable/disable <type>`, `add <type> <template with {text}>`, `remove <type> <index>`.",
-                  "chinese": "- 每個類型都有各自獨立的模板池，因此標註類型的句子不會與歌曲類型混用，反之亦然。\n- 機器人會避免在同一伺服器的同一類型中連續發送完全相同的模板。\n- 管理員可即時管理模板池：`!copypasta list`、`show <類型>`、`create <類型>`、`delete <類型>`、`enable/disable <類型>`、`add <類型> <包含 {text} 的模板>`、`remove <類型> <索引>`。"}
+        "notes": {"english": "- Each type keeps its own separate pool of templates, so a tagging line can never get mixed up with a song line or vice versa.\n- Each server works through a type's whole template pool in random order before any template repeats.\n- Admins can manage pools live: `!copypasta list`, `show <type>`, `create <type>`, `delete <type>`, `enable/disable <type>`, `add <type> <template with {text}>`, `remove <type> <index>`.",
+                  "chinese": "- 每個類型都有各自獨立的模板池，因此標註類型的句子不會與歌曲類型混用，反之亦然。\n- 每個伺服器會以隨機順序用完某類型的所有模板後，才會重複使用任何模板。\n- 管理員可即時管理模板池：`!copypasta list`、`show <類型>`、`create <類型>`、`delete <類型>`、`enable/disable <類型>`、`add <類型> <包含 {text} 的模板>`、`remove <類型> <索引>`。"}
     },
     {
         "name": "setperms",
@@ -127,74 +138,189 @@ COMMAND_LIST = [
         "notes": {"english": "- No special permissions required for users.\n- The bot must have `add_reactions` permission.\n- Settings are saved persistently in `vote_settings.json`.\n- Only one emoji can be set per channel, and it applies to either a specific user or all messages.",
                   "chinese": "- 用戶無需特殊權限。\n- 機器人必須具有 `add_reactions` 權限。\n- 設置將持久保存到 `vote_settings.json`。\n- 每個頻道只能設置一個表情符號，且適用於特定用戶或所有消息。"}
     },
+    {
+        "name": "setrepeat",
+        "description": {"english": "Sets how many different users must repeat a message before the bot echoes it (Admin only).",
+                         "chinese": "設置需要多少位不同用戶重複同一消息，機器人才會跟著重複（僅限管理員）。"},
+        "usage": "`!setrepeat <number | default> [server | channel]`",
+        "arguments": {"english": "**count**: A number from 2 to 10, or `default` to remove the override.\n**scope**: (Optional) `server` (default) applies to the whole server, `channel` to just the current channel.\n- Example: `!setrepeat 4`, `!setrepeat 2 channel`, `!setrepeat default channel`.",
+                      "chinese": "**數量**：2 到 10 之間的數字，或 `default` 以移除設定。\n**範圍**：（可選）`server`（默認）適用於整個伺服器，`channel` 僅適用於當前頻道。\n- 示例：`!setrepeat 4`、`!setrepeat 2 channel`、`!setrepeat default channel`。"},
+        "notes": {"english": "- Requires administrator permissions.\n- Defaults to 3 different users.\n- A channel setting takes priority over the server setting.\n- Changes are saved persistently in `vote_settings.json`.",
+                  "chinese": "- 需要管理員權限。\n- 默認為 3 位不同用戶。\n- 頻道設定優先於伺服器設定。\n- 更改將持久保存到 `vote_settings.json`。"}
+    },
+    {
+        "name": "feature",
+        "description": {"english": "Turns keyword responses or the repeat echo on/off for this server or channel (Admin only).",
+                         "chinese": "為此伺服器或頻道開啟／關閉關鍵詞回應或重複檢測（僅限管理員）。"},
+        "usage": "`!feature <keywords | echo> <on | off | default> [server | channel]`",
+        "arguments": {"english": "**feature**: `keywords` (keyword-triggered responses) or `echo` (repeating repeated messages).\n**state**: `on`, `off`, or `default` to remove this scope's setting.\n**scope**: (Optional) `server` (default) applies to the whole server, `channel` to just the current channel.\n- Example: `!feature keywords off`, `!feature echo off channel`, `!feature keywords on channel`.",
+                      "chinese": "**功能**：`keywords`（關鍵詞回應）或 `echo`（重複檢測）。\n**狀態**：`on`、`off`，或 `default` 以移除此範圍的設定。\n**範圍**：（可選）`server`（默認）適用於整個伺服器，`channel` 僅適用於當前頻道。\n- 示例：`!feature keywords off`、`!feature echo off channel`、`!feature keywords on channel`。"},
+        "notes": {"english": "- Requires administrator permissions.\n- Both features are on by default.\n- A channel setting takes priority over the server setting, so a channel can be switched back on in a server that has it off.\n- Changes are saved persistently in `vote_settings.json`.",
+                  "chinese": "- 需要管理員權限。\n- 兩項功能默認均為開啟。\n- 頻道設定優先於伺服器設定，因此可在已關閉該功能的伺服器中為個別頻道重新開啟。\n- 更改將持久保存到 `vote_settings.json`。"}
+    },
     {
         "name": "keyword",
         "description": {"english": "Manages global keyword-triggered response sets (Admin only).",
                          "chinese": "管理全局關鍵詞觸發回應組（僅限管理員）。"},
         "usage": "`!keyword <list|show|create|delete|enable|disable|addkeyword|removekeyword|addresponse|removeresponse> ...`",
-        "arguments": {"english": "See `!keyword` with no arguments for the full subcommand list, or `!help <subcommand>`-style usage per subcommand isn't available - subcommands are documented in the `!keyword` group message itself.\n- `!keyword list [search]`: opens a Previous/Next/Search/Close button menu showing keyword sets a few at a time. Pass a search term to start filtered (e.g. `!keyword list cry`), or use the Search button in the menu to filter/change filter by set name or keyword any time.",
-                      "chinese": "使用 `!keyword`（不帶參數）查看完整子命令列表；子命令用法已在 `!keyword` 群組訊息中說明。\n- `!keyword list [搜尋詞]`：開啟含「上一頁／下一頁／搜尋／關閉」按鈕的選單，分頁顯示關鍵詞組。可直接帶搜尋詞開啟已篩選的畫面（例如 `!keyword list cry`），或隨時使用選單中的搜尋按鈕依組名或關鍵詞篩選。"},
+        "arguments": {"english": "See `!keyword` with no arguments for the full subcommand list, or `!help <subcommand>`-style usage per subcommand isn't available - subcommands are documented in the `!keyword` group message itself.\n- `!keyword list [search]`: opens a Previous/Next/Search/Close button menu showing keyword sets a few at a time. Pass a search term to start filtered (e.g. `!keyword list cry`), or use the Search button in the menu to filter/change filter by set name, keyword or response text any time.",
+                      "chinese": "使用 `!keyword`（不帶參數）查看完整子命令列表；子命令用法已在 `!keyword` 群組訊息中說明。\n- `!keyword list [搜尋詞]`：開啟含「上一頁／下一頁／搜尋／關閉」按鈕的選單，分頁顯示關鍵詞組。可直接帶搜尋詞開啟已篩選的畫面（例如 `!keyword list cry`），或隨時使用選單中的搜尋按鈕依組名、關鍵詞或回應內容篩選。"},
         "notes": {"english": "- Requires administrator permissions.\n- Keyword sets are global: shared across every server the bot is in.\n- Changes are saved persistently in `data/keyword_sets.json`.\n- `!keyword list` shows 5 sets per page; use `!keyword show <id>` for a set's full keyword/response detail.",
                   "chinese": "- 需要管理員權限。\n- 關鍵詞組是全局的：在機器人所在的每個伺服器間共享。\n- 更改將持久保存到 `data/keyword_sets.json`。\n- `!keyword list` 每頁顯示 5 個關鍵詞組；使用 `!keyword show <id>` 查看單一組的完整關鍵詞／回應詳情。"}
     },
 ]
 
 
-class HelpMenu(discord.ui.View):
-    def __init__(self, ctx, command_list, language, timeout=180):
-        super().__init__(timeout=timeout)
-        self.ctx = ctx
-        self.command_list = command_list
-        self.language = language
-        self.current_page = 0
+def _localized(text: dict, language: str) -> str:
+    """One COMMAND_LIST text in `language`, english for languages it
+    hasn't been written in (see i18n.py)."""
+    return text.get(language) or text[DEFAULT_LANGUAGE]
 
-        # Labels depend on this guild's language, so they're set here
-        # rather than at class-definition time (see module docstring).
-        self.previous_button.label = t(language, "Previous", "上一頁")
-        self.next_button.label = t(language, "Next", "下一頁")
-        self.close_button.label = t(language, "Close", "關閉")
 
-    def get_embed(self):
-        command = self.command_list[self.current_page]
-        embed = discord.Embed(
-            title=t(self.language, f"Command: !{command['name']}", f"命令：!{command['name']}"),
-            description=command["description"][self.language],
-            color=discord.Color.blue()
-        )
-        embed.add_field(name=t(self.language, "🔹 Usage", "🔹 使用方法"), value=command["usage"], inline=False)
-        embed.add_field(name=t(self.language, "🔹 Arguments", "🔹 參數"), value=command["arguments"][self.language], inline=False)
-        embed.add_field(name=t(self.language, "🔹 Notes", "🔹 注意事項"), value=command["notes"][self.language], inline=False)
-        embed.set_footer(text=t(self.language,
-            f"Page {self.current_page + 1}/{len(self.command_list)} | Use !help for the full user manual.",
-            f"第 {self.current_page + 1}/{len(self.command_list)} 頁 | 使用 !help 獲取完整的使用手冊。"))
-        return embed
+class HelpMenu(Menu):
+    """The !help manual: the overview is page 0, followed by one page per
+    COMMAND_LIST entry, all served from HelpCog's embed cache. Persistent
+    like the other menus (see menus.py); clicks by anyone but the person
+    who ran !help are silently ignored, as they always were."""
 
-    @discord.ui.button(style=discord.ButtonStyle.grey)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.ctx.author.id:
-            return
-        self.current_page = (self.current_page - 1) % len(self.command_list)
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+    key = "help"
+    not_owner_message = None
+    closed_message = "help.help_menu_closed"
+    jumpable = False
 
-    @discord.ui.button(style=discord.ButtonStyle.grey)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.ctx.author.id:
-            return
-        self.current_page = (self.current_page + 1) % len(self.command_list)
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+    def __init__(self, cog: "HelpCog"):
+        self.cog = cog
 
-    @discord.ui.button(style=discord.ButtonStyle.red)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.ctx.author.id:
-            return
-        await interaction.response.edit_message(
-            content=t(self.language, "Help menu closed.", "幫助選單已關閉。"), embed=None, view=None)
-        self.stop()
+    def _language(self, language: str) -> str:
+        self.cog._refresh()
+        return language if language in self.cog._overview else DEFAULT_LANGUAGE
+
+    def page_count(self, language: str, arg: str) -> int:
+        return len(self.cog._pages[self._language(language)]) + 1
+
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        # Cached embeds are shared, so only ever sent as copies.
+        language = self._language(language)
+        if page == 0:
+            return self.cog._overview[language].copy()
+        return self.cog._pages[language][page - 1].copy()
+
+
+def _command_embed(entry: dict, language: str, footer: str) -> discord.Embed:
+    embed = discord.Embed(
+        title=t(language, "help.command", name=entry["name"]),
+        description=_localized(entry["description"], language),
+        color=discord.Color.blue()
+    )
+    embed.add_field(name=t(language, "help.usage"), value=entry["usage"], inline=False)
+    embed.add_field(name=t(language, "help.arguments"), value=_localized(entry["arguments"], language), inline=False)
+    embed.add_field(name=t(language, "help.notes"), value=_localized(entry["notes"], language), inline=False)
+    embed.set_footer(text=footer)
+    return embed
+
+
+def _overview_embed(language: str) -> discord.Embed:
+    embed = discord.Embed(
+        title=t(language, "help.bot_user_manual"),
+        description=t(language,
+            "help.welcome_to_the_bot"),
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name=t(language, "help.command_prefix"),
+        value=t(language, "help.use_as_the_command"),
+        inline=False
+    )
+    embed.add_field(
+        name=t(language, "help.features"),
+        value=t(language,
+            "help.keyword_responses_sends_copypastas"),
+        inline=False
+    )
+    embed.add_field(
+        name=" ",
+        value=t(language,
+            "help.random_response_ask_gives"),
+        inline=False
+    )
+    embed.add_field(
+        name=t(language, "help.navigation"),
+        value=t(language,
+            "help.use_the_buttons_below"),
+        inline=False
+    )
+    embed.set_footer(text=t(language,
+        "help.bot_created_for_fun"))
+    return embed
 
 
 class HelpCog(commands.Cog, name="help"):
     def __init__(self, bot):
         self.bot = bot
+        # Everything below is rebuilt by _refresh() whenever the set of
+        # registered commands changes (see module docstring).
+        self._overview = {}        # language -> overview embed
+        self._pages = {}           # language -> [menu page embed, ...]
+        self._commands = {}        # (language, name) -> !help <name> embed
+        self._command_names = frozenset()
+        self._built_for = None     # frozenset(bot.all_commands) at the last build
+        self.menu = HelpMenu(self)
+
+    async def cog_load(self):
+        self._refresh()
+        register_menu(self.bot, self.menu)
+
+    async def cog_unload(self):
+        unregister_menu(self.menu.key)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Every extension is loaded by now - build against the final
+        # command list (and report any COMMAND_LIST drift). Forced: the
+        # stale-entry check only runs once the bot is ready, even if no
+        # command changed since the last build.
+        self._refresh(force=True)
+
+    def _refresh(self, force: bool = False):
+        """Rebuild the embed cache if commands were added or removed
+        since the last build (extensions loaded/unloaded)."""
+        names = frozenset(self.bot.all_commands)
+        if not force and self._built_for == names:
+            return
+        self._built_for = names
+        registered = {c.name for c in self.bot.commands}
+        documented = {entry["name"] for entry in COMMAND_LIST}
+        listed = {c.name for c in self.bot.commands if not c.hidden}
+        for name in sorted(listed - documented):
+            print(f"[help_cog.py] command !{name} has no COMMAND_LIST entry - it won't appear in !help")
+        if self.bot.is_ready():
+            for name in sorted(documented - registered):
+                print(f"[help_cog.py] COMMAND_LIST documents !{name}, which isn't a registered command - skipped")
+        # Before the other extensions have loaded, keep every entry -
+        # on_ready rebuilds against the full command list.
+        entries = [entry for entry in COMMAND_LIST if entry["name"] in registered or not self.bot.is_ready()]
+
+        self._overview.clear()
+        self._pages.clear()
+        self._commands.clear()
+        for language in available_languages():
+            self._overview[language] = _overview_embed(language)
+            self._pages[language] = [
+                _command_embed(entry, language, t(language,
+                    "help.page_use_help_for",
+                    current_page=page, command_list_count=len(entries)))
+                for page, entry in enumerate(entries, start=1)
+            ]
+            footer = t(language, "help.use_help_for_the")
+            for entry in entries:
+                self._commands[(language, entry["name"])] = _command_embed(entry, language, footer)
+        self._command_names = frozenset(registered)
+
+    def command_names(self) -> frozenset:
+        """Names of every registered command, for messages_cog.py's
+        mention handler."""
+        self._refresh()
+        return self._command_names
 
     @commands.hybrid_command(
         name="help",
@@ -202,83 +328,24 @@ class HelpCog(commands.Cog, name="help"):
     @discord.app_commands.describe(command="Get detailed help for one specific command (optional)")
     async def help(self, ctx, *, command: str = None):
         """Displays the user manual for the bot or specific command details."""
-        language = get_guild_language(load_settings(), ctx.guild.id)
+        language = guild_settings.language(ctx.guild.id)
+        self._refresh()
+        if language not in self._overview:
+            language = DEFAULT_LANGUAGE
 
         if not command:
-            embed = discord.Embed(
-                title=t(language, "Bot User Manual", "機器人使用手冊"),
-                description=t(language,
-                    "Welcome to the bot! Use the buttons below to browse command details.",
-                    "歡迎使用本機器人！使用下面的按鈕瀏覽命令詳細信息。"),
-                color=discord.Color.blue()
-            )
-            embed.add_field(
-                name=t(language, "🔹 Command Prefix", "🔹 命令前綴"),
-                value=t(language, "Use `!` as the command prefix (e.g., `!help`).", "使用 `!` 作為命令前綴（例如，`!help`）。"),
-                inline=False
-            )
-            embed.add_field(
-                name=t(language, "🔹 Features", "🔹 功能"),
-                value=t(language,
-                    "**Keyword Responses**: Sends copypastas for specific keywords in messages (manage sets with `!keyword`).\n"
-                    "**Repeat Detection**: Echoes a message if three different users send it consecutively.\n"
-                    "**Timeout Voting**: Use `!vto` to vote for timing out a member. Configurable via `!setvote`. Supports multiple votes at once.",
-                    "**關鍵詞回應**：對消息中的特定關鍵詞回應迷因文本（使用 `!keyword` 管理關鍵詞組）。\n"
-                    "**重複檢測**：若三個不同用戶連續發送相同消息，則重複該消息。\n"
-                    "**暫停投票**：使用 `!vto` 投票暫停成員。可通過 `!setvote` 配置。支持同時多個投票。"),
-                inline=False
-            )
-            embed.add_field(
-                name=" ",
-                value=t(language,
-                    "**Random Response**: `!ask` gives answers based on a random success rate.\n"
-                    "**Random Choice**: `!pick` selects one option from a list.\n"
-                    "**Random Number**: `!rng` generates a number in a range.\n"
-                    "**Random Color**: `!rcg` creates a hex color with a preview.\n"
-                    "**Permissions**: `!setperms` grants channel access (admin only).\n"
-                    "**Auto-Reactions**: `!autoreact` sets emoji reactions for messages.",
-                    "**隨機回應**：`!ask` 根據隨機成功率回應。\n"
-                    "**隨機選擇**：`!pick` 從選項列表中選一個。\n"
-                    "**隨機數**：`!rng` 生成範圍內的數字。\n"
-                    "**隨機顏色**：`!rcg` 生成十六進制顏色並預覽。\n"
-                    "**權限**：`!setperms` 授予頻道權限（僅限管理員）。\n"
-                    "**自動反應**：`!autoreact` 為消息設置表情反應。"),
-                inline=False
-            )
-            embed.add_field(
-                name=t(language, "🔹 Navigation", "🔹 導航"),
-                value=t(language,
-                    "Use the buttons below to browse individual command details.",
-                    "使用下面的按鈕瀏覽各個命令的詳細信息。"),
-                inline=False
-            )
-            embed.set_footer(text=t(language,
-                "Bot created for fun and moderation. Contact natherox through Discord for issues.",
-                "機器人為娛樂和管理而創建。如有問題，請於Discord聯繫natherox。"))
-
-            view = HelpMenu(ctx, COMMAND_LIST, language)
-            await ctx.send(embed=embed, view=view)
+            await ctx.send(**self.menu.message(language, ctx.author.id))
             return
 
         command = command.lower()
-        selected = next((cmd for cmd in COMMAND_LIST if cmd["name"] == command), None)
+        selected = self._commands.get((language, command))
         if selected:
-            embed = discord.Embed(
-                title=t(language, f"Command: !{command}", f"命令：!{command}"),
-                description=selected["description"][language],
-                color=discord.Color.blue()
-            )
-            embed.add_field(name=t(language, "🔹 Usage", "🔹 使用方法"), value=selected["usage"], inline=False)
-            embed.add_field(name=t(language, "🔹 Arguments", "🔹 參數"), value=selected["arguments"][language], inline=False)
-            embed.add_field(name=t(language, "🔹 Notes", "🔹 注意事項"), value=selected["notes"][language], inline=False)
-            embed.set_footer(text=t(language, "Use !help for the full user manual.", "使用 !help 獲取完整的使用手冊。"))
-            await ctx.send(embed=embed)
+            await ctx.send(embed=selected.copy())
         else:
             embed = discord.Embed(
-                title=t(language, "Error", "錯誤"),
+                title=t(language, "help.error"),
                 description=t(language,
-                    f"No command named `{command}` found. Use `!help` to see all available commands.",
-                    f"未找到名為 `{command}` 的命令。使用 `!help` 查看所有可用命令。"),
+                    "help.no_command_named_found", command=command),
                 color=discord.Color.red()
             )
             await ctx.send(embed=embed)
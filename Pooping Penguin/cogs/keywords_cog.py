@@ -20,236 +20,159 @@ addresponse, removeresponse) runs from one implementation whether it's
 invoked as "!keyword <sub>" or "/keyword <sub>". The bare "!keyword"
 (no subcommand) usage text stays prefix-only, since Discord doesn't
 allow invoking a slash command group directly - see GAPS.md.
+
+`set_id` arguments autocomplete from KeywordManager's name index
+(name_index.py). The `list` and `info` menus are persistent button
+menus (menus.py), so they keep working after a restart.
 """
 import math
+from typing import List
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from config import load_settings
-from i18n import t, get_guild_language
+from guild_settings import guild_settings
+from i18n import t
 from keyword_manager import KeywordManager, KeywordError
+from menus import Menu, SearchModal, register_menu, unregister_menu
 
 # How many keyword sets are shown per page in the `!keyword list` menu.
 KEYWORD_PAGE_SIZE = 5
 
+# Discord caps autocomplete results at 25 choices per field.
+AUTOCOMPLETE_LIMIT = 25
 
-class KeywordJumpModal(discord.ui.Modal):
-    """Popup asking for a page number, used by the Jump button on both
-    KeywordMenu and KeywordShowMenu. Only needs `menu.current_page`,
-    `menu._total_pages()`, `menu.get_embed()` and `menu.language` on the
-    menu it's attached to, so one modal class covers both."""
-
-    def __init__(self, menu, language: str):
-        total = menu._total_pages()
-        super().__init__(title=t(language, "Jump to Page", "跳至頁面"))
-        self.menu = menu
-        self.total = total
-        self.page_input = discord.ui.TextInput(
-            label=t(language, f"Page number (1-{total})", f"頁碼（1-{total}）"),
-            placeholder="1",
-            required=True,
-            max_length=10,
-        )
-        self.add_item(self.page_input)
-
-    async def on_submit(self, interaction: discord.Interaction):
-        language = self.menu.language
-        raw = self.page_input.value.strip()
-        if not raw.isdigit() or not (1 <= int(raw) <= self.total):
-            await interaction.response.send_message(
-                t(language, f"Please enter a page number between 1 and {self.total}.",
-                  f"請輸入介於 1 到 {self.total} 之間的頁碼。"),
-                ephemeral=True)
-            return
-        self.menu.current_page = int(raw) - 1
-        await interaction.response.edit_message(embed=self.menu.get_embed(), view=self.menu)
 
+class KeywordListMenu(Menu):
+    """Paginated, searchable browser for keyword sets, in the same style
+    as the help menu (Previous/Next/Close buttons), plus a Search button
+    that finds sets by name, keyword or response text, best match first
+    (KeywordManager.set_ids(), backed by text_index.py). Persistent: the
+    search term travels in the buttons' custom_id (see menus.py)."""
 
-class KeywordSearchModal(discord.ui.Modal):
-    """Popup text box used by the Search button on KeywordMenu."""
+    key = "kwl"
+    closed_message = "keywords.keyword_menu_closed"
+    close_row = 1
 
-    def __init__(self, menu: "KeywordMenu", language: str):
-        super().__init__(title=t(language, "Search Keyword Sets", "搜尋關鍵詞組"))
-        self.menu = menu
-        self.term = discord.ui.TextInput(
-            label=t(language, "Set name or keyword", "組名或關鍵詞"),
-            placeholder=t(language, "e.g. cry", "例如：cry"),
-            required=True,
-            max_length=100,
-        )
-        self.add_item(self.term)
+    def __init__(self, manager: KeywordManager, page_size: int = KEYWORD_PAGE_SIZE):
+        self.manager = manager
+        self.page_size = page_size
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await self.menu.apply_search(interaction, self.term.value)
+    def page_count(self, language: str, arg: str) -> int:
+        return max(1, math.ceil(len(self.manager.set_ids(arg)) / self.page_size))
 
+    def extra_buttons(self, language: str, page: int, arg: str) -> list:
+        return [
+            ("search", t(language, "menus.search"), discord.ButtonStyle.blurple, 1),
+            ("clear", t(language, "menus.clear_search"), discord.ButtonStyle.grey, 1),
+        ]
 
-class KeywordMenu(discord.ui.View):
-    """Paginated, searchable browser for keyword sets, in the same style
-    as HelpMenu in help_cog.py (Previous/Next/Close buttons), plus a
-    Search button that filters by set name or keyword substring."""
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        set_ids = self.manager.set_ids(arg)
+        total_pages = max(1, math.ceil(len(set_ids) / self.page_size))
+        start = page * self.page_size
+        sets = self.manager.list_sets()
 
-    def __init__(self, ctx, sets: dict, language: str, page_size: int = KEYWORD_PAGE_SIZE, timeout: int = 180):
-        super().__init__(timeout=timeout)
-        self.ctx = ctx
-        self.language = language
-        self.page_size = page_size
-        self.all_items = sorted(sets.items())
-        self.filtered_items = self.all_items
-        self.search_term = None
-        self.current_page = 0
-
-        self.previous_button.label = t(language, "Previous", "上一頁")
-        self.next_button.label = t(language, "Next", "下一頁")
-        self.jump_button.label = t(language, "🔢 Jump", "🔢 跳頁")
-        self.search_button.label = t(language, "🔍 Search", "🔍 搜尋")
-        self.clear_button.label = t(language, "Clear Search", "清除搜尋")
-        self.close_button.label = t(language, "Close", "關閉")
-
-    def _total_pages(self):
-        return max(1, math.ceil(len(self.filtered_items) / self.page_size))
-
-    def get_embed(self):
-        total_pages = self._total_pages()
-        self.current_page = max(0, min(self.current_page, total_pages - 1))
-        start = self.current_page * self.page_size
-        page_items = self.filtered_items[start:start + self.page_size]
-
-        title = t(self.language, "Keyword Sets", "關鍵詞組")
-        if self.search_term:
-            title += t(self.language, f' — search: "{self.search_term}"', f'－搜尋：「{self.search_term}」')
+        title = t(language, "keywords.keyword_sets")
+        if arg:
+            title += t(language, "keywords.search_2", search_term=arg)
 
         embed = discord.Embed(title=title, color=discord.Color.blue())
 
-        if not page_items:
-            embed.description = t(self.language,
-                "No keyword sets match that search.", "沒有符合搜尋條件的關鍵詞組。")
+        page_ids = set_ids[start:start + self.page_size]
+        if not page_ids:
+            embed.description = t(language,
+                "keywords.no_keyword_sets_match")
         else:
-            for set_id, s in page_items:
+            for set_id in page_ids:
+                s = sets[set_id]
                 enabled = s.get("enabled", True)
-                status = t(self.language, "✅ enabled", "✅ 已啟用") if enabled else \
-                    t(self.language, "❌ disabled", "❌ 已停用")
+                status = t(language, "keywords.enabled") if enabled else \
+                    t(language, "keywords.disabled")
                 keywords = s.get("keywords", [])
                 kw_preview = ", ".join(f"`{k}`" for k in keywords[:8])
                 if len(keywords) > 8:
-                    kw_preview += t(self.language, f" (+{len(keywords) - 8} more)", f"（還有 {len(keywords) - 8} 個）")
+                    kw_preview += t(language, "keywords.more", keywords_count=len(keywords) - 8)
                 if not kw_preview:
-                    kw_preview = t(self.language, "(no keywords)", "（無關鍵詞）")
+                    kw_preview = t(language, "keywords.no_keywords")
                 embed.add_field(
                     name=set_id,
-                    value=t(self.language,
-                        f"{status} | {len(keywords)} keywords, {len(s.get('responses', []))} responses\n{kw_preview}",
-                        f"{status} | {len(keywords)} 個關鍵詞，{len(s.get('responses', []))} 個回應\n{kw_preview}"),
+                    value=t(language,
+                        "keywords.keywords_responses",
+                        status=status, keywords_count=len(keywords),
+                        responses_count=len(s.get('responses', [])), kw_preview=kw_preview),
                     inline=False
                 )
 
-        embed.set_footer(text=t(self.language,
-            f"Page {self.current_page + 1}/{total_pages} | {len(self.filtered_items)} set(s) | "
-            f"Use `!keyword info <id>` for full details.",
-            f"第 {self.current_page + 1}/{total_pages} 頁 | 共 {len(self.filtered_items)} 個關鍵詞組 | "
-            f"使用 `!keyword info <id>` 查看完整詳情。"))
+        embed.set_footer(text=t(language,
+            "keywords.page_set_s_use",
+            current_page=page + 1, total_pages=total_pages,
+            filtered_items_count=len(set_ids)))
         return embed
 
-    async def apply_search(self, interaction: discord.Interaction, term: str):
-        term = term.strip().lower()
-        self.search_term = term
-        self.filtered_items = [
-            (set_id, s) for set_id, s in self.all_items
-            if term in set_id.lower() or any(term in kw.lower() for kw in s.get("keywords", []))
-        ]
-        self.current_page = 0
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.ctx.author.id:
-            await interaction.response.send_message(
-                t(self.language, "This isn't your menu to control.", "這不是您可以操作的選單。"),
-                ephemeral=True)
-            return False
-        return True
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(KeywordJumpModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.blurple, row=1)
-    async def search_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(KeywordSearchModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=1)
-    async def clear_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.search_term = None
-        self.filtered_items = self.all_items
-        self.current_page = 0
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.red, row=1)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.edit_message(
-            content=t(self.language, "Keyword menu closed.", "關鍵詞選單已關閉。"), embed=None, view=None)
-        self.stop()
-
-
-class KeywordShowMenu(discord.ui.View):
+    async def on_action(self, interaction: discord.Interaction, action: str, owner_id: int, page: int, arg: str):
+        if action == "search":
+            language = guild_settings.language(interaction.guild_id)
+            await interaction.response.send_modal(SearchModal(
+                self, owner_id, language,
+                title=t(language, "keywords.search_keyword_sets"),
+                label=t(language, "keywords.set_keyword_or_response"),
+                placeholder=t(language, "keywords.e_g_cry")))
+        elif action == "clear":
+            await self.show(interaction, owner_id, 0, "")
+        else:
+            await super().on_action(interaction, action, owner_id, page, arg)
+
+
+class KeywordShowMenu(Menu):
     """Shows one keyword set's full detail, with its responses paginated
     5 at a time (flip buttons only appear if there's more than one page,
-    so a set with few responses doesn't show useless buttons)."""
+    so a set with few responses doesn't show useless buttons). The set
+    id is the buttons' custom_id `arg`."""
+
+    key = "kws"
+    closed_message = "keywords.keyword_menu_closed"
+    always_paged = False
 
     RESPONSE_PAGE_SIZE = 5
 
-    def __init__(self, ctx, set_id: str, s: dict, language: str, timeout: int = 180):
-        super().__init__(timeout=timeout)
-        self.ctx = ctx
-        self.set_id = set_id
-        self.s = s
-        self.language = language
-        self.responses = s.get("responses", [])
-        self.current_page = 0
-
-        self.previous_button.label = t(language, "Previous", "上一頁")
-        self.next_button.label = t(language, "Next", "下一頁")
-        self.jump_button.label = t(language, "🔢 Jump", "🔢 跳頁")
-        self.close_button.label = t(language, "Close", "關閉")
-
-        if self._total_pages() <= 1:
-            self.remove_item(self.previous_button)
-            self.remove_item(self.next_button)
-            self.remove_item(self.jump_button)
-
-    def _total_pages(self):
-        return max(1, math.ceil(len(self.responses) / self.RESPONSE_PAGE_SIZE))
-
-    def get_embed(self):
-        total_pages = self._total_pages()
-        self.current_page = max(0, min(self.current_page, total_pages - 1))
-        start = self.current_page * self.RESPONSE_PAGE_SIZE
-        page_responses = self.responses[start:start + self.RESPONSE_PAGE_SIZE]
+    def __init__(self, manager: KeywordManager):
+        self.manager = manager
 
+    def _set(self, set_id: str):
+        return self.manager.list_sets().get(set_id)
+
+    def page_count(self, language: str, arg: str) -> int:
+        s = self._set(arg) or {}
+        return max(1, math.ceil(len(s.get("responses", [])) / self.RESPONSE_PAGE_SIZE))
+
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        set_id, s = arg, self._set(arg)
         embed = discord.Embed(
-            title=t(self.language, f"Keyword Set: {self.set_id}", f"關鍵詞組：{self.set_id}"),
+            title=t(language, "keywords.keyword_set", set_id=set_id),
             color=discord.Color.blue()
         )
+        if s is None:
+            # Deleted since this menu was opened.
+            embed.description = t(language, "keywords.set_no_longer_exists", set_id=set_id)
+            return embed
+
+        responses = s.get("responses", [])
+        total_pages = max(1, math.ceil(len(responses) / self.RESPONSE_PAGE_SIZE))
+        start = page * self.RESPONSE_PAGE_SIZE
+        page_responses = responses[start:start + self.RESPONSE_PAGE_SIZE]
+
         embed.add_field(
-            name=t(self.language, "Status", "狀態"),
-            value=t(self.language, "Enabled", "已啟用") if self.s.get("enabled", True)
-            else t(self.language, "Disabled", "已停用"),
+            name=t(language, "keywords.status"),
+            value=t(language, "keywords.enabled_2") if s.get("enabled", True)
+            else t(language, "keywords.disabled_2"),
             inline=False
         )
-        keywords = self.s.get("keywords", [])
+        keywords = s.get("keywords", [])
         embed.add_field(
-            name=t(self.language, "Keywords", "關鍵詞"),
-            value=", ".join(f"`{k}`" for k in keywords) if keywords else t(self.language, "(none)", "（無）"),
+            name=t(language, "keywords.keywords"),
+            value=", ".join(f"`{k}`" for k in keywords) if keywords else t(language, "keywords.none"),
             inline=False
         )
         if page_responses:
@@ -257,53 +180,35 @@ class KeywordShowMenu(discord.ui.View):
                 f"[{start + i}] {r[:80]}{'…' if len(r) > 80 else ''}" for i, r in enumerate(page_responses)
             )
         else:
-            responses_value = t(self.language, "(none)", "（無）")
+            responses_value = t(language, "keywords.none")
         embed.add_field(
-            name=t(self.language, "Responses", "回應"),
+            name=t(language, "keywords.responses"),
             value=responses_value,
             inline=False
         )
-        embed.set_footer(text=t(self.language,
-            f"Response page {self.current_page + 1}/{total_pages} | {len(self.responses)} response(s) total.",
-            f"回應第 {self.current_page + 1}/{total_pages} 頁 | 共 {len(self.responses)} 個回應。"))
+        embed.set_footer(text=t(language,
+            "keywords.response_page_response_s",
+            current_page=page + 1, total_pages=total_pages, responses_count=len(responses)))
         return embed
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.ctx.author.id:
-            await interaction.response.send_message(
-                t(self.language, "This isn't your menu to control.", "這不是您可以操作的選單。"),
-                ephemeral=True)
-            return False
-        return True
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self._total_pages()
-        await interaction.response.edit_message(embed=self.get_embed(), view=self)
-
-    @discord.ui.button(style=discord.ButtonStyle.grey, row=0)
-    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(KeywordJumpModal(self, self.language))
-
-    @discord.ui.button(style=discord.ButtonStyle.red, row=0)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.edit_message(
-            content=t(self.language, "Keyword menu closed.", "關鍵詞選單已關閉。"), embed=None, view=None)
-        self.stop()
-
 
 class KeywordsCog(commands.Cog, name="keywords"):
     def __init__(self, bot):
         self.bot = bot
         self.manager = KeywordManager()
+        self.list_menu = KeywordListMenu(self.manager)
+        self.show_menu = KeywordShowMenu(self.manager)
+
+    async def cog_load(self):
+        register_menu(self.bot, self.list_menu)
+        register_menu(self.bot, self.show_menu)
+
+    async def cog_unload(self):
+        unregister_menu(self.list_menu.key)
+        unregister_menu(self.show_menu.key)
 
     def _lang(self, ctx):
-        return get_guild_language(load_settings(), ctx.guild.id)
+        return guild_settings.language(ctx.guild.id)
 
     async def cog_check(self, ctx):
         # Usable by anyone, but only in a server (not DMs), since ctx.guild
@@ -316,13 +221,11 @@ class KeywordsCog(commands.Cog, name="keywords"):
         language = self._lang(ctx) if ctx.guild else "english"
         if isinstance(error, commands.CheckFailure):
             await ctx.send(t(language,
-                "You need administrator permissions to manage keyword sets.",
-                "您需要管理員權限才能管理關鍵詞組。"))
+                "keywords.you_need_administrator_permissions"))
             return
         if isinstance(error, commands.MissingRequiredArgument):
             await ctx.send(t(language,
-                f"Missing argument: `{error.param.name}`. Use `!help keyword` for usage.",
-                f"缺少參數：`{error.param.name}`。使用 `!help keyword` 查看用法。"))
+                "keywords.missing_argument_use_help", error_param_name=error.param.name))
             return
         if isinstance(error.__cause__, KeywordError) or isinstance(error, KeywordError):
             msg = str(error.__cause__ or error)
@@ -330,20 +233,24 @@ class KeywordsCog(commands.Cog, name="keywords"):
             return
         raise error
 
+    # -- autocomplete -----------------------------------------------------
+    async def set_id_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggests existing keyword set ids matching what's typed so far.
+        Shared by every subcommand below that takes an existing set_id."""
+        return [
+            app_commands.Choice(name=set_id, value=set_id)
+            for set_id in self.manager.search_sets(current, AUTOCOMPLETE_LIMIT)
+        ]
+
     @commands.hybrid_group(name="keyword", invoke_without_command=True,
                             description="Manage global keyword-triggered response sets.")
     async def keyword(self, ctx):
         """Manage global keyword-triggered response sets."""
         language = self._lang(ctx)
         await ctx.send(t(language,
-            "Keyword set management. Subcommands: `list`, `info <id>`, `create <id>`, "
-            "`delete <id>`, `enable <id>`, `disable <id>`, `addkeyword <id> <kw>`, "
-            "`removekeyword <id> <kw>`, `addresponse <id> <text>`, `removeresponse <id> <index>`.\n"
-            "Use `!help keyword` for full details.",
-            "關鍵詞組管理。子命令：`list`、`info <id>`、`create <id>`、`delete <id>`、"
-            "`enable <id>`、`disable <id>`、`addkeyword <id> <關鍵詞>`、"
-            "`removekeyword <id> <關鍵詞>`、`addresponse <id> <回應內容>`、`removeresponse <id> <索引>`。\n"
-            "使用 `!help keyword` 查看完整說明。"))
+            "keywords.keyword_set_management_subcommands"))
 
     @keyword.command(name="list", description="Lists all keyword sets in a browsable, searchable menu.")
     async def keyword_list(self, ctx, *, search: str = None):
@@ -353,31 +260,23 @@ class KeywordsCog(commands.Cog, name="keywords"):
         straight into a filtered view; use the Search button in the menu
         itself to change or clear the filter afterwards."""
         language = self._lang(ctx)
-        sets = self.manager.list_sets()
-        if not sets:
-            await ctx.send(t(language, "No keyword sets exist yet.", "尚未建立任何關鍵詞組。"))
+        if not self.manager.list_sets():
+            await ctx.send(t(language, "keywords.no_keyword_sets_exist"))
             return
 
-        menu = KeywordMenu(ctx, sets, language)
-        if search:
-            term = search.strip().lower()
-            menu.search_term = term
-            menu.filtered_items = [
-                (set_id, s) for set_id, s in menu.all_items
-                if term in set_id.lower() or any(term in kw.lower() for kw in s.get("keywords", []))
-            ]
-        await ctx.send(embed=menu.get_embed(), view=menu)
+        term = search.strip().lower() if search else ""
+        await ctx.send(**self.list_menu.message(language, ctx.author.id, 0, term))
 
     @keyword.command(name="info", aliases=["show"], description="Shows the keywords and responses for one set.")
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_info(self, ctx, set_id: str):
         """Shows the keywords and responses for one set (alias: `!keyword show <id>`).
 
         Responses are paginated 5 at a time, with Previous/Next buttons
         that only appear when there's more than one page."""
         language = self._lang(ctx)
-        s = self.manager.get_set(set_id)
-        menu = KeywordShowMenu(ctx, set_id, s, language)
-        await ctx.send(embed=menu.get_embed(), view=menu)
+        self.manager.get_set(set_id)  # raises if missing
+        await ctx.send(**self.show_menu.message(language, ctx.author.id, 0, set_id))
 
     @keyword.command(name="create", description="Creates a new, empty keyword set.")
     @commands.has_permissions(administrator=True)
@@ -386,57 +285,58 @@ class KeywordsCog(commands.Cog, name="keywords"):
         language = self._lang(ctx)
         self.manager.create_set(set_id)
         await ctx.send(t(language,
-            f"Created keyword set `{set_id}`. Add keywords with `!keyword addkeyword {set_id} <word>` "
-            f"and responses with `!keyword addresponse {set_id} <text>`.",
-            f"已建立關鍵詞組 `{set_id}`。使用 `!keyword addkeyword {set_id} <關鍵詞>` 新增關鍵詞，"
-            f"使用 `!keyword addresponse {set_id} <內容>` 新增回應。"))
+            "keywords.created_keyword_set_add", set_id=set_id))
 
     @keyword.command(name="delete", description="Deletes a keyword set entirely.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_delete(self, ctx, set_id: str):
         """Deletes a keyword set entirely."""
         language = self._lang(ctx)
         self.manager.delete_set(set_id)
-        await ctx.send(t(language, f"Deleted keyword set `{set_id}`.", f"已刪除關鍵詞組 `{set_id}`。"))
+        await ctx.send(t(language, "keywords.deleted_keyword_set", set_id=set_id))
 
     @keyword.command(name="enable", description="Enables a keyword set so it starts matching messages again.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_enable(self, ctx, set_id: str):
         """Enables a keyword set so it starts matching messages again."""
         language = self._lang(ctx)
         self.manager.set_enabled(set_id, True)
-        await ctx.send(t(language, f"Enabled keyword set `{set_id}`.", f"已啟用關鍵詞組 `{set_id}`。"))
+        await ctx.send(t(language, "keywords.enabled_keyword_set", set_id=set_id))
 
     @keyword.command(name="disable", description="Disables a keyword set without deleting it.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_disable(self, ctx, set_id: str):
         """Disables a keyword set without deleting it."""
         language = self._lang(ctx)
         self.manager.set_enabled(set_id, False)
-        await ctx.send(t(language, f"Disabled keyword set `{set_id}`.", f"已停用關鍵詞組 `{set_id}`。"))
+        await ctx.send(t(language, "keywords.disabled_keyword_set", set_id=set_id))
 
     @keyword.command(name="addkeyword", description="Adds a trigger keyword to a set.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_addkeyword(self, ctx, set_id: str, *, keyword: str):
         """Adds a trigger keyword to a set."""
         language = self._lang(ctx)
         self.manager.add_keyword(set_id, keyword)
         await ctx.send(t(language,
-            f"Added trigger `{keyword}` to `{set_id}`.",
-            f"已將觸發詞 `{keyword}` 加入 `{set_id}`。"))
+            "keywords.added_trigger_to", keyword=keyword, set_id=set_id))
 
     @keyword.command(name="removekeyword", description="Removes a trigger keyword from a set.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_removekeyword(self, ctx, set_id: str, *, keyword: str):
         """Removes a trigger keyword from a set."""
         language = self._lang(ctx)
         self.manager.remove_keyword(set_id, keyword)
         await ctx.send(t(language,
-            f"Removed trigger `{keyword}` from `{set_id}`.",
-            f"已將觸發詞 `{keyword}` 從 `{set_id}` 移除。"))
+            "keywords.removed_trigger_from", keyword=keyword, set_id=set_id))
 
     @keyword.command(name="addresponse", description="Adds a candidate response text to a set.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_addresponse(self, ctx, set_id: str, *, response: str):
         """Adds a candidate response text to a set."""
         language = self._lang(ctx)
@@ -444,18 +344,17 @@ class KeywordsCog(commands.Cog, name="keywords"):
         s = self.manager.get_set(set_id)
         index = len(s["responses"]) - 1
         await ctx.send(t(language,
-            f"Added response #{index} to `{set_id}`.",
-            f"已將回應 #{index} 加入 `{set_id}`。"))
+            "keywords.added_response_to", index=index, set_id=set_id))
 
     @keyword.command(name="removeresponse", description="Removes a response by its index.")
     @commands.has_permissions(administrator=True)
+    @app_commands.autocomplete(set_id=set_id_autocomplete)
     async def keyword_removeresponse(self, ctx, set_id: str, index: int):
         """Removes a response by its index (see `!keyword info <id>`)."""
         language = self._lang(ctx)
         self.manager.remove_response(set_id, index)
         await ctx.send(t(language,
-            f"Removed response #{index} from `{set_id}`.",
-            f"已將回應 #{index} 從 `{set_id}` 移除。"))
+            "keywords.removed_response_from", index=index, set_id=set_id))
 
 
 async def setup(bot):
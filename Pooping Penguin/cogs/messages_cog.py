@@ -8,46 +8,61 @@ vto.py, split into named steps:
   4. keyword-triggered copypasta responses (now data-driven, see
      keyword_manager.py, instead of the old hardcoded if/elif chain)
   5. "three different users said the same thing in a row" repeat echo
+     (threshold configurable per server/channel, see repeat_tracker.py)
 
-Kept as one on_message listener (rather than 5 separate ones) because
-steps 2-5 are mutually exclusive-ish and ordered the same way the
-original bot behaved - splitting them into independent listeners would
-change behaviour subtly (e.g. commands firing at the same time as
-keyword matches).
+A RoutingTable (routing.py) says which of steps 1, 4 and 5 can fire in
+the channel. Kept as one on_message listener (rather than 5 separate
+ones) because steps 2-5 are ordered the same way the original bot
+behaved.
 """
+import logging
+import time
+
 import discord
 from discord.ext import commands
 
-from config import load_settings, save_settings
-from i18n import get_guild_language
+import metrics
+from guild_settings import guild_settings
 from keyword_manager import KeywordManager
+from log_pipeline import get_logger
+from repeat_tracker import RepeatTracker
+from routing import AUTOREACT, ECHO, KEYWORDS, RoutingTable
+from shuffle_bag import ShuffleBagSampler
+
+activity_log = get_logger("activity")
 
-# How many identical consecutive messages (from different authors) in a
-# channel triggers the bot to repeat it back.
-REPEAT_THRESHOLD = 3
+MESSAGES_SEEN = metrics.counter(
+    "poopenguin_messages_seen_total", "Messages seen, per guild (\"dm\" for direct messages).", ("guild",))
+STAGE_SECONDS = metrics.histogram(
+    "poopenguin_on_message_seconds", "Time on_message spent in each step.", ("stage",))
+KEYWORD_MATCHES = metrics.counter(
+    "poopenguin_keyword_matches_total", "Keyword responses sent, per keyword set.", ("set",))
 
 
 class MessagesCog(commands.Cog, name="messages"):
     def __init__(self, bot):
         self.bot = bot
-        self.keywords = KeywordManager()
-        # channel_id -> list[{'content': str, 'author': int}], most recent last
-        self.recent_messages = {}
-
-    async def _handle_autoreact(self, message):
-        settings = load_settings()
-        channel_id = str(message.channel.id)
-        autoreact = settings.get("autoreact", {})
-        if channel_id not in autoreact:
-            return
+        # Each set's responses rotate (shuffle bag) rather than being
+        # picked independently at random - see shuffle_bag.py.
+        self.keywords = KeywordManager(sampler=ShuffleBagSampler())
+        # Bounded per-channel ring buffers of recent (content hash, author)
+        self.repeats = RepeatTracker()
+        # (guild_id, channel_id) -> which steps apply there
+        self.routes = RoutingTable()
+        # The per-step series, looked up once rather than on every message
+        self._stage = {stage: STAGE_SECONDS.labels(stage).observe
+                       for stage in ("route", "autoreact", "mention", "keywords", "echo", "total")}
+        # METRICS_PER_GUILD=0: one series for every guild together
+        self._all_guilds = None if metrics.METRICS_PER_GUILD else MESSAGES_SEEN.labels("all")
 
-        entry = autoreact[channel_id]
-        # Handle legacy format (bare emoji string instead of a dict).
-        if isinstance(entry, str):
-            entry = {"emoji": entry, "user_id": None}
-            settings["autoreact"][channel_id] = entry
-            save_settings(settings)
+    @commands.Cog.listener()
+    async def on_routing_update(self, guild_id, channel_id=None):
+        """Dispatched by the commands that change a channel's route
+        (!autoreact, !setrepeat, !feature)."""
+        self.routes.invalidate(guild_id, channel_id)
 
+    async def _handle_autoreact(self, message, entry):
+        channel_id = message.channel.id
         emoji = entry["emoji"]
         user_id = entry.get("user_id")
         if user_id is None or str(message.author.id) == user_id:
@@ -70,20 +85,19 @@ class MessagesCog(commands.Cog, name="messages"):
             .strip()
         )
         ctx = await self.bot.get_context(message)
-        language = get_guild_language(load_settings(), message.guild.id)
+        language = guild_settings.language(message.guild.id)
 
         if not command or command in ("poop penguin", "help"):
             await self.bot.get_command("help")(ctx)
             return True
 
-        valid_commands = [c.name for c in self.bot.commands]
-        if command in valid_commands:
+        help_cog = self.bot.get_cog("help")
+        if command in help_cog.command_names():
             await self.bot.get_command("help")(ctx, command=command)
         else:
             from i18n import t
             await message.channel.send(t(language,
-                f"No command named `{command}` found. Use `!help` to see all available commands.",
-                f"未找到名為 `{command}` 的命令。使用 `!help` 查看所有可用命令。"))
+                "messages.no_command_named_found", command=command))
         return True
 
     async def _handle_keywords(self, message):
@@ -96,44 +110,67 @@ class MessagesCog(commands.Cog, name="messages"):
         set_id, response = match
         try:
             await message.channel.send(response)
+            KEYWORD_MATCHES.labels(set_id).inc()
             print(f"Bot sent response from keyword set '{set_id}' in channel {message.channel.id}")
         except discord.Forbidden:
             print(f"Failed to send keyword response in channel {message.channel.id}: Missing permissions")
 
-    async def _handle_repeats(self, message):
+    async def _handle_repeats(self, message, threshold):
         content = message.content.strip()
         if not content:
             return
         channel_id = message.channel.id
-        history = self.recent_messages.setdefault(channel_id, [])
-        history.append({"content": content, "author": message.author.id})
-        del history[:-REPEAT_THRESHOLD]  # keep only the last REPEAT_THRESHOLD
-
-        if len(history) == REPEAT_THRESHOLD:
-            same_content = len({m["content"].lower() for m in history}) == 1
-            distinct_authors = len({m["author"] for m in history}) == REPEAT_THRESHOLD
-            if same_content and distinct_authors:
-                try:
-                    await message.channel.send(content)
-                    self.recent_messages[channel_id] = []
-                except discord.Forbidden:
-                    print(f"Failed to send repeat message in channel {channel_id}: Missing permissions")
+        if self.repeats.observe(channel_id, content, message.author.id, threshold):
+            try:
+                await message.channel.send(content)
+                self.repeats.reset(channel_id)
+            except discord.Forbidden:
+                print(f"Failed to send repeat message in channel {channel_id}: Missing permissions")
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        # DEBUG CHANNEL LOG, Comment out this section if not needed
-        # This will log EVERY message the bot sees across all servers and channels, even from other bots.
-        guild_name = message.guild.name if message.guild else "Direct Message"
-        print(
-            f"[Channel Activity] Server: '{guild_name}' | Channel: #{message.channel} ({message.channel.id}) | Author: {message.author} -> Sent: '{message.content}'")
-        # L__________
+        # Channel activity log: every message the bot sees across all
+        # servers and channels, even from other bots - sampled (1% by
+        # default, LOG_SAMPLE_RATES="activity=..." to change) and written
+        # off the event loop, see log_pipeline.py.
+        if activity_log.isEnabledFor(logging.INFO):
+            activity_log.info(
+                "message seen", extra={
+                    "guild_id": message.guild.id if message.guild else None,
+                    "channel_id": message.channel.id,
+                    "author_id": message.author.id,
+                    "bot": message.author.bot,
+                    "content": message.content,
+                })
+
+        guild_id = message.guild.id if message.guild else None
+        if self._all_guilds is None:
+            MESSAGES_SEEN.labels(guild_id if guild_id is not None else "dm").inc()
+        else:
+            self._all_guilds.inc()
 
         if message.author.bot:
             return
 
-        await self._handle_autoreact(message)
-
-        if await self._handle_mention(message):
+        stage = self._stage
+        started = last = time.perf_counter()
+        route = self.routes.get(guild_id, message.channel.id)
+        now = time.perf_counter()
+        stage["route"](now - last)
+        last = now
+
+        if route.flags & AUTOREACT:
+            await self._handle_autoreact(message, route.autoreact)
+            now = time.perf_counter()
+            stage["autoreact"](now - last)
+            last = now
+
+        handled = await self._handle_mention(message)
+        now = time.perf_counter()
+        stage["mention"](now - last)
+        last = now
+        if handled:
+            stage["total"](now - started)
             return
 
         # NOTE: don't call self.bot.process_commands(message) here.
@@ -141,8 +178,16 @@ class MessagesCog(commands.Cog, name="messages"):
         # built-in on_message handler, and Cog listeners are added
         # *alongside* that (not as a replacement for it). Calling it
         # again here made every "!" command fire twice.
-        await self._handle_keywords(message)
-        await self._handle_repeats(message)
+        if route.flags & KEYWORDS and self.keywords.has_active_sets():
+            await self._handle_keywords(message)
+            now = time.perf_counter()
+            stage["keywords"](now - last)
+            last = now
+        if route.flags & ECHO:
+            await self._handle_repeats(message, route.repeat_threshold)
+            now = time.perf_counter()
+            stage["echo"](now - last)
+        stage["total"](time.perf_counter() - started)
 
 
 async def setup(bot):
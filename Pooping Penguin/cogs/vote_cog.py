@@ -1,32 +1,43 @@
 """
 Timeout voting: !vto/​/vto starts a vote, users react with the vote
-emoji, on_reaction_add tallies votes and applies the timeout once
+emoji, on_raw_reaction_add tallies votes and applies the timeout once
 threshold is reached. !setvote/​/setvote configures how many votes are
 required (or restricts voting to admins only).
 
-vto and setvote are now commands.hybrid_command, so "!vto @user 30m"
-and "/vto member:@user time_str:30m" run the exact same function.
+vto and setvote are commands.hybrid_command, so "!vto @user 30m" and
+"/vto member:@user time_str:30m" run the exact same function. Open
+sessions live in a VoteRegistry (see vote_registry.py), which closes
+them once VOTE_WINDOW_SECONDS pass without enough votes.
 """
-import asyncio
 import re
+import time
 from datetime import timedelta
 
 import discord
 from discord.ext import commands
 
-from config import load_settings, save_settings, load_votes, save_votes
-from i18n import t, get_guild_language
+import metrics
+from guild_settings import guild_settings
+from i18n import t
+from vote_registry import VoteRegistry, VoteSession
 
 VOTE_EMOJI = "🖕"
 VOTE_WINDOW_SECONDS = 180  # 3 minutes
 
+ACTIVE_SESSIONS = metrics.gauge("poopenguin_vote_sessions_active", "Vote sessions currently open.")
+# outcome: ignored (not a vote), rejected (non-admin on an admin-only
+# vote), duplicate (already voted, or the vote already closed), counted,
+# passed (the vote that reached the threshold)
+REACTIONS = metrics.counter(
+    "poopenguin_reactions_processed_total", "Reactions handled by the vote cog, by outcome.", ("outcome",))
+
 
 def parse_time(time_str):
     """Parses '1d' / '2h' / '30m' / '10s' / 'random' into a timedelta.
     Returns None if the string doesn't match any known format."""
     if not time_str:
         return timedelta(minutes=5)
-        if time_str.lower() == "random":
+    if time_str.lower() == "random":
         import random
         rand = random.random() * 100
         if rand < 6.9:
@@ -50,6 +61,38 @@ def parse_time(time_str):
 class VoteCog(commands.Cog, name="vote"):
     def __init__(self, bot):
         self.bot = bot
+        self.registry = VoteRegistry(self._vote_expired)
+
+    async def cog_load(self):
+        self.registry.start()
+        ACTIVE_SESSIONS.set_function(lambda: len(self.registry))
+        self.bot.loop.create_task(self._recover_sessions())
+
+    async def cog_unload(self):
+        self.registry.stop()
+        ACTIVE_SESSIONS.set_function(None)
+
+    async def _recover_sessions(self):
+        # Closing an expired session posts in its channel, which needs
+        # the channel cache - so wait for the gateway first.
+        await self.bot.wait_until_ready()
+        armed = self.registry.recover()
+        if armed:
+            print(f"Re-armed {armed} open vote session(s) after restart")
+
+    async def _vote_expired(self, session):
+        """Called by the registry when a session's window runs out."""
+        channel = self.bot.get_channel(session.channel_id)
+        if channel is None:
+            return
+        guild_id = session.guild_id or getattr(channel.guild, "id", None)
+        language = guild_settings.language(guild_id)
+        mention = f"<@{session.target}>"
+        try:
+            await channel.send(t(language,
+                "vote.not_enough_votes_to", mention=mention))
+        except discord.Forbidden:
+            print(f"Failed to send vote closure message in channel {session.channel_id}: Missing permissions")
 
     @commands.hybrid_command(
         name="vto",
@@ -59,67 +102,46 @@ class VoteCog(commands.Cog, name="vote"):
         time_str="Duration: e.g. 1d, 2h, 30m, 10s, or 'random' (default 5m)")
     async def vto(self, ctx, member: discord.Member, time_str: str = None):
         """Initiates a vote to timeout a member from the server."""
-        settings = load_settings()
-        required_votes = settings["required_votes"]
-        admin_only = settings["admin_only"]
-        language = get_guild_language(settings, ctx.guild.id)
+        guild = guild_settings.get(ctx.guild.id)
+        required_votes = guild.vote.required_votes
+        admin_only = guild.vote.admin_only
+        language = guild.language
 
         timeout_duration = parse_time(time_str)
         if not timeout_duration:
             await ctx.send(t(language,
-                "Invalid time format. Use format like `1d`, `2h`, `30m`, `10s`, or `random`. Default is 5m if omitted.",
-                "無效的時間格式。請使用如 `1d`、`2h`、`30m`、`10s` 或 `random` 的格式。如果省略，默認為 5 分鐘。"))
+                "vote.invalid_time_format_use"))
             return
 
         if not ctx.guild.me.guild_permissions.moderate_members:
             await ctx.send(t(language,
-                "I don't have permission to timeout members!",
-                "我沒有權限暫停成員！"))
+                "vote.i_dont_have_permission"))
             return
 
         is_random = time_str and time_str.lower() == "random"
-        duration_text = "random duration" if is_random else str(timeout_duration)
-        duration_text_cn = "隨機時長" if is_random else str(timeout_duration)
-        threshold_text = "(Admin votes only)" if admin_only else f"({required_votes} votes needed)"
-        threshold_text_cn = "（僅限管理員投票）" if admin_only else f"（需要 {required_votes} 票）"
+        duration_text = t(language, "vote.random_duration") if is_random else str(timeout_duration)
+        threshold_text = t(language, "vote.admin_votes_only") if admin_only else \
+            t(language, "vote.votes_needed", required_votes=required_votes)
 
         vote_message = await ctx.send(t(language,
-            f"Vote to timeout {member.mention} for {duration_text}. React with {VOTE_EMOJI} to vote 'Yes'. {threshold_text}",
-            f"投票暫停 {member.mention} {duration_text_cn}。 使用 {VOTE_EMOJI} 反應投票 '是'。 {threshold_text_cn}"))
+            "vote.vote_to_timeout_for",
+            member_mention=member.mention, duration_text=duration_text, vote_emoji=VOTE_EMOJI,
+            threshold_text=threshold_text))
         # ctx.send() always returns a real discord.Message, whether this
         # command was invoked with "!" or "/", so add_reaction works the
         # same way either way.
         await vote_message.add_reaction(VOTE_EMOJI)
 
-        vote_data = {
-            "message_id": vote_message.id,
-            "target": member.id,
-            "required_votes": required_votes,
-            "admin_only": admin_only,
-            "duration": timeout_duration.total_seconds(),
-            "voters": [],
-            "channel_id": ctx.channel.id,
-        }
-        votes = load_votes()
-        votes[str(vote_data["message_id"])] = vote_data
-        save_votes(votes)
-
-        await asyncio.sleep(VOTE_WINDOW_SECONDS)
-        votes = load_votes()
-        key = str(vote_data["message_id"])
-        if key in votes:
-            vote_data = votes[key]
-            if len(vote_data["voters"]) < vote_data["required_votes"]:
-                try:
-                    channel = ctx.guild.get_channel(int(vote_data["channel_id"]))
-                    if channel:
-                        await channel.send(t(language,
-                            f"Not enough votes to timeout {member.mention}. Vote session closed.",
-                            f"沒有足夠的票數來暫停 {member.mention}。投票已關閉。"))
-                except discord.Forbidden:
-                    print(f"Failed to send vote closure message in channel {vote_data['channel_id']}: Missing permissions")
-                del votes[key]
-                save_votes(votes)
+        self.registry.open(VoteSession(
+            message_id=vote_message.id,
+            target=member.id,
+            required_votes=required_votes,
+            admin_only=admin_only,
+            duration=timeout_duration.total_seconds(),
+            channel_id=ctx.channel.id,
+            guild_id=ctx.guild.id,
+            deadline=time.time() + VOTE_WINDOW_SECONDS,
+        ))
 
     @commands.hybrid_command(
         name="setvote",
@@ -128,82 +150,81 @@ class VoteCog(commands.Cog, name="vote"):
     @commands.has_permissions(administrator=True)
     async def setvote(self, ctx, arg: str):
         """Configures the timeout voting system (Admin only)."""
-        settings = load_settings()
-        language = get_guild_language(settings, ctx.guild.id)
+        language = guild_settings.language(ctx.guild.id)
 
         if arg.lower() == "admin":
-            settings["admin_only"] = True
-            save_settings(settings)
-            await ctx.send(t(language, "Vote mode set to admin-only.", "投票模式設置為僅限管理員。"))
+            guild_settings.set_vote(admin_only=True)
+            await ctx.send(t(language, "vote.vote_mode_set_to"))
             return
 
         try:
             num_votes = int(arg)
         except ValueError:
             await ctx.send(t(language,
-                "Invalid input. Use a number (e.g., `5`) or `admin` for admin-only voting.",
-                "無效輸入。請使用數字（例如，`5`）或 `admin` 進行僅限管理員投票。"))
+                "vote.invalid_input_use_a"))
             return
 
         if num_votes < 1:
-            await ctx.send(t(language, "Number of votes must be at least 1.", "票數必須至少為 1。"))
+            await ctx.send(t(language, "vote.number_of_votes_must"))
             return
 
-        settings["required_votes"] = num_votes
-        settings["admin_only"] = False
-        save_settings(settings)
-        await ctx.send(t(language, f"Required votes set to {num_votes}.", f"所需票數設置為 {num_votes}。"))
+        guild_settings.set_vote(required_votes=num_votes, admin_only=False)
+        await ctx.send(t(language, "vote.required_votes_set_to", num_votes=num_votes))
 
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        if user.bot:
+    async def on_raw_reaction_add(self, payload):
+        # Raw so votes still count on vote messages that have dropped out
+        # of discord.py's message cache (e.g. after a restart).
+        if payload.guild_id is None or str(payload.emoji) != VOTE_EMOJI:
+            REACTIONS.labels("ignored").inc()
             return
-        if str(reaction.emoji) != VOTE_EMOJI:
+        session = self.registry.get(payload.message_id)
+        if session is None:
+            REACTIONS.labels("ignored").inc()
             return
-
-        votes = load_votes()
-        message_id = str(reaction.message.id)
-        if message_id not in votes:
+        member = payload.member
+        if member is None or member.bot:
+            REACTIONS.labels("ignored").inc()
             return
-        vote_data = votes[message_id]
 
-        if vote_data["admin_only"]:
-            member = reaction.message.guild.get_member(user.id)
-            if not member or not member.guild_permissions.administrator:
-                await reaction.remove(user)
-                return
-
-        if user.id in vote_data["voters"]:
+        channel = self.bot.get_channel(payload.channel_id) or self.bot.get_partial_messageable(
+            payload.channel_id, guild_id=payload.guild_id)
+        if session.admin_only and not member.guild_permissions.administrator:
+            REACTIONS.labels("rejected").inc()
+            try:
+                await channel.get_partial_message(payload.message_id).remove_reaction(payload.emoji, member)
+            except discord.HTTPException:
+                pass
             return
 
-        vote_data["voters"].append(user.id)
-        votes[message_id] = vote_data
-        save_votes(votes)
-
-        if len(vote_data["voters"]) < vote_data["required_votes"]:
-            return
+        # Counting the vote and checking the threshold happen under the
+        # session's lock, so exactly one reaction ever gets to apply the
+        # timeout - see vote_registry.py.
+        async with session.lock:
+            if session.closed or not self.registry.add_voter(session, member.id):
+                REACTIONS.labels("duplicate").inc()
+                return
+            if len(session.voters) < session.required_votes:
+                REACTIONS.labels("counted").inc()
+                return
+            self.registry.remove(session)
+        REACTIONS.labels("passed").inc()
 
-        target = reaction.message.guild.get_member(vote_data["target"])
-        language = get_guild_language(load_settings(), reaction.message.guild.id)
+        guild = member.guild
+        target = guild.get_member(session.target)
+        language = guild_settings.language(guild.id)
         if target:
             try:
-                duration = timedelta(seconds=vote_data["duration"])
+                duration = timedelta(seconds=session.duration)
                 await target.timeout(duration, reason="Voted to timeout")
-                await reaction.message.channel.send(t(language,
-                    f"{target.mention} has been timed out for {duration}.",
-                    f"{target.mention} 已被暫停 {duration}。"))
+                await channel.send(t(language,
+                    "vote.has_been_timed_out", target_mention=target.mention, duration=duration))
             except discord.Forbidden:
-                await reaction.message.channel.send(t(language,
-                    "I don't have permission to timeout this member!",
-                    "我沒有權限暫停此成員！"))
+                await channel.send(t(language,
+                    "vote.i_dont_have_permission_2"))
             except Exception as e:
-                await reaction.message.channel.send(t(language,
-                    f"An error occurred: {str(e)}",
-                    f"發生錯誤：{str(e)}"))
-
-        del votes[message_id]
-        save_votes(votes)
-
+                await channel.send(t(language,
+                    "vote.an_error_occurred", e=e))
 
 async def setup(bot):
     await bot.add_cog(VoteCog(bot))
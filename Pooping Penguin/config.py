@@ -2,10 +2,24 @@
 Central place for file paths and generic JSON load/save helpers.
 
 Every persistent JSON file the bot uses lives under DATA_DIR so the
-project root stays clean.
+project root stays clean. Loaded documents are cached in memory, saves
+are written behind in batches on a single I/O thread, and each document
+is brought up to the current schema (migrations.py) as it's read. The
+document a load_*() returns is the cached one: mutate it and pass it to
+the matching save_*().
 """
+import asyncio
+import atexit
 import json
 import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from migrations import SCHEMA_KEY, MigrationError, backup, current_version, document_name, pending, upgrade
+from log_pipeline import get_logger
+from storage import open_backend
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
@@ -13,33 +27,320 @@ SETTINGS_FILE = os.path.join(DATA_DIR, "vote_settings.json")
 VOTES_FILE = os.path.join(DATA_DIR, "votes.json")
 KEYWORDS_FILE = os.path.join(DATA_DIR, "keyword_sets.json")
 COPYPASTA_FILE = os.path.join(DATA_DIR, "copypasta_sets.json")
+ROTATION_FILE = os.path.join(DATA_DIR, "rotation.json")
+DOCUMENT_FILES = (SETTINGS_FILE, VOTES_FILE, KEYWORDS_FILE, COPYPASTA_FILE, ROTATION_FILE)
+# Where migrations.py keeps the pre-migration copy of each document it upgrades.
+BACKUP_DIR = os.path.join(DATA_DIR, "backups")
+
+# Only used when STORAGE_BACKEND=sqlite, see storage.py.
+DATABASE_FILE = os.path.join(DATA_DIR, "poopenguin.db")
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json")
 
-DEFAULT_SETTINGS = {"required_votes": 3, "admin_only": False, "language": {}, "autoreact": {}}
+DEFAULT_SETTINGS = {"required_votes": 3, "admin_only": False, "language": {}, "autoreact": {},
+                    "repeat_threshold": {}, "features": {}}
+DEFAULT_VOTES = {"sessions": {}}
 DEFAULT_KEYWORDS = {"sets": {}}
 DEFAULT_COPYPASTA = {"types": {}}
+DEFAULT_ROTATION = {"bags": {}}
+
+# Minimum seconds between two checks of the same document for edits made
+# outside this process. Writes made through _save() are seen immediately.
+RELOAD_CHECK_INTERVAL = 1.0
+
+_backend = open_backend(STORAGE_BACKEND, DATABASE_FILE)
+
+# path -> [data, storage signature, monotonic time of the last check]
+_cache = {}
+# path -> the default a missing document starts out as
+_defaults = {
+    SETTINGS_FILE: DEFAULT_SETTINGS,
+    VOTES_FILE: DEFAULT_VOTES,
+    KEYWORDS_FILE: DEFAULT_KEYWORDS,
+    COPYPASTA_FILE: DEFAULT_COPYPASTA,
+    ROTATION_FILE: DEFAULT_ROTATION,
+}
+# path -> int, see generation()
+_generations = {}
+# path -> int, see reloads()
+_reloads = {}
+
+# Seconds a saved document waits in memory before it's written to disk.
+# Every save to the same file inside that window is folded into one write.
+FLUSH_DELAY = 1.0
+
+# path -> document saved but not yet handed to the I/O thread
+_dirty = {}
+# path -> document the I/O thread is writing right now
+_writing = {}
+# asyncio.Task sleeping out FLUSH_DELAY before the next flush, if any
+_flush_task = None
+# Held for the whole of a flush_async(), so two flushes never interleave
+_flush_lock = asyncio.Lock()
+
+STORAGE_OPERATIONS = metrics.counter(
+    "poopenguin_storage_operations_total", "Documents read from / written to storage.", ("file", "op"))
+STORAGE_BYTES = metrics.counter(
+    "poopenguin_storage_bytes_total", "Bytes read from / written to storage.", ("file", "op"))
+STORAGE_SECONDS = metrics.histogram(
+    "poopenguin_storage_seconds", "Time one storage read or write took.", ("file", "op"))
+
+def _record(path, op, size, seconds):
+    name = document_name(path)
+    STORAGE_OPERATIONS.labels(name, op).inc()
+    STORAGE_BYTES.labels(name, op).inc(size)
+    STORAGE_SECONDS.labels(name, op).observe(seconds)
+
+# The one thread that touches storage once start() has run. A single
+# worker means writes to the same document land in the order they were
+# saved, without any locking on this side.
+_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-io")
+# asyncio.Task polling storage for outside edits, see start()
+_watch_task = None
+
+logger = get_logger("config")
+
+def _bump(path, reloaded=False):
+    _generations[path] = _generations.get(path, 0) + 1
+    if reloaded:
+        _reloads[path] = _reloads.get(path, 0) + 1
+
+def generation(path):
+    """How many times path's cached document has been replaced or saved."""
+    return _generations.get(path, 0)
+
+def reloads(path):
+    """How many times path's cached document has been (re)read from
+    storage. Unlike generation(), saves don't count."""
+    return _reloads.get(path, 0)
+
+def _pending(path):
+    """True while path has changes newer than what's in storage - the
+    stored copy mustn't be allowed to "change" it back until they land."""
+    return path in _dirty or path in _writing
 
-# DEBUG: prints once, when config.py is first imported, so you can confirm
-# the bot process is reading/writing the exact file you're checking on disk
-# (e.g. rules out a second copy of the project, or a container without a
-# persistent volume mounted for data/). Safe to delete once confirmed.
-print(f"[config.py] DATA_DIR resolved to: {DATA_DIR}")
-print(f"[config.py] COPYPASTA_FILE resolved to: {COPYPASTA_FILE}")
-print(f"[config.py] COPYPASTA_FILE exists on disk right now: {os.path.exists(COPYPASTA_FILE)}")
+def _fresh(path, data, default):
+    """`data` as read by _read_current(), or a copy of the default (which
+    is already in the current shape) if nothing was stored."""
+    if data is None:
+        data = json.loads(json.dumps(default))  # deep copy
+        data[SCHEMA_KEY] = current_version(document_name(path))
+    return data
+
+def _read_current(path):
+    """Read path from storage and upgrade it to the current schema,
+    backing up the stored original first if there was anything to do.
+    Returns (document or None, whether it was migrated). Runs on the I/O
+    thread once start() has run."""
+    started = time.perf_counter()
+    data = _backend.read(path)
+    if data is None:
+        return None, False
+    _record(path, "read", _backend.read_size, time.perf_counter() - started)
+    name = document_name(path)
+    steps = pending(name, data)
+    if not steps:
+        return data, False
+    saved_to = backup(BACKUP_DIR, name, data)
+    upgrade(name, data)
+    logger.info("migrated %s to v%s (%d step(s)), original backed up to: %s",
+                name, current_version(name), len(steps), saved_to)
+    return data, True
 
 def _load(path, default):
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return json.loads(json.dumps(default))  # deep copy
+    _defaults.setdefault(path, default)
+    entry = _cache.get(path)
+    if entry is not None and _watch_task is not None:
+        # start() has run: the watcher keeps the cache current from the
+        # I/O thread, so the event loop never waits on storage here.
+        return entry[0]
+
+    now = time.monotonic()
+    if entry is not None:
+        if _pending(path) or now - entry[2] < RELOAD_CHECK_INTERVAL:
+            return entry[0]
+        signature = _backend.signature(path)
+        if signature == entry[1]:
+            entry[2] = now
+            return entry[0]
+    else:
+        signature = _backend.signature(path)
+
+    data, migrated = _read_current(path) if signature is not None else (None, False)
+    data = _fresh(path, data, default)
+    _cache[path] = [data, signature, now]
+    _bump(path, reloaded=True)
+    if migrated:
+        _save(path, data)
+    return data
+
+def _commit(path, payload):
+    """Runs on the I/O thread: put an already-serialized document into
+    storage and report (bytes written, new signature)."""
+    started = time.perf_counter()
+    size = _backend.commit(path, payload)
+    _record(path, "write", size, time.perf_counter() - started)
+    return size, _backend.signature(path)
+
+def _written(path, data, size, signature):
+    entry = _cache.get(path)
+    if entry is not None and entry[0] is data and not _pending(path):
+        entry[1] = signature
+        entry[2] = time.monotonic()
+    logger.debug("wrote %d bytes to %s (%s)", size, os.path.abspath(path), _backend.name)
+
+def flush():
+    """Write every dirty document to storage now, from the calling
+    thread. Used where there's no event loop to hand off to (scripts,
+    atexit); the bot itself flushes through flush_async(). A document that
+    fails to write stays dirty (and keeps winning over storage), so the
+    next save or flush retries it."""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        _flush_task = None
+    # A flush_async() cut short with the loop (atexit) may have left a
+    # document mid-write; write it again rather than lose it.
+    for path, data in _writing.items():
+        _dirty.setdefault(path, data)
+    failed = {}
+    while _dirty:
+        path, data = _dirty.popitem()
+        try:
+            size, signature = _commit(path, _backend.prepare(path, data))
+        except Exception as e:
+            logger.error("failed to write %s: %r", path, e)
+            failed[path] = data
+        else:
+            _written(path, data, size, signature)
+    _dirty.update(failed)
+
+atexit.register(flush)
+
+async def flush_async():
+    """Write every dirty document to storage without blocking the event
+    loop: each one is serialized here (so the snapshot is consistent - no
+    other coroutine can touch it mid-dump) and the actual file/database
+    write runs on the I/O thread."""
+    loop = asyncio.get_running_loop()
+    async with _flush_lock:
+        failed = {}
+        try:
+            # One document at a time, each taken out of _dirty only as
+            # its own write starts: whatever hasn't been reached yet stays
+            # dirty if this flush is cancelled or anything else goes wrong.
+            for path in list(_dirty):
+                data = _dirty.pop(path, None)
+                if data is None:
+                    continue
+                _writing[path] = data
+                try:
+                    payload = _backend.prepare(path, data)
+                    size, signature = await loop.run_in_executor(_io, _commit, path, payload)
+                except Exception as e:
+                    logger.error("failed to write %s: %r", path, e)
+                    failed[path] = data
+                    continue
+                except BaseException:
+                    # Cancelled mid-write: the write may or may not land,
+                    # so keep the document dirty for the next flush.
+                    failed[path] = data
+                    raise
+                finally:
+                    del _writing[path]
+                _written(path, data, size, signature)
+        finally:
+            # A newer save may have come in while these were failing.
+            for path, data in failed.items():
+                _dirty.setdefault(path, data)
+
+async def _flush_later():
+    global _flush_task
+    await asyncio.sleep(FLUSH_DELAY)
+    _flush_task = None
+    await flush_async()
 
 def _save(path, data):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    # DEBUG: confirms every write, with the absolute path and the size of
-    # what was actually written to disk. Safe to delete once confirmed.
-    size = os.path.getsize(path)
-    print(f"[config.py] wrote {size} bytes to: {os.path.abspath(path)}")
+    global _flush_task
+    _cache[path] = [data, None, time.monotonic()]
+    _bump(path)
+    _dirty[path] = data
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush()
+        return
+    if _flush_task is None:
+        _flush_task = loop.create_task(_flush_later())
+
+async def _watch():
+    """Polls storage for edits made outside this process (hand-edited
+    JSON, `python storage.py import` against a live database), doing every
+    stat()/read on the I/O thread and only swapping the result into the
+    cache back on the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(RELOAD_CHECK_INTERVAL)
+        for path in list(_cache):
+            if _pending(path):
+                continue
+            try:
+                signature = await loop.run_in_executor(_io, _backend.signature, path)
+                entry = _cache.get(path)
+                if entry is None or signature == entry[1] or _pending(path):
+                    continue
+                data, migrated = None, False
+                if signature is not None:
+                    data, migrated = await loop.run_in_executor(_io, _read_current, path)
+            except (OSError, ValueError, sqlite3.Error, MigrationError) as e:
+                logger.error("failed to re-read %s: %s", path, e)
+                continue
+            if _pending(path):
+                continue
+            data = _fresh(path, data, _defaults[path])
+            _cache[path] = [data, signature, time.monotonic()]
+            _bump(path, reloaded=True)
+            if migrated:
+                _save(path, data)
+
+async def start():
+    """Load every document into memory on the I/O thread and start
+    watching storage for outside edits. After this, load_*() calls are
+    served from memory and save_*() calls only ever write from the I/O
+    thread, so nothing in here blocks the event loop on disk. Documents
+    stored in an older schema are migrated here; one from a newer version
+    of the bot than this raises MigrationError rather than being
+    guessed at."""
+    global _watch_task
+    if _watch_task is not None:
+        return
+    logger.info("loading data from %s (%s storage)", DATA_DIR, _backend.name)
+    loop = asyncio.get_running_loop()
+    for path in DOCUMENT_FILES:
+        if path in _cache:
+            continue
+        signature = await loop.run_in_executor(_io, _backend.signature, path)
+        data, migrated = None, False
+        if signature is not None:
+            data, migrated = await loop.run_in_executor(_io, _read_current, path)
+        data = _fresh(path, data, _defaults[path])
+        _cache[path] = [data, signature, time.monotonic()]
+        _bump(path, reloaded=True)
+        if migrated:
+            _save(path, data)
+    _watch_task = loop.create_task(_watch())
+
+async def stop():
+    """Stop watching, write out everything still pending and wait for the
+    I/O thread to finish. Called by bot.py on shutdown."""
+    global _watch_task, _flush_task
+    if _watch_task is not None:
+        _watch_task.cancel()
+        _watch_task = None
+    if _flush_task is not None:
+        _flush_task.cancel()
+        _flush_task = None
+    await flush_async()
+    await asyncio.get_running_loop().run_in_executor(None, _io.shutdown)
 
 def load_settings():
     return _load(SETTINGS_FILE, DEFAULT_SETTINGS)
@@ -48,7 +349,7 @@ def save_settings(settings):
     _save(SETTINGS_FILE, settings)
 
 def load_votes():
-    return _load(VOTES_FILE, {})
+    return _load(VOTES_FILE, DEFAULT_VOTES)
 
 def save_votes(votes):
     _save(VOTES_FILE, votes)
@@ -65,3 +366,9 @@ def load_copypasta():
 
 def save_copypasta(data):
     _save(COPYPASTA_FILE, data)
+
+def load_rotation():
+    return _load(ROTATION_FILE, DEFAULT_ROTATION)
+
+def save_rotation(data):
+    _save(ROTATION_FILE, data)
@@ -94,11 +94,22 @@ unaffected. If `{game}` is filled with something that doesn't match any
 game_key/display/alias, rendering fails with a clear CopypastaError
 listing the valid options, rather than silently leaving `{{...}}`
 tokens unresolved in the output.
+
+--- Caches ---
+Each template is parsed once into a CompiledTemplate, so rendering is
+filling slots and one "".join(); game_terms types also cache a game
+alias index and each (template, game) variant. Type ids are looked up
+through a NameIndex (name_index.py) and searched through a TextIndex
+(text_index.py). All of these are dropped when the document is
+reloaded from storage.
 """
 import random
 import re
 
-from config import load_copypasta, save_copypasta
+import metrics
+from config import COPYPASTA_FILE, generation, load_copypasta, reloads, save_copypasta
+from name_index import NameIndex
+from text_index import TextIndex
 
 # Matches {anything_word_like}, e.g. {text}, {people}, {act} - but NOT
 # a {word} that's itself wrapped in an extra pair of braces (the
@@ -112,6 +123,19 @@ PLACEHOLDER_RE = re.compile(r"(?<!\{)\{(\w+)\}(?!\})")
 # values the way {name} placeholders are.
 TERM_RE = re.compile(r"\{\{([^{}]+)\}\}")
 
+# Longest type id create_type() accepts - it has to fit in a menu
+# button's custom_id (menus.MAX_MENU_ARG).
+MAX_TYPE_ID_LENGTH = 50
+
+RENDERS = metrics.counter(
+    "poopenguin_copypasta_renders_total", "Copypasta templates rendered, per type.", ("type",))
+
+
+# Any {word} token - inside a literal segment only the ones naming one of
+# the template's own placeholders become slots, the same tokens
+# str.replace() used to substitute.
+_TOKEN_RE = re.compile(r"\{(\w+)\}")
+
 
 class CopypastaError(Exception):
     """Raised for invalid copypasta-type operations (bad name, duplicate, etc)."""
@@ -129,6 +153,118 @@ def extract_placeholders(template: str):
     return seen
 
 
+class CompiledTemplate:
+    """One template, pre-split for single-pass rendering (see module
+    docstring). `parts` holds the literal segments with a None hole
+    for each slot; `placeholder_slots` are (hole, index into values)
+    and `term_slots` are (hole, term_key, index into values of a
+    placeholder with the same name, or None)."""
+
+    __slots__ = ("text", "placeholders", "parts", "placeholder_slots", "term_slots", "variants")
+
+    def __init__(self, text, placeholders, parts, placeholder_slots, term_slots):
+        self.text = text
+        self.placeholders = placeholders
+        self.parts = parts
+        self.placeholder_slots = placeholder_slots
+        self.term_slots = term_slots
+        # game_key -> this template with that game's terms resolved,
+        # see with_terms()
+        self.variants = {}
+
+    def render(self, values, terms=None) -> str:
+        """Fill in `values` (one per self.placeholders, in order) and, if
+        `terms` is given, the {{term_key}} tokens it has entries for.
+        A token without a term is left as-is - with its inner {name}
+        still filled in if it names a placeholder, like before."""
+        parts = self.parts[:]
+        for hole, i in self.placeholder_slots:
+            parts[hole] = values[i]
+        for hole, key, i in self.term_slots:
+            if terms is not None and key in terms:
+                parts[hole] = str(terms[key])
+            elif i is not None:
+                parts[hole] = "{" + values[i] + "}"
+            else:
+                parts[hole] = "{{" + key + "}}"
+        return "".join(parts)
+
+    def with_terms(self, terms: dict) -> "CompiledTemplate":
+        """A copy with every {{term_key}} token resolved from `terms` (the
+        same way render() would) and folded into the literal text, so
+        only placeholder slots are left to fill."""
+        holes = {hole: ("value", i) for hole, i in self.placeholder_slots}
+        for hole, key, i in self.term_slots:
+            if key in terms:
+                holes[hole] = ("text", str(terms[key]))
+            elif i is not None:
+                holes[hole] = ("braced", i)
+            else:
+                holes[hole] = ("text", "{{" + key + "}}")
+
+        parts = [""]
+        placeholder_slots = []
+        for n, part in enumerate(self.parts):
+            if part is not None:
+                parts[-1] += part
+                continue
+            kind, arg = holes[n]
+            if kind == "text":
+                parts[-1] += arg
+                continue
+            if kind == "braced":
+                parts[-1] += "{"
+            placeholder_slots.append((len(parts), arg))
+            parts.append(None)
+            parts.append("}" if kind == "braced" else "")
+        return CompiledTemplate(self.text, self.placeholders, parts, placeholder_slots, [])
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    placeholders = extract_placeholders(template) or ["text"]
+    index = {name: i for i, name in enumerate(placeholders)}
+    parts = []
+    placeholder_slots = []
+    term_slots = []
+
+    def add_literal(text):
+        last = 0
+        for match in _TOKEN_RE.finditer(text):
+            i = index.get(match.group(1))
+            if i is None:
+                continue
+            parts.append(text[last:match.start()])
+            placeholder_slots.append((len(parts), i))
+            parts.append(None)
+            last = match.end()
+        parts.append(text[last:])
+
+    pos = 0
+    for match in TERM_RE.finditer(template):
+        add_literal(template[pos:match.start()])
+        key = match.group(1)
+        term_slots.append((len(parts), key, index.get(key)))
+        parts.append(None)
+        pos = match.end()
+    add_literal(template[pos:])
+    return CompiledTemplate(template, placeholders, parts, placeholder_slots, term_slots)
+
+
+def build_game_index(game_terms: dict) -> dict:
+    """Lowercased game_key/display/alias -> game_key for a type's
+    game_terms. When two games share a name, the one listed first wins,
+    same as resolve_game_key()."""
+    index = {}
+    for game_key, info in game_terms.items():
+        names = [game_key, str(info.get("display", ""))]
+        names.extend(str(a) for a in info.get("aliases", []))
+        for name in names:
+            name = name.strip().lower()
+            if name:
+                index.setdefault(name, game_key)
+    return index
+
+
 def resolve_game_key(game_terms: dict, raw: str):
     """Match a user-typed game string against a type's game_terms dict,
     case-insensitively, by game_key, "display" name, or any "aliases"
@@ -147,9 +283,21 @@ def resolve_game_key(game_terms: dict, raw: str):
 
 
 class CopypastaManager:
-    def __init__(self):
+    def __init__(self, sampler=None):
+        # Optional shuffle_bag.ShuffleBagSampler deciding pick()'s order
+        self.sampler = sampler
         self._data = load_copypasta()
-        self._data.setdefault("types", {})
+        # type_id -> [CompiledTemplate, ...], parallel to its "templates"
+        self._compiled = {}
+        # type_id -> build_game_index() of its game_terms
+        self._game_indexes = {}
+        # NameIndex of type ids for search_types(), built on first use
+        self._type_index = None
+        # TextIndex of type ids + templates for type_ids(search), built on
+        # first use, and the last (generation, search, result) it gave
+        self._text_index = None
+        self._last_search = None
+        self._compiled_reloads = reloads(COPYPASTA_FILE)
 
     # -- persistence -----------------------------------------------------
     def _save(self):
@@ -157,23 +305,30 @@ class CopypastaManager:
 
     def _reload(self):
         self._data = load_copypasta()
-        self._data.setdefault("types", {})
-
-    def _ensure_placeholders(self, s: dict):
-        """Back-fill 'placeholders' for types saved before this field
-        existed (old data only had 'templates' + 'enabled'), by deriving
-        it from the first template. Doesn't write to disk by itself -
-        callers that mutate the type already call self._save()."""
-        if "placeholders" not in s:
-            templates = s.get("templates", [])
-            s["placeholders"] = extract_placeholders(templates[0]) if templates else []
-        return s
+        current = reloads(COPYPASTA_FILE)
+        if current != self._compiled_reloads:
+            self._compiled.clear()
+            self._game_indexes.clear()
+            self._type_index = None
+            self._text_index = None
+            self._compiled_reloads = current
+
+    def _compiled_templates(self, type_id: str, s: dict) -> list:
+        compiled = self._compiled.get(type_id)
+        if compiled is None:
+            compiled = [compile_template(t) for t in s.get("templates", [])]
+            self._compiled[type_id] = compiled
+        return compiled
+
+    def _game_index(self, type_id: str, game_terms: dict) -> dict:
+        index = self._game_indexes.get(type_id)
+        if index is None:
+            index = self._game_indexes[type_id] = build_game_index(game_terms)
+        return index
 
     # -- read --------------------------------------------------------------
     def list_types(self):
         self._reload()
-        for s in self._data["types"].values():
-            self._ensure_placeholders(s)
         return self._data["types"]
 
     def get_type(self, type_id: str):
@@ -181,69 +336,98 @@ class CopypastaManager:
         s = self._data["types"].get(type_id)
         if s is None:
             raise CopypastaError(f"No copypasta type named '{type_id}'.")
-        return self._ensure_placeholders(s)
+        return s
+
+    def _types_index(self) -> NameIndex:
+        self._reload()
+        if self._type_index is None:
+            self._type_index = NameIndex(self._data["types"])
+        return self._type_index
 
-    def _substitute(self, type_id: str, s: dict, template: str, placeholders: list, values: list) -> str:
+    def search_types(self, query: str, limit: int = 25) -> list:
+        """Type ids containing `query`, exact match first, then prefix
+        matches, then the rest - for slash-command autocomplete."""
+        return self._types_index().search(query, limit)
+
+    def _search_index(self) -> TextIndex:
+        self._reload()
+        if self._text_index is None:
+            index = TextIndex()
+            for type_id, s in self._data["types"].items():
+                index.add(type_id, "id", type_id)
+                for template in s.get("templates", []):
+                    index.add(type_id, "template", template)
+            self._text_index = index
+        return self._text_index
+
+    def type_ids(self, search: str = None) -> list:
+        """Every type id in sorted order, or - given `search` - the types
+        whose id or a template contains it (case-insensitive), best
+        match first. For the !copypasta list menu."""
+        if not search:
+            return self._types_index().sorted_names()
+        index = self._search_index()
+        current = generation(COPYPASTA_FILE)
+        if self._last_search is None or self._last_search[:2] != (current, search):
+            self._last_search = (current, search, index.search(search))
+        return self._last_search[2]
+
+    def _substitute(self, type_id: str, s: dict, compiled: CompiledTemplate, values: list) -> str:
         """Core substitution shared by both value-matching strategies
-        below: resolves any {{term_key}} game-term tokens (if the type
-        has "game_terms" and a "game" placeholder), then replaces each
-        {name} in `template` with the corresponding entry in `values`
-        (`placeholders`/`values` are already the same length and in the
-        same order at this point - name-vs-position matching happens
-        before this is called)."""
-        values = list(values)
+        below: renders `compiled` with `values` (already one per
+        compiled.placeholders, in the same order - name-vs-position
+        matching happens before this is called), or - if the type has
+        "game_terms" and the template a "game" placeholder - its cached
+        variant for the game `values` names, {{term_key}} tokens
+        already resolved."""
         game_terms = s.get("game_terms")
-        if game_terms and "game" in placeholders:
-            game_index = placeholders.index("game")
-            game_raw = values[game_index]
-            game_key = resolve_game_key(game_terms, game_raw)
-            if game_key is None:
-                options = ", ".join(
-                    f"`{key}`" + (f" ({info['display']})" if info.get("display") else "")
-                    for key, info in game_terms.items())
-                raise CopypastaError(
-                    f"`{type_id}` doesn't recognise game '{game_raw}'. Try one of: {options}.")
-            terms = game_terms[game_key]
-
-            def resolve_term(match):
-                key = match.group(1)
-                return str(terms[key]) if key in terms else match.group(0)
-
-            template = TERM_RE.sub(resolve_term, template)
-            # Show the game's canonical display name wherever the plain
-            # {game} placeholder appears, regardless of how the user
-            # capitalised/spelled the alias they typed.
-            if terms.get("display"):
-                values[game_index] = terms["display"]
-
-        rendered = template
-        for name, value in zip(placeholders, values):
-            rendered = rendered.replace(f"{{{name}}}", value)
-        return rendered
+        if not (game_terms and "game" in compiled.placeholders):
+            return compiled.render(values)
 
-    def _fill(self, type_id: str, s: dict, template: str, values: list) -> str:
-        """Render one template's text from a plain positional `values`
-        list, matched 1:1 against THIS template's own placeholders (in
-        the order they first appear in its text) - not the type's
-        overall declared set, so a template that only uses some of the
-        type's placeholder pool only asks for (and inserts) that subset.
-        Used by render() (a specific template is already known) and by
+        values = list(values)
+        game_index = compiled.placeholders.index("game")
+        game_raw = values[game_index]
+        game_key = self._game_index(type_id, game_terms).get((game_raw or "").strip().lower())
+        if game_key is None:
+            options = ", ".join(
+                f"`{key}`" + (f" ({info['display']})" if info.get("display") else "")
+                for key, info in game_terms.items())
+            raise CopypastaError(
+                f"`{type_id}` doesn't recognise game '{game_raw}'. Try one of: {options}.")
+        terms = game_terms[game_key]
+        # Show the game's canonical display name wherever the plain
+        # {game} placeholder appears, regardless of how the user
+        # capitalised/spelled the alias they typed.
+        if terms.get("display"):
+            values[game_index] = terms["display"]
+
+        variant = compiled.variants.get(game_key)
+        if variant is None:
+            variant = compiled.variants[game_key] = compiled.with_terms(terms)
+        return variant.render(values)
+
+    def _fill(self, type_id: str, s: dict, compiled: CompiledTemplate, values: list) -> str:
+        """Render one template from a plain positional `values` list,
+        matched 1:1 against THIS template's own placeholders (in the
+        order they first appear in its text) - not the type's overall
+        declared set, so a template that only uses some of the type's
+        placeholder pool only asks for (and inserts) that subset. Used
+        by render() (a specific template is already known) and by
         pick() when it's given a plain list (the classic
         `!copypasta <type> <values>` text command, which has no
         placeholder *names* to match by, only values in pool order)."""
-        placeholders = extract_placeholders(template) or ["text"]
-        values = list(values)
+        placeholders = compiled.placeholders
         if len(values) != len(placeholders):
             needed = " ".join(f"{{{name}}}" for name in placeholders)
             raise CopypastaError(
                 f"This `{type_id}` template needs {len(placeholders)} value(s) "
                 f"({needed}), but got {len(values)}.")
-        return self._substitute(type_id, s, template, placeholders, values)
+        return self._substitute(type_id, s, compiled, values)
 
-    def _fill_named(self, type_id: str, s: dict, template: str, values_by_name: dict) -> str:
-        """Render one template's text from a {placeholder_name: value}
-        dict instead of a positional list - used by pick() when the
-        caller already knows which name each value belongs to (the
+    def _fill_named(self, type_id: str, s: dict, compiled: CompiledTemplate, values_by_name: dict) -> str:
+        """Render one template from a {placeholder_name: value} dict
+        instead of a positional list - used by pick() when the caller
+        already knows which name each value belongs to (the
         Random-button form in /copypasta info, which has one labeled
         field per placeholder in the type's *whole* pool). This picked
         template may only use a subset of that pool, so any names in
@@ -252,7 +436,7 @@ class CopypastaManager:
         keep the wrong ones if the unused placeholder isn't the last
         one, e.g. pool [name, game, character] but this template only
         uses {game}/{character})."""
-        placeholders = extract_placeholders(template) or ["text"]
+        placeholders = compiled.placeholders
         missing = [p for p in placeholders if p not in values_by_name]
         if missing:
             needed = " ".join(f"{{{name}}}" for name in placeholders)
@@ -260,9 +444,9 @@ class CopypastaManager:
                 f"This `{type_id}` template needs {needed}, but no value was given for "
                 f"{{{missing[0]}}}.")
         values = [values_by_name[name] for name in placeholders]
-        return self._substitute(type_id, s, template, placeholders, values)
+        return self._substitute(type_id, s, compiled, values)
 
-    def pick(self, type_id: str, values, avoid_index: int = None):
+    def pick(self, type_id: str, values, guild_id=None):
         """Return (index, rendered_text) for a random template in type_id,
         with each of the type's {placeholder} names replaced by the
         corresponding entry in `values`, and any {{game_term}} tokens
@@ -276,11 +460,12 @@ class CopypastaManager:
         placeholders the picked template doesn't use are ignored rather
         than erroring - see pick_named()/_fill_named()).
 
-        If the pool has more than one template and avoid_index is given,
-        the same index is rerolled once so the exact same line doesn't
-        fire twice in a row for that type - this is the "don't repeat/
-        collide with each other" behaviour, on top of pools never mixing
-        across types in the first place."""
+        With a sampler and a guild_id, which template comes next is up
+        to that server's rotation for the type (see shuffle_bag.py), so
+        lines don't repeat until the pool's been used up - this is the
+        "don't repeat/collide with each other" behaviour, on top of pools
+        never mixing across types in the first place. Otherwise it's a
+        plain random pick."""
         s = self.get_type(type_id)
         if not s.get("enabled", True):
             raise CopypastaError(f"Copypasta type '{type_id}' is currently disabled.")
@@ -288,18 +473,31 @@ class CopypastaManager:
         if not templates:
             raise CopypastaError(f"Copypasta type '{type_id}' has no templates yet.")
 
-        index = random.randrange(len(templates))
-        if avoid_index is not None and len(templates) > 1 and index == avoid_index:
-            choices = [i for i in range(len(templates)) if i != avoid_index]
-            index = random.choice(choices)
+        if self.sampler is not None and guild_id is not None:
+            index = self.sampler.pick(self._rotation_key(guild_id, type_id), len(templates))
+        else:
+            index = random.randrange(len(templates))
 
-        template = templates[index]
+        compiled = self._compiled_templates(type_id, s)[index]
         if isinstance(values, dict):
-            rendered = self._fill_named(type_id, s, template, values)
+            rendered = self._fill_named(type_id, s, compiled, values)
         else:
-            rendered = self._fill(type_id, s, template, values)
+            rendered = self._fill(type_id, s, compiled, list(values))
+        RENDERS.labels(type_id).inc()
         return index, rendered
 
+    def mark_used(self, type_id: str, index: int, guild_id):
+        """Tell the server's rotation for type_id that template `index`
+        was just used by hand (render()), see ShuffleBagSampler.mark()."""
+        if self.sampler is None:
+            return
+        s = self.get_type(type_id)
+        self.sampler.mark(self._rotation_key(guild_id, type_id), index, len(s.get("templates", [])))
+
+    @staticmethod
+    def _rotation_key(guild_id, type_id: str) -> str:
+        return f"copypasta:{guild_id}:{type_id}"
+
     def render(self, type_id: str, index: int, values):
         """Return rendered_text for a *specific* template (by index) in
         type_id, with placeholders (and any {{game_term}} tokens) filled
@@ -313,19 +511,35 @@ class CopypastaManager:
         if index < 0 or index >= len(templates):
             raise CopypastaError(f"Template index {index} out of range for '{type_id}'.")
 
-        return self._fill(type_id, s, templates[index], values)
+        rendered = self._fill(type_id, s, self._compiled_templates(type_id, s)[index], list(values))
+        RENDERS.labels(type_id).inc()
+        return rendered
 
     # -- write ---------------------------------------------------------
     def create_type(self, type_id: str):
         self._reload()
         if type_id in self._data["types"]:
             raise CopypastaError(f"Copypasta type '{type_id}' already exists.")
+        if len(type_id) > MAX_TYPE_ID_LENGTH:
+            raise CopypastaError(f"Copypasta type names can be at most {MAX_TYPE_ID_LENGTH} characters.")
         self._data["types"][type_id] = {"templates": [], "placeholders": [], "enabled": True}
+        self._compiled.pop(type_id, None)
+        self._game_indexes.pop(type_id, None)
+        if self._type_index is not None:
+            self._type_index.add(type_id)
+        if self._text_index is not None:
+            self._text_index.add(type_id, "id", type_id)
         self._save()
 
     def delete_type(self, type_id: str):
         self.get_type(type_id)  # raises if missing
         del self._data["types"][type_id]
+        self._compiled.pop(type_id, None)
+        self._game_indexes.pop(type_id, None)
+        if self._type_index is not None:
+            self._type_index.remove(type_id)
+        if self._text_index is not None:
+            self._text_index.remove_record(type_id)
         self._save()
 
     def set_enabled(self, type_id: str, enabled: bool):
@@ -335,6 +549,7 @@ class CopypastaManager:
 
     def add_template(self, type_id: str, template: str):
         s = self.get_type(type_id)
+        compiled = compile_template(template)
         names = extract_placeholders(template)
         if not names:
             raise CopypastaError(
@@ -353,12 +568,20 @@ class CopypastaManager:
                 existing.append(name)
         s["placeholders"] = existing
 
+        if type_id in self._compiled:
+            self._compiled[type_id].append(compiled)
         s["templates"].append(template)
+        if self._text_index is not None:
+            self._text_index.add(type_id, "template", template)
         self._save()
 
     def remove_template(self, type_id: str, index: int):
         s = self.get_type(type_id)
         if index < 0 or index >= len(s["templates"]):
             raise CopypastaError(f"Template index {index} out of range for '{type_id}'.")
-        s["templates"].pop(index)
+        template = s["templates"].pop(index)
+        if type_id in self._compiled:
+            self._compiled[type_id].pop(index)
+        if self._text_index is not None:
+            self._text_index.discard(type_id, "template", template)
         self._save()
@@ -0,0 +1,239 @@
+"""
+Moves inline bilingual t(language, english, chinese) calls into the
+message catalog under locales/ (see i18n.py).
+
+Each call that passes two literal strings (plain or f-strings) gets a
+message id like "keywords.deleted_keyword_set", its f-strings turned
+into str.format() templates with named fields, and its text added to
+locales/english.json and locales/chinese.json (existing entries are
+left alone). Calls it can't convert are listed to move by hand.
+
+Usage (from the bot directory):
+
+  python extract_messages.py              # catalog only, report calls
+  python extract_messages.py --rewrite    # catalog + rewrite call sites
+"""
+import argparse
+import ast
+import glob
+import json
+import keyword
+import os
+import re
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCALES_DIR = os.path.join(BOT_DIR, "locales")
+SOURCE_LANGUAGES = ("english", "chinese")
+# How many words of the english text go into a generated message id.
+ID_WORDS = 4
+# Past this, a rewritten call's keyword arguments go on their own line.
+MAX_LINE = 110
+_CONVERSIONS = {-1: "", 115: "!s", 114: "!r", 97: "!a"}
+# Leading names dropped from field names: ctx.channel.mention -> channel_mention
+_DROP_ROOTS = {"self", "ctx", "interaction"}
+
+
+def load_catalog(language: str) -> dict:
+    path = os.path.join(LOCALES_DIR, f"{language}.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_catalog(language: str, catalog: dict):
+    os.makedirs(LOCALES_DIR, exist_ok=True)
+    with open(os.path.join(LOCALES_DIR, f"{language}.json"), "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _field_name(expr: ast.AST, source: str) -> str:
+    """A readable keyword-argument name for an f-string expression:
+    ctx.channel.mention -> channel_mention, len(keywords) -> keywords_count,
+    s.get("responses") -> responses, self.current_page + 1 -> current_page."""
+    if isinstance(expr, ast.Name):
+        name = expr.id
+    elif isinstance(expr, ast.Attribute):
+        parts = []
+        node = expr
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if isinstance(node, ast.Name) and node.id not in _DROP_ROOTS:
+            parts.append(node.id)
+        name = "_".join(reversed(parts))
+    elif isinstance(expr, ast.BinOp):
+        return _field_name(expr.left, source)
+    elif isinstance(expr, ast.Subscript) and isinstance(expr.slice, ast.Constant):
+        name = str(expr.slice.value)
+    elif isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == "len" and expr.args:
+        return _field_name(expr.args[0], source) + "_count"
+    elif isinstance(expr, ast.Call) and isinstance(expr.func, ast.Attribute):
+        if expr.func.attr == "get" and expr.args and isinstance(expr.args[0], ast.Constant):
+            name = str(expr.args[0].value)
+        elif isinstance(expr.func.value, ast.Constant) and expr.args:
+            return _field_name(expr.args[0], source)  # ", ".join(names) -> names
+        else:
+            return _field_name(expr.func.value, source)  # lang.capitalize() -> lang
+    else:
+        name = ast.get_source_segment(source, expr)
+    name = re.sub(r"\W+", "_", name).strip("_").lower()
+    if not name or name[0].isdigit():
+        name = "v_" + name
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def _template(node: ast.AST, source: str, fields: dict) -> str:
+    """str.format() template for a literal/f-string node; fills `fields`
+    (name -> expression source) with the expressions it needs."""
+    if isinstance(node, ast.Constant):
+        return _escape(node.value)
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(_escape(value.value))
+            continue
+        expr = value.value
+        # {str(x)} formats exactly like {x}
+        if (isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == "str"
+                and len(expr.args) == 1 and not expr.keywords and value.conversion == -1):
+            expr = expr.args[0]
+        expr_source = ast.get_source_segment(source, expr)
+        name = base = _field_name(expr, source)
+        n = 2
+        while name in fields and fields[name] != expr_source:
+            name, n = f"{base}_{n}", n + 1
+        fields[name] = expr_source
+        spec = ""
+        if value.format_spec is not None:
+            spec = ":" + _template(value.format_spec, source, fields)
+        parts.append("{" + name + _CONVERSIONS[value.conversion] + spec + "}")
+    return "".join(parts)
+
+
+def _is_text(node) -> bool:
+    return isinstance(node, ast.JoinedStr) or (isinstance(node, ast.Constant) and isinstance(node.value, str))
+
+
+def _legacy_calls(tree):
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "t"
+                and len(node.args) == 3 and not node.keywords):
+            yield node
+
+
+def _slug(template: str) -> str:
+    text = re.sub(r"\{[^{}]*\}", " ", template.replace("{{", "").replace("}}", ""))
+    text = text.replace("'", "").replace("\u2019", "")
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return "_".join(words[:ID_WORDS]) or "message"
+
+
+def _offset(line_starts, lines, lineno, col):
+    # ast columns are utf-8 byte offsets; turn them into str indexes
+    line = lines[lineno - 1]
+    return line_starts[lineno - 1] + len(line.encode("utf-8")[:col].decode("utf-8"))
+
+
+def _kwargs(fields: dict, column: int, used: int) -> str:
+    """", name=expr, ..." to follow the message id, which starts at
+    `column` and is `used` characters long; wrapped onto lines indented
+    to `column` once they'd pass MAX_LINE."""
+    indent = "\n" + " " * column
+    pieces = [f"{name}={expr}" for name, expr in fields.items()]
+    if column + used + sum(len(p) + 2 for p in pieces) + 2 <= MAX_LINE:
+        return ", " + ", ".join(pieces)
+    out, width = ",", MAX_LINE
+    for piece in pieces:
+        if width + len(piece) + 2 > MAX_LINE:
+            out += indent + piece
+            width = column + len(piece)
+        else:
+            out += " " + piece
+            width += len(piece) + 1
+        out += ","
+    return out[:-1]
+
+
+def process_file(path: str, catalogs: dict, rewrite: bool) -> tuple:
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source)
+    prefix = os.path.splitext(os.path.basename(path))[0].removesuffix("_cog")
+    english, chinese = catalogs["english"], catalogs["chinese"]
+    # (english template, chinese template) -> id, for pairs already in the catalog
+    known = {(english[i], chinese.get(i)): i for i in english if i.startswith(prefix + ".")}
+
+    lines = source.splitlines(keepends=True)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    edits, skipped, added = [], [], 0
+    for call in sorted(_legacy_calls(tree), key=lambda c: (c.lineno, c.col_offset)):
+        en_node, zh_node = call.args[1], call.args[2]
+        if not (_is_text(en_node) and _is_text(zh_node)):
+            skipped.append(f"{path}:{call.lineno}: {ast.get_source_segment(source, call)[:80]}")
+            continue
+        fields = {}
+        en, zh = _template(en_node, source, fields), _template(zh_node, source, fields)
+        msg_id = known.get((en, zh))
+        if msg_id is None:
+            base = msg_id = f"{prefix}.{_slug(en)}"
+            n = 2
+            while msg_id in english:
+                msg_id, n = f"{base}_{n}", n + 1
+            english[msg_id], chinese[msg_id] = en, zh
+            known[(en, zh)] = msg_id
+            added += 1
+        if rewrite:
+            start = _offset(line_starts, lines, en_node.lineno, en_node.col_offset)
+            end = _offset(line_starts, lines, zh_node.end_lineno, zh_node.end_col_offset)
+            replacement = json.dumps(msg_id)
+            if fields:
+                column = start - (source.rfind("\n", 0, start) + 1)
+                replacement += _kwargs(fields, column, len(replacement))
+            edits.append((start, end, replacement))
+
+    if edits:
+        for start, end, replacement in sorted(edits, reverse=True):
+            source = source[:start] + replacement + source[end:]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+    return added, len(edits), skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rewrite", action="store_true",
+                        help="also rewrite the call sites to use the message ids")
+    args = parser.parse_args()
+
+    catalogs = {language: load_catalog(language) for language in SOURCE_LANGUAGES}
+    paths = sorted(glob.glob(os.path.join(BOT_DIR, "*.py")) + glob.glob(os.path.join(BOT_DIR, "cogs", "*.py")))
+    total_added = total_rewritten = 0
+    all_skipped = []
+    for path in paths:
+        if os.path.abspath(path) == os.path.abspath(__file__):
+            continue
+        added, rewritten, skipped = process_file(path, catalogs, args.rewrite)
+        total_added += added
+        total_rewritten += rewritten
+        all_skipped.extend(skipped)
+
+    for language, catalog in catalogs.items():
+        save_catalog(language, catalog)
+    print(f"{total_added} new message(s) added to {LOCALES_DIR}")
+    if args.rewrite:
+        print(f"{total_rewritten} call site(s) rewritten")
+    for line in all_skipped:
+        print(f"not a literal pair, move by hand: {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+In-memory per-guild view of settings.json, shared by every cog.
+
+Cogs ask the one GuildSettingsService instance, `guild_settings`, e.g.
+guild_settings.language(ctx.guild.id), which is a dict lookup once the
+guild has been seen. Each guild gets a GuildSettings with its language
+and the VoteConfig !vto uses. set_language() and set_vote() save
+settings.json and update the cached objects in place; a reload from
+storage drops the cache.
+"""
+from config import DEFAULT_SETTINGS, SETTINGS_FILE, load_settings, reloads, save_settings
+from i18n import available_languages, get_guild_language
+
+
+class VoteConfig:
+    __slots__ = ("required_votes", "admin_only")
+
+    def __init__(self, required_votes: int, admin_only: bool):
+        self.required_votes = required_votes
+        self.admin_only = admin_only
+
+
+class GuildSettings:
+    __slots__ = ("language", "vote")
+
+    def __init__(self, language: str, vote: VoteConfig):
+        self.language = language
+        self.vote = vote
+
+
+class GuildSettingsService:
+    def __init__(self):
+        # guild_id (int) -> GuildSettings
+        self._guilds = {}
+        self._vote = None
+        self._reloads = None
+
+    def _check_reload(self):
+        current = reloads(SETTINGS_FILE)
+        if current != self._reloads:
+            self._guilds.clear()
+            self._vote = None
+            self._reloads = current
+
+    def _vote_config(self) -> VoteConfig:
+        if self._vote is None:
+            settings = load_settings()
+            self._vote = VoteConfig(
+                settings.get("required_votes", DEFAULT_SETTINGS["required_votes"]),
+                settings.get("admin_only", DEFAULT_SETTINGS["admin_only"]))
+        return self._vote
+
+    # -- read --------------------------------------------------------------
+    def get(self, guild_id) -> GuildSettings:
+        self._check_reload()
+        guild_id = int(guild_id)
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            entry = GuildSettings(get_guild_language(load_settings(), guild_id), self._vote_config())
+            self._guilds[guild_id] = entry
+        return entry
+
+    def language(self, guild_id) -> str:
+        """The guild's language, "english" if it has none set (or if
+        there's no guild at all, e.g. a DM)."""
+        if guild_id is None:
+            return "english"
+        return self.get(guild_id).language
+
+    def vote(self) -> VoteConfig:
+        self._check_reload()
+        return self._vote_config()
+
+    # -- write ---------------------------------------------------------
+    def set_language(self, guild_id, language: str):
+        if language not in available_languages():
+            raise ValueError(f"unknown language {language!r}")
+        settings = load_settings()
+        settings.setdefault("language", {})[str(guild_id)] = language
+        save_settings(settings)
+        self.get(guild_id).language = language
+
+    def set_vote(self, required_votes=None, admin_only=None):
+        """Update the bot-wide vote configuration; arguments left as None
+        keep their current value."""
+        settings = load_settings()
+        vote = self.vote()
+        if required_votes is not None:
+            settings["required_votes"] = vote.required_votes = required_votes
+        if admin_only is not None:
+            settings["admin_only"] = vote.admin_only = admin_only
+        save_settings(settings)
+
+
+guild_settings = GuildSettingsService()
@@ -1,26 +1,79 @@
 """
-Tiny bilingual-text helper.
+Message catalog for everything the bot says.
 
-The original code repeated this pattern hundreds of times:
+Every message lives in locales/<language>.json, keyed by message id,
+as a str.format() template. Call sites name the message and pass its
+fields:
 
-    "Some message" if language == 'english' else "某些訊息"
+    t(language, "keywords.deleted_keyword_set", set_id=set_id)
 
-which made every command function noisy and easy to get wrong (mismatched
-english/chinese branches, forgetting a language check, etc). t() centralises
-the branching in one place:
+The catalogs are read once at import. A message missing from a
+language falls back to english; an id missing everywhere is returned
+as-is with a warning. Adding a language is adding its catalog with a
+"language.name" entry; !lang picks it up (see available_languages()).
+"""
+import json
+import os
+import string
 
-    t(language, "Some message", "某些訊息")
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+DEFAULT_LANGUAGE = "english"
+# Listed first, in this order, by available_languages(); anything else
+# found under locales/ follows alphabetically.
+BUILTIN_LANGUAGES = ("english", "chinese")
+
+_formatter = string.Formatter()
+# language -> {message id: str (no fields) or bound str.format}
+_catalogs = {}
+_missing = set()
+
+
+def _compile(template: str):
+    if any(field is not None for _, field, _, _ in _formatter.parse(template)):
+        return template.format
+    # No fields: undo the {{ }} escaping once, here, instead of per call.
+    return template.format()
 
-and get_guild_language() centralises the "look up this guild's language
-from settings" pattern that was also copy-pasted everywhere.
-"""
 
+def load_catalogs(directory: str = LOCALES_DIR):
+    """(Re)read every locales/<language>.json."""
+    catalogs = {}
+    for filename in sorted(os.listdir(directory)):
+        language, ext = os.path.splitext(filename)
+        if ext != ".json":
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            catalogs[language] = {msg_id: _compile(text) for msg_id, text in json.load(f).items()}
+    if DEFAULT_LANGUAGE not in catalogs:
+        raise RuntimeError(f"[i18n.py] no {DEFAULT_LANGUAGE}.json in {directory}")
+    _catalogs.clear()
+    _catalogs.update(catalogs)
 
-def t(language: str, english: str, chinese: str) -> str:
-    """Return the english or chinese string based on language."""
-    return english if language == "english" else chinese
+
+def available_languages() -> list:
+    builtin = [lang for lang in BUILTIN_LANGUAGES if lang in _catalogs]
+    return builtin + sorted(lang for lang in _catalogs if lang not in BUILTIN_LANGUAGES)
+
+
+def t(language: str, msg_id: str, **fields) -> str:
+    """The catalog text for msg_id in `language` (english if that
+    language doesn't have it), formatted with `fields`."""
+    entry = _catalogs.get(language, {}).get(msg_id)
+    if entry is None:
+        entry = _catalogs[DEFAULT_LANGUAGE].get(msg_id)
+        if entry is None:
+            if msg_id not in _missing:
+                _missing.add(msg_id)
+                print(f"[i18n.py] no catalog entry for message id {msg_id!r}")
+            return msg_id
+    if entry.__class__ is str:
+        return entry
+    return entry(**fields)
 
 
 def get_guild_language(settings: dict, guild_id) -> str:
     """Look up the configured language for a guild, defaulting to english."""
-    return settings.get("language", {}).get(str(guild_id), "english")
+    return settings.get("language", {}).get(str(guild_id), DEFAULT_LANGUAGE)
+
+
+load_catalogs()
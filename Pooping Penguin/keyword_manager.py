@@ -25,20 +25,128 @@ as a case-insensitive substring of the message. If multiple sets match,
 one is picked at random. A random response from the matched set is sent
 (reproducing the original "some groups had one response, some had a random
 pick of several" behaviour uniformly).
+
+find_match() runs one pass of a KeywordMatcher (Aho-Corasick) built
+from every enabled set, rebuilt after any write or reload. The menus
+and autocomplete look sets up through a NameIndex (name_index.py) and
+a TextIndex (text_index.py).
 """
 import random
+from collections import deque
+
+from config import KEYWORDS_FILE, generation, load_keywords, reloads, save_keywords
+from name_index import NameIndex
+from text_index import TextIndex
 
-from config import load_keywords, save_keywords
+# Longest set id create_set() accepts - it has to fit in a menu button's
+# custom_id (menus.MAX_MENU_ARG).
+MAX_SET_ID_LENGTH = 50
 
 
 class KeywordError(Exception):
     """Raised for invalid keyword-set operations (bad name, duplicate, etc)."""
 
 
+class KeywordMatcher:
+    """Aho-Corasick automaton over the (lowercased) keywords of a set of
+    keyword sets. matching_sets() walks the message once and returns
+    every set_id with at least one keyword in it, which is exactly the
+    "any keyword is a case-insensitive substring" rule find_match()
+    always used, without re-scanning the message once per keyword.
+
+    Nodes are plain list indexes: _goto[node] is a {char: next_node}
+    dict, _fail[node] the failure link, and _out[node] the set_ids whose
+    keyword ends at that node (already merged with everything reachable
+    through its failure links, so a hit never has to walk them)."""
+
+    def __init__(self, sets: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        # An empty keyword is a substring of every message, so sets that
+        # have one always match - kept out of the automaton entirely.
+        self._always = []
+
+        for set_id, s in sets.items():
+            if not s.get("enabled", True):
+                continue
+            for kw in s.get("keywords", []):
+                kw = kw.lower()
+                if not kw:
+                    if set_id not in self._always:
+                        self._always.append(set_id)
+                    continue
+                self._insert(kw, set_id)
+        self._link()
+
+    def _insert(self, keyword: str, set_id: str):
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        if set_id not in self._out[node]:
+            self._out[node] += (set_id,)
+
+    def _link(self):
+        """Breadth-first pass filling in failure links (and merging each
+        node's outputs with its failure target's) once all keywords are in."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                extra = tuple(i for i in self._out[self._fail[child]] if i not in self._out[child])
+                if extra:
+                    self._out[child] += extra
+
+    def is_empty(self) -> bool:
+        """True if no enabled set has any keyword, so nothing can match."""
+        return not self._always and not self._goto[0]
+
+    def matching_sets(self, content: str) -> list:
+        """Every set_id with a keyword in `content` (already lowercased),
+        in first-match order, each listed once."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = dict.fromkeys(self._always)
+        node = 0
+        for ch in content:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for set_id in out[node]:
+                    found[set_id] = None
+        return list(found)
+
+
 class KeywordManager:
-    def __init__(self):
+    def __init__(self, sampler=None):
+        # Optional shuffle_bag.ShuffleBagSampler rotating through each
+        # set's responses in find_match(), instead of random.choice()
+        self.sampler = sampler
         self._data = load_keywords()
-        self._data.setdefault("sets", {})
+        self._matcher = None
+        self._matcher_generation = None
+        # NameIndex of set ids for search_sets() and TextIndex of all
+        # their text for set_ids(search), each built on first use and
+        # dropped when the file is reloaded from storage
+        self._set_index = None
+        self._text_index = None
+        self._index_reloads = None
+        # (generation, search, result) of the last set_ids(search), which
+        # is asked for again on every page flip of a searched menu
+        self._last_search = None
 
     # -- persistence -----------------------------------------------------
     def _save(self):
@@ -46,7 +154,13 @@ class KeywordManager:
 
     def _reload(self):
         self._data = load_keywords()
-        self._data.setdefault("sets", {})
+
+    def _get_matcher(self) -> KeywordMatcher:
+        current = generation(KEYWORDS_FILE)
+        if self._matcher is None or self._matcher_generation != current:
+            self._matcher = KeywordMatcher(self._data["sets"])
+            self._matcher_generation = current
+        return self._matcher
 
     # -- read --------------------------------------------------------------
     def list_sets(self):
@@ -60,23 +174,74 @@ class KeywordManager:
             raise KeywordError(f"No keyword set named '{set_id}'.")
         return s
 
+    def _check_indexes(self):
+        self._reload()
+        current = reloads(KEYWORDS_FILE)
+        if self._index_reloads != current:
+            self._set_index = self._text_index = None
+            self._index_reloads = current
+
+    def _sets_index(self) -> NameIndex:
+        self._check_indexes()
+        if self._set_index is None:
+            self._set_index = NameIndex(self._data["sets"])
+        return self._set_index
+
+    def _search_index(self) -> TextIndex:
+        self._check_indexes()
+        if self._text_index is None:
+            index = TextIndex()
+            for set_id, s in self._data["sets"].items():
+                self._index_set(index, set_id, s)
+            self._text_index = index
+        return self._text_index
+
+    @staticmethod
+    def _index_set(index: TextIndex, set_id: str, s: dict):
+        index.add(set_id, "id", set_id)
+        for kw in s.get("keywords", []):
+            index.add(set_id, "keyword", kw)
+        for response in s.get("responses", []):
+            index.add(set_id, "response", response)
+
+    def search_sets(self, query: str, limit: int = 25) -> list:
+        """Set ids containing `query`, exact match first, then prefix
+        matches, then the rest - for slash-command autocomplete."""
+        return self._sets_index().search(query, limit)
+
+    def set_ids(self, search: str = None) -> list:
+        """Every set id in sorted order, or - given `search` - the sets
+        whose id, a keyword or a response contains it (case-insensitive),
+        best match first. For the !keyword list menu."""
+        if not search:
+            return self._sets_index().sorted_names()
+        index = self._search_index()
+        current = generation(KEYWORDS_FILE)
+        if self._last_search is None or self._last_search[:2] != (current, search):
+            self._last_search = (current, search, index.search(search))
+        return self._last_search[2]
+
+    def has_active_sets(self) -> bool:
+        """Whether any enabled set has a keyword - i.e. whether find_match()
+        could return anything at all. O(1) unless the sets changed."""
+        self._reload()
+        return not self._get_matcher().is_empty()
+
     def find_match(self, content: str):
         """Return (set_id, response) for the first message-matching set,
-        chosen at random among all sets that match, or None if no match."""
+        chosen at random among all sets that match, or None if no match.
+        The response is the set's next one in rotation if there's a
+        sampler, else a random one."""
         self._reload()
-        content = content.lower()
-        matched = []
-        for set_id, s in self._data["sets"].items():
-            if not s.get("enabled", True):
-                continue
-            if any(kw.lower() in content for kw in s.get("keywords", [])):
-                matched.append(set_id)
+        matched = self._get_matcher().matching_sets(content.lower())
         if not matched:
             return None
         chosen_id = random.choice(matched)
         responses = self._data["sets"][chosen_id].get("responses", [])
         if not responses:
             return None
+        if self.sampler is not None:
+            return chosen_id, responses[self.sampler.pick(f"keyword:{chosen_id}", len(responses))]
         return chosen_id, random.choice(responses)
 
     # -- write ---------------------------------------------------------
@@ -84,12 +249,22 @@ class KeywordManager:
         self._reload()
         if set_id in self._data["sets"]:
             raise KeywordError(f"Keyword set '{set_id}' already exists.")
+        if len(set_id) > MAX_SET_ID_LENGTH:
+            raise KeywordError(f"Keyword set names can be at most {MAX_SET_ID_LENGTH} characters.")
         self._data["sets"][set_id] = {"keywords": [], "responses": [], "enabled": True}
+        if self._set_index is not None:
+            self._set_index.add(set_id)
+        if self._text_index is not None:
+            self._text_index.add(set_id, "id", set_id)
         self._save()
 
     def delete_set(self, set_id: str):
         self.get_set(set_id)  # raises if missing
         del self._data["sets"][set_id]
+        if self._set_index is not None:
+            self._set_index.remove(set_id)
+        if self._text_index is not None:
+            self._text_index.remove_record(set_id)
         self._save()
 
     def set_enabled(self, set_id: str, enabled: bool):
@@ -102,6 +277,8 @@ class KeywordManager:
         if keyword in s["keywords"]:
             raise KeywordError(f"'{keyword}' is already a trigger for '{set_id}'.")
         s["keywords"].append(keyword)
+        if self._text_index is not None:
+            self._text_index.add(set_id, "keyword", keyword)
         self._save()
 
     def remove_keyword(self, set_id: str, keyword: str):
@@ -109,16 +286,22 @@ class KeywordManager:
         if keyword not in s["keywords"]:
             raise KeywordError(f"'{keyword}' is not a trigger for '{set_id}'.")
         s["keywords"].remove(keyword)
+        if self._text_index is not None:
+            self._text_index.discard(set_id, "keyword", keyword)
         self._save()
 
     def add_response(self, set_id: str, response: str):
         s = self.get_set(set_id)
         s["responses"].append(response)
+        if self._text_index is not None:
+            self._text_index.add(set_id, "response", response)
         self._save()
 
     def remove_response(self, set_id: str, index: int):
         s = self.get_set(set_id)
         if index < 0 or index >= len(s["responses"]):
             raise KeywordError(f"Response index {index} out of range for '{set_id}'.")
-        s["responses"].pop(index)
+        response = s["responses"].pop(index)
+        if self._text_index is not None:
+            self._text_index.discard(set_id, "response", response)
         self._save()
@@ -0,0 +1,171 @@
+"""
+Logging setup for the bot: one background thread does all the
+formatting and writing, the event loop only ever drops records on a
+queue.
+
+setup_logging() puts a QueueHandler on the root logger; a QueueListener
+thread writes JSON lines to a rotating LOG_FILE (and plain text to the
+console). get_logger(category) gives a logger whose INFO/DEBUG records
+are sampled at that category's rate; warnings always pass, and a rate
+of 0 turns the category off.
+
+  LOG_LEVEL         root level (default INFO)
+  LOG_FILE          JSON-lines log file (default bot_responses.log)
+  LOG_MAX_BYTES     rotate once the file reaches this size (default 5 MB)
+  LOG_BACKUP_COUNT  rotated files to keep (default 5)
+  LOG_CONSOLE       "0" to stop echoing logs to the console (default on)
+  LOG_SAMPLE_RATES  per-category rates, e.g. "activity=0.01,commands=1"
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.environ.get("LOG_FILE", "bot_responses.log")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 5 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+LOG_CONSOLE = os.environ.get("LOG_CONSOLE", "1") != "0"
+
+# Every message the bot sees is an "activity" record, so by default only
+# 1% of them are kept; commands are rare enough to keep them all.
+DEFAULT_SAMPLE_RATES = {"activity": 0.01, "commands": 1.0}
+
+# Category loggers live under this name, e.g. "poopenguin.activity".
+LOGGER_PREFIX = "poopenguin"
+
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# Attributes every LogRecord has - anything else on a record came in
+# through `extra=` and goes into the JSON object as its own field.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """"activity=0.01,commands=1" -> {"activity": 0.01, "commands": 1.0}.
+    Malformed entries are skipped with a warning rather than stopping
+    the bot from starting."""
+    rates = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition("=")
+        try:
+            rate = float(value)
+        except ValueError:
+            print(f"[log_pipeline.py] ignoring bad LOG_SAMPLE_RATES entry: {part!r}")
+            continue
+        rates[name.strip()] = min(max(rate, 0.0), 1.0)
+    return rates
+
+
+SAMPLE_RATES = {**DEFAULT_SAMPLE_RATES, **parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", ""))}
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the records below WARNING passed through it, at
+    random; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, any `extra=`
+    fields, and exc if there's a traceback attached."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # The stock prepare() runs the full formatter here, on the
+        # caller's (event loop) thread. Only resolve the %-args - they
+        # may be objects that change after this call returns - and
+        # leave all the formatting to the writer thread.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+
+def get_logger(category: str) -> logging.Logger:
+    """The logger for one sampling category (see module docstring)."""
+    logger = logging.getLogger(f"{LOGGER_PREFIX}.{category}")
+    if not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        rate = SAMPLE_RATES.get(category, 1.0)
+        if rate <= 0.0:
+            # Off entirely: isEnabledFor(INFO) is False, so callers can
+            # skip building the record, and warnings still get through.
+            logger.setLevel(logging.WARNING)
+        elif rate < 1.0:
+            logger.addFilter(SamplingFilter(rate))
+    return logger
+
+
+def setup_logging():
+    """Route every log record through a queue to the background writer
+    thread. Safe to call more than once - only the first call does
+    anything."""
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = []
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JsonLinesFormatter())
+    handlers.append(file_handler)
+    if LOG_CONSOLE:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread.
+    Called by bot.py on shutdown (and registered with atexit)."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
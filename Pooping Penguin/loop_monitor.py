@@ -0,0 +1,283 @@
+"""
+Event-loop health: how late the loop runs things, what was hogging it
+when it fell behind, and a warning before the gateway heartbeat is in
+trouble.
+
+A watchdog thread pings the loop every LOOP_MONITOR_INTERVAL with a
+call_soon_threadsafe() no-op and records how long it waited. A stall of
+LOOP_SLOW_SECONDS is recorded with the loop thread's stack and running
+task; one of LOOP_HEARTBEAT_WARN_SECONDS is warned about while the loop
+is still blocked. snapshot() backs the owner-only !loop command, and
+the same numbers go to metrics.py as poopenguin_loop_*.
+
+  LOOP_MONITOR                 "0" to turn it off (default on)
+  LOOP_MONITOR_INTERVAL        seconds between pings (default 0.05)
+  LOOP_SLOW_SECONDS            stall length recorded as slow (default 0.1)
+  LOOP_HEARTBEAT_WARN_SECONDS  warn about the heartbeat after this long
+                               blocked (default 5)
+"""
+import asyncio
+import bisect
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+import metrics
+from log_pipeline import get_logger
+
+LOOP_MONITOR = os.environ.get("LOOP_MONITOR", "1") != "0"
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL", 0.05))
+LOOP_SLOW_SECONDS = float(os.environ.get("LOOP_SLOW_SECONDS", 0.1))
+LOOP_HEARTBEAT_WARN_SECONDS = float(os.environ.get("LOOP_HEARTBEAT_WARN_SECONDS", 5.0))
+
+# Upper bounds (seconds) of the lag histogram's buckets; anything slower
+# lands in the last, unbounded one.
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Recent lag samples kept for percentiles: 5 minutes at the default interval.
+RECENT_SAMPLES = 6000
+# Slow callbacks kept for !loop and snapshot().
+RECENT_STALLS = 20
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = get_logger("loop")
+
+LAG_SECONDS = metrics.histogram(
+    "poopenguin_loop_lag_seconds", "How late the event loop ran the monitor's pings.", buckets=LAG_BUCKETS)
+STALLS = metrics.counter(
+    "poopenguin_loop_stalls_total", "Times the event loop was blocked for at least LOOP_SLOW_SECONDS.")
+HEARTBEAT_WARNINGS = metrics.counter(
+    "poopenguin_loop_heartbeat_warnings_total",
+    "Times the event loop was blocked for at least LOOP_HEARTBEAT_WARN_SECONDS.")
+
+
+class LagHistogram:
+    """Counts per LAG_BUCKETS bucket, plus the running sum and max."""
+
+    def __init__(self, bounds=LAG_BUCKETS):
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def buckets(self) -> list:
+        """[(upper bound or None for the last one, count), ...]"""
+        return list(zip(list(self.bounds) + [None], self.counts))
+
+
+def _percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _where(frames) -> str:
+    """The innermost frame in the bot's own code (not this file, not a
+    library), as "cogs/messages_cog.py:105 in _handle_keywords"."""
+    for frame in reversed(frames):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(BASE_DIR + os.sep) and path != os.path.abspath(__file__) \
+                and "site-packages" not in path:
+            return f"{os.path.relpath(path, BASE_DIR)}:{frame.lineno} in {frame.name}"
+    return f"{os.path.basename(frames[-1].filename)}:{frames[-1].lineno} in {frames[-1].name}" if frames else "?"
+
+
+class LoopMonitor:
+    def __init__(self, interval=LOOP_MONITOR_INTERVAL, slow_seconds=LOOP_SLOW_SECONDS,
+                 heartbeat_warn_seconds=LOOP_HEARTBEAT_WARN_SECONDS):
+        self.interval = interval
+        self.slow_seconds = slow_seconds
+        self.heartbeat_warn_seconds = heartbeat_warn_seconds
+        self.histogram = LagHistogram()
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.stalls = deque(maxlen=RECENT_STALLS)
+        self.stall_count = 0
+        self.heartbeat_warnings = 0
+        self.started_at = None
+        self._bot = None
+        self._loop = None
+        self._loop_thread = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # monotonic time the unanswered ping was sent, None once the loop
+        # has run it
+        self._ping = None
+        # the stall the watchdog is watching: {"ping", "at", "task",
+        # "where", "stack", "warned"} - finished when that ping runs
+        self._stall = None
+
+    # -- lifecycle ----------------------------------------------------------
+    def start(self, bot=None):
+        """Start watching the running loop. `bot` (optional) is where the
+        gateway heartbeat is read from."""
+        if self._thread is not None:
+            return
+        self._bot = bot
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.started_at = time.time()
+        self._ping = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+        self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self.histogram.reset()
+            self.recent.clear()
+            self.stalls.clear()
+            self.stall_count = 0
+            self.heartbeat_warnings = 0
+            self.started_at = time.time()
+
+    # -- on the loop --------------------------------------------------------
+    def _pong(self, sent: float):
+        lag = time.monotonic() - sent
+        with self._lock:
+            self._ping = None
+            self.histogram.record(lag)
+            LAG_SECONDS.observe(lag)
+            self.recent.append(lag)
+            stall, self._stall = self._stall, None
+            if stall is not None and stall["ping"] == sent:
+                stall["duration"] = lag
+                self.stalls.append(stall)
+                self.stall_count += 1
+                STALLS.inc()
+            else:
+                stall = None
+        if stall is not None:
+            logger.warning("event loop blocked for %.3f s in %s (task %s)",
+                           lag, stall["where"], stall["task"],
+                           extra={"lag": lag, "task": stall["task"], "where": stall["where"],
+                                  "stack": stall["stack"]})
+
+    # -- on the watchdog thread ---------------------------------------------
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            sent = self._ping
+            if sent is None:
+                self._ping = now
+                try:
+                    self._loop.call_soon_threadsafe(self._pong, now)
+                except RuntimeError:  # the loop is closed
+                    return
+                continue
+            waited = now - sent
+            if waited < self.slow_seconds:
+                continue
+            stall = self._stall
+            if stall is None or stall["ping"] != sent:
+                stall = self._capture(sent)
+                with self._lock:
+                    if self._ping != sent:
+                        continue  # the loop caught up while the stack was taken
+                    self._stall = stall
+            if waited >= self.heartbeat_warn_seconds and not stall["warned"]:
+                stall["warned"] = True
+                with self._lock:
+                    self.heartbeat_warnings += 1
+                    HEARTBEAT_WARNINGS.inc()
+                logger.warning("event loop blocked for %.1f s so far in %s (task %s); %s\n%s",
+                               waited, stall["where"], stall["task"], self._heartbeat_status(),
+                               stall["stack"])
+
+    def _capture(self, ping: float) -> dict:
+        task = None
+        try:
+            current = asyncio.current_task(self._loop)
+            task = current.get_name() if current is not None else None
+        except RuntimeError:
+            pass
+        frame = sys._current_frames().get(self._loop_thread)
+        frames = traceback.extract_stack(frame) if frame is not None else []
+        started = time.time() - (time.monotonic() - ping)
+        return {"ping": ping, "at": started, "task": task, "where": _where(frames),
+                "stack": "".join(traceback.format_list(frames)), "warned": False}
+
+    def _keep_alive(self):
+        ws = getattr(self._bot, "ws", None)
+        return getattr(ws, "_keep_alive", None)
+
+    def _heartbeat_status(self) -> str:
+        keep_alive = self._keep_alive()
+        if keep_alive is None or not keep_alive.interval:
+            return "gateway heartbeat state unknown"
+        due_in = keep_alive._last_send + keep_alive.interval - time.perf_counter()
+        if due_in >= 0:
+            return f"next gateway heartbeat due in {due_in:.1f} s (every {keep_alive.interval:.1f} s)"
+        return f"gateway heartbeat overdue by {-due_in:.1f} s (every {keep_alive.interval:.1f} s)"
+
+    # -- results ------------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self.recent)
+            histogram = self.histogram
+            stalls = [{k: v for k, v in s.items() if k != "ping"} for s in self.stalls]
+            result = {
+                "running": self._thread is not None,
+                "since": self.started_at,
+                "interval": self.interval,
+                "slow_seconds": self.slow_seconds,
+                "samples": histogram.count,
+                "lag": {
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "max": histogram.max,
+                    "recent_p50": _percentile(recent, 0.50),
+                    "recent_p90": _percentile(recent, 0.90),
+                    "recent_p99": _percentile(recent, 0.99),
+                    "recent_max": recent[-1] if recent else 0.0,
+                },
+                "histogram": {"buckets": histogram.buckets(), "sum": histogram.sum, "count": histogram.count},
+                "stalls": self.stall_count,
+                "recent_stalls": stalls,
+                "heartbeat_warnings": self.heartbeat_warnings,
+            }
+        bot = self._bot
+        keep_alive = self._keep_alive()
+        result["heartbeat"] = {
+            "interval": keep_alive.interval if keep_alive is not None else None,
+            "latency": bot.latency if bot is not None and keep_alive is not None else None,
+        }
+        return result
+
+
+monitor = LoopMonitor()
+
+
+def start(bot=None):
+    """Start the monitor on the running loop, unless LOOP_MONITOR=0.
+    Called by bot.py's main()."""
+    if LOOP_MONITOR:
+        monitor.start(bot)
+
+
+async def stop():
+    await monitor.stop()
+
+
+def snapshot() -> dict:
+    return monitor.snapshot()
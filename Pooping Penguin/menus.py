@@ -0,0 +1,288 @@
+"""
+Persistent, stateless button menus: the paged browsers behind !help,
+!keyword list/show and !copypasta list/info.
+
+Nothing is kept per open menu; everything a button needs is in its
+custom_id:
+
+    m:<menu>:<action>:<owner id>:<page>:<arg>
+
+(select menus use "ms:<menu>:<owner>:<page>:<arg>"). MenuButton and
+MenuSelect, registered once with bot.add_dynamic_items(), match those
+ids on any message the bot ever sent and hand the click to the Menu
+registered under <menu>, which renders the page on demand. An `arg` too
+long for a custom_id is held in memory under a short key instead.
+"""
+import os
+from collections import OrderedDict
+
+import discord
+
+from guild_settings import guild_settings
+from i18n import t
+
+CUSTOM_ID_LIMIT = 100
+# Room left for `arg` in the longest custom_id this module builds.
+MAX_MENU_ARG = 50
+# Too-long args kept in memory at once (least recently used dropped first).
+MAX_HELD_ARGS = 1_000
+
+# menu key -> Menu
+_menus = {}
+
+
+def register_menu(bot, menu: "Menu"):
+    """Route clicks on `menu.key`'s buttons to `menu`. Called from the
+    owning cog's cog_load()."""
+    bot.add_dynamic_items(MenuButton, MenuSelect)  # no-op after the first time
+    _menus[menu.key] = menu
+
+
+def unregister_menu(key: str):
+    _menus.pop(key, None)
+
+
+# key -> arg, for args too long for a custom_id; least recently used first
+_held = OrderedDict()
+# arg -> key, so the same arg keeps the same key
+_held_keys = {}
+
+
+def _hold(arg: str) -> str:
+    key = _held_keys.get(arg)
+    if key is None:
+        # Random rather than counted, so a key from before a restart can
+        # never pick up some other arg.
+        key = _held_keys[arg] = os.urandom(6).hex()
+        _held[key] = arg
+        while len(_held) > MAX_HELD_ARGS:
+            old_key, old_arg = _held.popitem(last=False)
+            del _held_keys[old_arg]
+    _held.move_to_end(key)
+    return key
+
+
+def _held_arg(key: str):
+    """The arg held under key, or None once it's been dropped (or the
+    bot restarted)."""
+    arg = _held.get(key)
+    if arg is not None:
+        _held.move_to_end(key)
+    return arg
+
+
+def _custom_id(prefix: str, fields: str, arg: str) -> str:
+    custom_id = f"{prefix}:{fields}:{arg}"
+    if len(custom_id) <= CUSTOM_ID_LIMIT:
+        return custom_id
+    return f"{prefix}h:{fields}:{_hold(arg)}"
+
+
+class Menu:
+    """One kind of paged menu. Subclasses set `key` and implement
+    page_count() and render(); the rest has working defaults. Extra
+    buttons come from extra_buttons() and are handled by overriding
+    on_action() for their action names."""
+
+    key = ""
+    # Catalog ids for the reply to someone else clicking (None: ignore
+    # the click, like the original help menu did) and for a closed menu.
+    not_owner_message = "menus.this_isnt_your_menu"
+    closed_message = "menus.menu_closed"
+    # Whether Previous/Next/Jump are shown when there's only one page.
+    always_paged = True
+    # Whether there's a Jump button next to Previous/Next.
+    jumpable = True
+    # Which row the Close button goes on (after any extra_buttons()).
+    close_row = 0
+
+    def page_count(self, language: str, arg: str) -> int:
+        raise NotImplementedError
+
+    def render(self, language: str, page: int, arg: str) -> discord.Embed:
+        raise NotImplementedError
+
+    def extra_buttons(self, language: str, page: int, arg: str) -> list:
+        """(action, label, style, row) for the menu's own buttons, which
+        go between the paging buttons and Close."""
+        return []
+
+    def buttons(self, language: str, page: int, arg: str, pages: int) -> list:
+        buttons = []
+        if self.always_paged or pages > 1:
+            buttons += [
+                ("prev", t(language, "menus.previous"), discord.ButtonStyle.grey, 0),
+                ("next", t(language, "menus.next"), discord.ButtonStyle.grey, 0),
+            ]
+            if self.jumpable:
+                buttons.append(("jump", t(language, "menus.jump"), discord.ButtonStyle.grey, 0))
+        buttons += self.extra_buttons(language, page, arg)
+        buttons.append(("close", t(language, "menus.close"), discord.ButtonStyle.red, self.close_row))
+        return buttons
+
+    def select(self, language: str, owner_id: int, page: int, arg: str):
+        """An optional MenuSelect to add under the buttons."""
+        return None
+
+    # -- rendering -------------------------------------------------------
+    def clamp(self, language: str, page: int, arg: str) -> int:
+        return max(0, min(page, self.page_count(language, arg) - 1))
+
+    def view(self, language: str, owner_id: int, page: int, arg: str) -> discord.ui.View:
+        view = discord.ui.View(timeout=None)
+        pages = self.page_count(language, arg)
+        for action, label, style, row in self.buttons(language, page, arg, pages):
+            view.add_item(MenuButton(self.key, action, owner_id, page, arg, label=label, style=style, row=row))
+        select = self.select(language, owner_id, page, arg)
+        if select is not None:
+            view.add_item(select)
+        return view
+
+    def message(self, language: str, owner_id: int, page: int = 0, arg: str = "") -> dict:
+        """embed= and view= kwargs for ctx.send()/edit_message()."""
+        arg = arg or ""
+        page = self.clamp(language, page, arg)
+        return {"embed": self.render(language, page, arg), "view": self.view(language, owner_id, page, arg)}
+
+    async def show(self, interaction: discord.Interaction, owner_id: int, page: int, arg: str):
+        language = guild_settings.language(interaction.guild_id)
+        await interaction.response.edit_message(**self.message(language, owner_id, page, arg))
+
+    # -- clicks ----------------------------------------------------------
+    async def on_action(self, interaction: discord.Interaction, action: str, owner_id: int, page: int, arg: str):
+        language = guild_settings.language(interaction.guild_id)
+        pages = self.page_count(language, arg)
+        if action == "prev":
+            await self.show(interaction, owner_id, (page - 1) % pages, arg)
+        elif action == "next":
+            await self.show(interaction, owner_id, (page + 1) % pages, arg)
+        elif action == "jump":
+            await interaction.response.send_modal(JumpModal(self, owner_id, arg, pages, language))
+        elif action == "close":
+            await interaction.response.edit_message(
+                content=t(language, self.closed_message), embed=None, view=None)
+
+    async def on_select(self, interaction: discord.Interaction, owner_id: int, page: int, arg: str, value: str):
+        pass
+
+
+class MenuButton(discord.ui.DynamicItem[discord.ui.Button],
+                 template=r"m(?P<held>h?):(?P<menu>[a-z]+):(?P<action>[a-z]+):(?P<owner>\d+):(?P<page>\d+):(?P<arg>.*)"):
+    def __init__(self, menu_key: str, action: str, owner_id: int, page: int, arg: str = "",
+                 label=None, style=discord.ButtonStyle.grey, row=None):
+        self.menu_key = menu_key
+        self.action = action
+        self.owner_id = owner_id
+        self.page = page
+        self.arg = arg
+        super().__init__(discord.ui.Button(
+            label=label, style=style, row=row,
+            custom_id=_custom_id("m", f"{menu_key}:{action}:{owner_id}:{page}", arg or "")))
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        arg = _held_arg(match["arg"]) if match["held"] else match["arg"]
+        return cls(match["menu"], match["action"], int(match["owner"]), int(match["page"]), arg,
+                   label=item.label, style=item.style)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return await _check_owner(interaction, self.menu_key, self.owner_id)
+
+    async def callback(self, interaction: discord.Interaction):
+        menu = _menus.get(self.menu_key)
+        if menu is None or self.arg is None:
+            await _unavailable(interaction)
+            return
+        await menu.on_action(interaction, self.action, self.owner_id, self.page, self.arg)
+
+
+class MenuSelect(discord.ui.DynamicItem[discord.ui.Select],
+                 template=r"ms(?P<held>h?):(?P<menu>[a-z]+):(?P<owner>\d+):(?P<page>\d+):(?P<arg>.*)"):
+    def __init__(self, menu_key: str, owner_id: int, page: int, arg: str = "",
+                 options=(), placeholder=None, row=None):
+        self.menu_key = menu_key
+        self.owner_id = owner_id
+        self.page = page
+        self.arg = arg
+        super().__init__(discord.ui.Select(
+            options=list(options), placeholder=placeholder, row=row,
+            custom_id=_custom_id("ms", f"{menu_key}:{owner_id}:{page}", arg or "")))
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        arg = _held_arg(match["arg"]) if match["held"] else match["arg"]
+        return cls(match["menu"], int(match["owner"]), int(match["page"]), arg,
+                   options=item.options, placeholder=item.placeholder)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return await _check_owner(interaction, self.menu_key, self.owner_id)
+
+    async def callback(self, interaction: discord.Interaction):
+        menu = _menus.get(self.menu_key)
+        if menu is None or self.arg is None:
+            await _unavailable(interaction)
+            return
+        await menu.on_select(interaction, self.owner_id, self.page, self.arg, self.item.values[0])
+
+
+async def _check_owner(interaction: discord.Interaction, menu_key: str, owner_id: int) -> bool:
+    if interaction.user.id == owner_id:
+        return True
+    menu = _menus.get(menu_key)
+    if menu is not None and menu.not_owner_message:
+        await interaction.response.send_message(
+            t(guild_settings.language(interaction.guild_id), menu.not_owner_message), ephemeral=True)
+    return False
+
+
+async def _unavailable(interaction: discord.Interaction):
+    await interaction.response.send_message(
+        t(guild_settings.language(interaction.guild_id), "menus.menu_unavailable"), ephemeral=True)
+
+
+class JumpModal(discord.ui.Modal):
+    """Popup asking for a page number, behind every menu's Jump button."""
+
+    def __init__(self, menu: Menu, owner_id: int, arg: str, total: int, language: str):
+        super().__init__(title=t(language, "menus.jump_to_page"))
+        self.menu = menu
+        self.owner_id = owner_id
+        self.arg = arg
+        self.total = total
+        self.language = language
+        self.page_input = discord.ui.TextInput(
+            label=t(language, "menus.page_number", total=total),
+            placeholder="1",
+            required=True,
+            max_length=10,
+        )
+        self.add_item(self.page_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        raw = self.page_input.value.strip()
+        if not raw.isdigit() or not (1 <= int(raw) <= self.total):
+            await interaction.response.send_message(
+                t(self.language, "menus.please_enter_a_page", total=self.total),
+                ephemeral=True)
+            return
+        await self.menu.show(interaction, self.owner_id, int(raw) - 1, self.arg)
+
+
+class SearchModal(discord.ui.Modal):
+    """Popup text box behind the list menus' Search button; shows page 1
+    of the menu filtered by what was typed."""
+
+    def __init__(self, menu: Menu, owner_id: int, language: str, title: str, label: str, placeholder: str):
+        super().__init__(title=title)
+        self.menu = menu
+        self.owner_id = owner_id
+        self.term = discord.ui.TextInput(
+            label=label,
+            placeholder=placeholder,
+            required=True,
+            max_length=MAX_MENU_ARG,
+        )
+        self.add_item(self.term)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await self.menu.show(interaction, self.owner_id, 0, self.term.value.strip().lower())
@@ -0,0 +1,333 @@
+"""
+In-process counters, gauges and histograms, served on localhost in the
+Prometheus text format.
+
+Modules declare their metrics here once, at import, and record into
+them:
+
+    MESSAGES = metrics.counter("poopenguin_messages_total",
+                               "Messages seen, per guild.", ("guild",))
+    MESSAGES.labels(guild_id).inc()
+
+Recording takes no lock and formats nothing until a scrape. Declaring
+the same metric twice returns the one already registered. bot.py starts
+the GET /metrics listener next to the gateway connection.
+
+  METRICS            "0" to not start the listener (default on)
+  METRICS_HOST       address to listen on (default 127.0.0.1)
+  METRICS_PORT       port to listen on (default 9464)
+  METRICS_PER_GUILD  "0" to count messages for all guilds in one series
+                     instead of one series per guild (default on)
+"""
+import asyncio
+import bisect
+import math
+import os
+
+from log_pipeline import get_logger
+
+METRICS = os.environ.get("METRICS", "1") != "0"
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9464))
+METRICS_PER_GUILD = os.environ.get("METRICS_PER_GUILD", "1") != "0"
+
+# Default histogram bucket upper bounds (seconds). Finer at the bottom
+# than Prometheus's own defaults: most of what the bot times (an
+# on_message step, a keyword scan) takes well under a millisecond.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# How long a scraper gets to send its request before it's hung up on.
+REQUEST_TIMEOUT = 5.0
+
+logger = get_logger("metrics")
+
+
+def _format_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(names, values) -> str:
+    """'guild="123",stage="route"' - without the braces, so histograms
+    can add their le="..." to it."""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _braced(text: str) -> str:
+    return "{" + text + "}" if text else ""
+
+
+class _CounterChild:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name):
+        yield f"{name}{_braced(self.labels)} {_format_value(self.value)}"
+
+
+class _GaugeChild:
+    __slots__ = ("labels", "value", "function")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        """Read the value from function() at scrape time instead; None
+        to go back to set()/inc()/dec()."""
+        self.function = function
+
+    def samples(self, name):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                logger.warning("metric %s: reading its value failed: %r", name, e)
+                return
+            if value is None:
+                return
+        yield f"{name}{_braced(self.labels)} {_format_value(value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("labels", "bounds", "counts", "sum", "count")
+
+    def __init__(self, labels, bounds):
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name):
+        prefix = self.labels + "," if self.labels else ""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{_format_value(float(bound))}"}} {cumulative}'
+        # +Inf and _count both come from the buckets, not self.count, so
+        # they agree even if an observe() lands mid-scrape.
+        total = cumulative + self.counts[-1]
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {total}'
+        yield f"{name}_sum{_braced(self.labels)} {_format_value(self.sum)}"
+        yield f"{name}_count{_braced(self.labels)} {total}"
+
+
+class Metric:
+    """One named metric and its series, one per combination of label
+    values. With no label names it has a single series, and the
+    recording methods (inc(), set(), observe(), ...) can be called on
+    the metric itself."""
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # tuple of label values -> child
+        self._children = {}
+        self._default = None if self.labelnames else self.labels()
+
+    def _child(self, labels: str):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """The series for these label values (created on first use).
+        Values are turned into strings, so ids can be passed as is."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values!r}")
+            child = self._children.setdefault(
+                values, self._child(_label_text(self.labelnames, [str(v) for v in values])))
+        return child
+
+    def render(self) -> list:
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [f"# HELP {self.name} {documentation}", f"# TYPE {self.name} {self.type}"]
+        for child in list(self._children.values()):
+            lines.extend(child.samples(self.name))
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _child(self, labels):
+        return _CounterChild(labels)
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def _child(self, labels):
+        return _GaugeChild(labels)
+
+    def set(self, value):
+        self._default.set(value)
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set_function(self, function):
+        self._default.set_function(function)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _child(self, labels):
+        return _HistogramChild(labels, self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+
+class Registry:
+    def __init__(self):
+        # name -> Metric, in registration order
+        self._metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add metric, or return the one already registered under its
+        name if it's the same kind with the same labels."""
+        existing = self._metrics.get(metric.name)
+        if existing is None:
+            self._metrics[metric.name] = metric
+            return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"metric {metric.name} is already registered as a different "
+                             f"{existing.type} with labels {existing.labelnames}")
+        return existing
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        lines.append("")
+        return "\n".join(lines)
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render() -> str:
+    """Everything registered, in the Prometheus text exposition format."""
+    return registry.render()
+
+
+# -- the /metrics listener ----------------------------------------------------
+_server = None
+
+
+def _response(status: str, body: bytes, content_type: str = "text/plain; charset=utf-8") -> bytes:
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+async def _handle(reader, writer):
+    try:
+        request = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+        while True:  # the headers don't matter, but have to be read past
+            line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+        parts = request.split()
+        method = parts[0] if parts else b""
+        target = parts[1].split(b"?", 1)[0] if len(parts) > 1 else b""
+        if method not in (b"GET", b"HEAD"):
+            response = _response("405 Method Not Allowed", b"GET /metrics\n")
+        elif target not in (b"/metrics", b"/"):
+            response = _response("404 Not Found", b"GET /metrics\n")
+        else:
+            body = render().encode("utf-8")
+            response = _response("200 OK", body, "text/plain; version=0.0.4; charset=utf-8")
+            if method == b"HEAD":
+                response = response[:len(response) - len(body)]
+        writer.write(response)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start():
+    """Start serving /metrics on METRICS_HOST:METRICS_PORT, unless
+    METRICS=0. Called by bot.py's main(); a port that's already taken is
+    logged and otherwise ignored - the bot runs fine without it."""
+    global _server
+    if not METRICS or _server is not None:
+        return
+    try:
+        _server = await asyncio.start_server(_handle, METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        logger.warning("metrics endpoint not started on %s:%s: %s", METRICS_HOST, METRICS_PORT, e)
+        return
+    port = _server.sockets[0].getsockname()[1]
+    print(f"[metrics.py] serving metrics on http://{METRICS_HOST}:{port}/metrics")
+
+
+async def stop():
+    global _server
+    if _server is None:
+        return
+    _server.close()
+    await _server.wait_closed()
+    _server = None
@@ -0,0 +1,184 @@
+"""
+Schema versions for the bot's data documents, and the migrations that
+bring an older document up to date.
+
+Every document config.py manages carries a top-level "schema_version"
+(none means version 0). MIGRATIONS lists, per document, the steps from
+each version to the next. config.py runs upgrade() on every document it
+reads, backing the original up to data/backups/ first;
+`python migrations.py [--dry-run]` does the same offline.
+
+Adding a migration: write a function that upgrades the document in
+place from the previous version, give it a one-line docstring (that's
+what gets reported), and append it to the document's list below. Never
+edit or reorder a step that has already shipped.
+"""
+import json
+import os
+import time
+
+SCHEMA_KEY = "schema_version"
+
+
+class MigrationError(Exception):
+    """Raised for a document whose schema_version this code can't handle."""
+
+
+# -- vote_settings ----------------------------------------------------------
+def _settings_v1(data: dict):
+    """Legacy bare-string autoreact entries become {"emoji", "user_id"}; missing sections are added."""
+    for key, default in (("required_votes", 3), ("admin_only", False), ("language", {}),
+                         ("autoreact", {}), ("repeat_threshold", {}), ("features", {})):
+        data.setdefault(key, default)
+    autoreact = data["autoreact"]
+    for channel_id, entry in autoreact.items():
+        if isinstance(entry, str):
+            autoreact[channel_id] = {"emoji": entry, "user_id": None}
+
+
+# -- votes --------------------------------------------------------------
+def _votes_v1(data: dict):
+    """Open vote sessions move under "sessions", next to schema_version."""
+    sessions = dict(data)
+    data.clear()
+    data["sessions"] = sessions
+
+
+# -- keyword_sets -----------------------------------------------------------
+def _keywords_v1(data: dict):
+    """Every keyword set has "keywords", "responses" and "enabled"."""
+    for s in data.setdefault("sets", {}).values():
+        s.setdefault("keywords", [])
+        s.setdefault("responses", [])
+        s.setdefault("enabled", True)
+
+
+# -- copypasta_sets ---------------------------------------------------------
+def _copypasta_v1(data: dict):
+    """Every copypasta type has "templates", "enabled" and "placeholders" (back-filled from its first template)."""
+    # Imported here: copypasta_manager imports config, which imports this.
+    from copypasta_manager import extract_placeholders
+
+    for s in data.setdefault("types", {}).values():
+        s.setdefault("templates", [])
+        s.setdefault("enabled", True)
+        if "placeholders" not in s:
+            templates = s["templates"]
+            s["placeholders"] = extract_placeholders(templates[0]) if templates else []
+
+
+# -- rotation -------------------------------------------------------------
+def _rotation_v1(data: dict):
+    """The "bags" section exists."""
+    data.setdefault("bags", {})
+
+
+# document name (file name without extension) -> steps, in order; step
+# i upgrades a version-i document to version i + 1.
+MIGRATIONS = {
+    "vote_settings": [_settings_v1],
+    "votes": [_votes_v1],
+    "keyword_sets": [_keywords_v1],
+    "copypasta_sets": [_copypasta_v1],
+    "rotation": [_rotation_v1],
+}
+
+
+def document_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def current_version(name: str) -> int:
+    return len(MIGRATIONS.get(name, ()))
+
+
+def version_of(data: dict) -> int:
+    return data.get(SCHEMA_KEY, 0)
+
+
+def pending(name: str, data: dict) -> list:
+    """The steps that upgrade() would run on `data`, in order."""
+    version = version_of(data)
+    steps = MIGRATIONS.get(name, [])
+    if not isinstance(version, int) or version < 0 or version > len(steps):
+        raise MigrationError(
+            f"{name} has schema_version {version!r}, but this code only knows up to {len(steps)}")
+    return steps[version:]
+
+
+def upgrade(name: str, data: dict) -> int:
+    """Bring `data` up to the current schema in place; returns the version
+    it was at before (equal to the current one if nothing ran)."""
+    before = version_of(data)
+    steps = pending(name, data)
+    for step in steps:
+        step(data)
+    if steps or SCHEMA_KEY not in data:
+        data[SCHEMA_KEY] = current_version(name)
+    return before
+
+
+def backup(backup_dir: str, name: str, data: dict) -> str:
+    """Write a copy of a not-yet-upgraded document under backup_dir;
+    returns the backup's path."""
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(backup_dir, f"{name}.v{version_of(data)}.{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def describe(step) -> str:
+    return (step.__doc__ or step.__name__).strip().splitlines()[0]
+
+
+def migrate_all(backend, paths, backup_dir: str, dry_run: bool = False) -> int:
+    """Upgrade every stored document in `paths` straight through
+    `backend` (for running without the bot); returns how many were, or
+    with dry_run would be, migrated."""
+    migrated = 0
+    for path in paths:
+        name = document_name(path)
+        data = backend.read(path)
+        if data is None:
+            print(f"{name}: nothing stored yet")
+            continue
+        steps = pending(name, data)
+        if not steps:
+            print(f"{name}: up to date (v{version_of(data)})")
+            continue
+        migrated += 1
+        print(f"{name}: v{version_of(data)} -> v{current_version(name)}")
+        for step in steps:
+            print(f"  - {describe(step)}")
+        if dry_run:
+            continue
+        print(f"  backed up to {backup(backup_dir, name, data)}")
+        upgrade(name, data)
+        backend.write(path, data)
+    return migrated
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import config
+    from storage import open_backend
+
+    parser = argparse.ArgumentParser(description="Upgrade the bot's data documents to the current schema.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report what would be migrated, change nothing")
+    args = parser.parse_args()
+
+    backend = open_backend(config.STORAGE_BACKEND, config.DATABASE_FILE)
+    try:
+        count = migrate_all(backend, config.DOCUMENT_FILES, config.BACKUP_DIR, args.dry_run)
+    except MigrationError as e:
+        raise SystemExit(f"error: {e}")
+    finally:
+        backend.close()
+    if args.dry_run:
+        print(f"{count} document(s) would be migrated")
+    else:
+        print(f"{count} document(s) migrated")
@@ -0,0 +1,116 @@
+"""
+In-memory name index behind slash-command autocomplete for copypasta
+type names and keyword set ids.
+
+NameIndex keeps a suffix trie of the lowercased names, so a query walks
+straight to the names that contain it. Results are ranked exact match,
+then prefix matches, then other matches, alphabetically within each
+group. sorted_names() hands out every name in order for the paged list
+menus. add()/remove() keep it current; it's only rebuilt when the
+document is reloaded from storage.
+"""
+import heapq
+
+
+class _Node:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = set()
+
+
+class NameIndex:
+    def __init__(self, names=()):
+        self._root = _Node()
+        self._names = set()
+        self._sorted = None
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def add(self, name: str):
+        if name in self._names:
+            return
+        self._names.add(name)
+        self._sorted = None
+        key = name.lower()
+        self._root.names.add(name)
+        for start in range(len(key)):
+            node = self._root
+            for ch in key[start:]:
+                child = node.children.get(ch)
+                if child is None:
+                    child = node.children[ch] = _Node()
+                node = child
+                node.names.add(name)
+
+    def remove(self, name: str):
+        if name not in self._names:
+            return
+        self._names.discard(name)
+        self._sorted = None
+        key = name.lower()
+        self._root.names.discard(name)
+        for start in range(len(key)):
+            path = [self._root]
+            for ch in key[start:]:
+                node = path[-1].children.get(ch)
+                if node is None:
+                    break
+                node.names.discard(name)
+                path.append(node)
+            # Prune the nodes this suffix leaves empty, deepest first.
+            for depth in range(len(path) - 1, 0, -1):
+                node = path[depth]
+                if node.names or node.children:
+                    break
+                del path[depth - 1].children[key[start + depth - 1]]
+
+    def sorted_names(self) -> list:
+        """Every name, in sorted() order. Shared - don't modify it."""
+        if self._sorted is None:
+            self._sorted = sorted(self._names)
+        return self._sorted
+
+    def _find(self, query: str):
+        node = self._root
+        for ch in query:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def search(self, query: str, limit: int = 25) -> list:
+        """Names containing `query` (case-insensitive), ranked exact >
+        prefix > infix, alphabetical within each, at most `limit`."""
+        query = (query or "").lower()
+        node = self._find(query)
+        if node is None:
+            return []
+
+        exact, prefix, infix = [], [], []
+        for name in node.names:
+            key = name.lower()
+            if key == query:
+                exact.append(name)
+            elif key.startswith(query):
+                prefix.append(name)
+            else:
+                infix.append(name)
+
+        ranked = sorted(exact)
+        for group in (prefix, infix):
+            room = limit - len(ranked)
+            if room <= 0:
+                break
+            if len(group) > room:
+                ranked.extend(heapq.nsmallest(room, group, key=str.lower))
+            else:
+                ranked.extend(sorted(group, key=str.lower))
+        return ranked[:limit]
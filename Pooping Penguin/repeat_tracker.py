@@ -0,0 +1,126 @@
+"""
+Engine behind the "N different users said the same thing in a row"
+repeat echo in messages_cog.py.
+
+Each channel gets a ChannelHistory: a ring buffer of the last N (content
+hash, author id) pairs plus running counters, so every message is O(1)
+and no message text is kept. RepeatTracker holds them in LRU order,
+dropping channels idle past CHANNEL_IDLE_SECONDS or beyond
+MAX_TRACKED_CHANNELS. N is REPEAT_THRESHOLD unless !setrepeat overrides
+it per server or channel (get_repeat_threshold()).
+"""
+import time
+from collections import OrderedDict
+
+# How many identical consecutive messages (from different authors) in a
+# channel triggers the bot to repeat it back, unless !setrepeat says
+# otherwise for that server/channel.
+REPEAT_THRESHOLD = 3
+# Bounds for !setrepeat. 1 would echo every single message.
+MIN_REPEAT_THRESHOLD = 2
+MAX_REPEAT_THRESHOLD = 10
+
+# Channels not seen for this long are forgotten.
+CHANNEL_IDLE_SECONDS = 60 * 60
+# Hard cap on how many channels are tracked at once.
+MAX_TRACKED_CHANNELS = 10_000
+
+
+def get_repeat_threshold(settings: dict, guild_id, channel_id) -> int:
+    """The repeat threshold for a channel: its own override if it has
+    one, else its server's, else REPEAT_THRESHOLD."""
+    overrides = settings.get("repeat_threshold", {})
+    value = overrides.get(str(channel_id))
+    if value is None:
+        value = overrides.get(str(guild_id), REPEAT_THRESHOLD)
+    return value
+
+
+class ChannelHistory:
+    """Ring buffer of the last `size` (content hash, author id) pairs in
+    one channel, plus the running counters described in the module
+    docstring."""
+
+    __slots__ = ("size", "hashes", "authors", "pos", "count", "run", "author_counts", "last_seen")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.hashes = [None] * size
+        self.authors = [None] * size
+        self.pos = 0  # slot the next message goes into
+        self.count = 0  # how many slots are filled
+        self.run = 0
+        self.author_counts = {}
+        self.last_seen = 0.0
+
+    def push(self, content_hash: int, author_id: int) -> bool:
+        """Record one message; True if the last `size` messages are now
+        all the same content from `size` different authors."""
+        pos = self.pos
+        if self.count == self.size:
+            oldest = self.authors[pos]
+            remaining = self.author_counts[oldest] - 1
+            if remaining:
+                self.author_counts[oldest] = remaining
+            else:
+                del self.author_counts[oldest]
+        else:
+            self.count += 1
+
+        newest = self.hashes[pos - 1] if self.count > 1 else None
+        self.run = self.run + 1 if content_hash == newest else 1
+
+        self.hashes[pos] = content_hash
+        self.authors[pos] = author_id
+        self.author_counts[author_id] = self.author_counts.get(author_id, 0) + 1
+        self.pos = (pos + 1) % self.size
+
+        return self.run >= self.size and len(self.author_counts) == self.size
+
+    def clear(self):
+        self.hashes = [None] * self.size
+        self.authors = [None] * self.size
+        self.pos = self.count = self.run = 0
+        self.author_counts = {}
+
+
+class RepeatTracker:
+    def __init__(self, idle_seconds: float = CHANNEL_IDLE_SECONDS, max_channels: int = MAX_TRACKED_CHANNELS):
+        self.idle_seconds = idle_seconds
+        self.max_channels = max_channels
+        # channel_id -> ChannelHistory, least recently active first
+        self._channels = OrderedDict()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def observe(self, channel_id: int, content: str, author_id: int, threshold: int = REPEAT_THRESHOLD) -> bool:
+        """Record a (non-empty, stripped) message; True if it completes a
+        repeat streak and should be echoed back."""
+        now = time.monotonic()
+        history = self._channels.get(channel_id)
+        if history is None or history.size != threshold:
+            # New channel, or its threshold changed since - a streak
+            # counted against the old threshold doesn't carry over.
+            history = ChannelHistory(threshold)
+            self._channels[channel_id] = history
+        self._channels.move_to_end(channel_id)
+        history.last_seen = now
+        self._evict(now)
+        return history.push(hash(content.lower()), author_id)
+
+    def reset(self, channel_id: int):
+        """Start counting from scratch in this channel (after an echo)."""
+        history = self._channels.get(channel_id)
+        if history is not None:
+            history.clear()
+
+    def _evict(self, now: float):
+        channels = self._channels
+        while len(channels) > self.max_channels:
+            channels.popitem(last=False)
+        while channels:
+            oldest = next(iter(channels.values()))
+            if now - oldest.last_seen <= self.idle_seconds:
+                break
+            channels.popitem(last=False)
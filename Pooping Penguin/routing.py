@@ -0,0 +1,96 @@
+"""
+Per-channel routing table for messages_cog.py's on_message pipeline.
+
+A Route says which stages can fire in one (guild, channel) - AUTOREACT,
+KEYWORDS, ECHO - along with the channel's autoreact rule and repeat
+threshold, so channels with nothing configured skip straight past them.
+Keyword responses and the echo can be switched off per server or channel
+with !feature (settings["features"]; a channel's own setting wins, see
+feature_enabled()). Routes are built on first use and dropped on a
+"routing_update" event, or all at once when settings are reloaded from
+storage.
+"""
+from config import SETTINGS_FILE, load_settings, reloads
+from repeat_tracker import get_repeat_threshold
+
+AUTOREACT = 1
+KEYWORDS = 2
+ECHO = 4
+
+# Features !feature can switch off, and the on_message flag for each.
+FEATURE_FLAGS = {"keywords": KEYWORDS, "echo": ECHO}
+
+# Past this many cached routes the table just starts over - rebuilding
+# one is cheap, it only matters that it isn't done on every message.
+MAX_CACHED_ROUTES = 50_000
+
+
+def feature_enabled(settings: dict, feature: str, guild_id, channel_id) -> bool:
+    """Whether `feature` ("keywords"/"echo") is on for this channel: its
+    own setting if it has one, else its server's, else on."""
+    features = settings.get("features", {})
+    for key in (str(channel_id), str(guild_id)):
+        value = features.get(key, {}).get(feature)
+        if value is not None:
+            return value
+    return True
+
+
+class Route:
+    __slots__ = ("flags", "autoreact", "repeat_threshold")
+
+    def __init__(self, flags: int, autoreact, repeat_threshold: int):
+        self.flags = flags
+        self.autoreact = autoreact
+        self.repeat_threshold = repeat_threshold
+
+
+def build_route(settings: dict, guild_id, channel_id) -> Route:
+    flags = 0
+    autoreact = settings.get("autoreact", {}).get(str(channel_id))
+    if autoreact is not None:
+        flags |= AUTOREACT
+    for feature, flag in FEATURE_FLAGS.items():
+        if feature_enabled(settings, feature, guild_id, channel_id):
+            flags |= flag
+    return Route(flags, autoreact, get_repeat_threshold(settings, guild_id, channel_id))
+
+
+class RoutingTable:
+    def __init__(self):
+        # (guild_id, channel_id) -> Route
+        self._routes = {}
+        # guild_id -> channel ids with a cached route, for invalidate()
+        self._by_guild = {}
+        self._reloads = reloads(SETTINGS_FILE)
+
+    def get(self, guild_id, channel_id) -> Route:
+        current = reloads(SETTINGS_FILE)
+        if current != self._reloads:
+            self.clear()
+            self._reloads = current
+
+        route = self._routes.get((guild_id, channel_id))
+        if route is None:
+            if len(self._routes) >= MAX_CACHED_ROUTES:
+                self.clear()
+            route = build_route(load_settings(), guild_id, channel_id)
+            self._routes[(guild_id, channel_id)] = route
+            self._by_guild.setdefault(guild_id, set()).add(channel_id)
+        return route
+
+    def invalidate(self, guild_id, channel_id=None):
+        """Forget the route for one channel, or for every channel of a
+        guild if channel_id is None."""
+        if channel_id is not None:
+            self._routes.pop((guild_id, channel_id), None)
+            channels = self._by_guild.get(guild_id)
+            if channels:
+                channels.discard(channel_id)
+            return
+        for cid in self._by_guild.pop(guild_id, ()):
+            self._routes.pop((guild_id, cid), None)
+
+    def clear(self):
+        self._routes.clear()
+        self._by_guild.clear()
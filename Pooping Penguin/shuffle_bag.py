@@ -0,0 +1,201 @@
+"""
+Picks which template/response to use next for anything that rotates
+through a pool: copypasta types (per server) and keyword-set responses.
+
+ShuffleBagSampler keeps one sampler per key (e.g.
+"copypasta:<guild_id>:<type_id>"), in one of two modes picked with the
+ROTATION_WINDOW environment variable:
+
+  ROTATION_WINDOW=0 (default) - shuffle bag: every item in the pool is
+      used once, in random order, before any item repeats.
+  ROTATION_WINDOW=N           - no-repeat window: each pick is random,
+      but never one of the last N picks (N is capped at pool size - 1).
+
+Each sampler's state is saved to data/rotation.json after every pick,
+so a rotation carries on across restarts.
+"""
+import os
+import random
+from collections import OrderedDict, deque
+
+from config import load_rotation, save_rotation
+
+ROTATION_WINDOW = int(os.environ.get("ROTATION_WINDOW", 0))
+
+# Samplers kept in memory at once (least recently used dropped first -
+# they're rebuilt from data/rotation.json if needed again).
+MAX_ACTIVE_BAGS = 2_000
+# Snapshots kept in data/rotation.json.
+MAX_PERSISTED_BAGS = 20_000
+
+# No-repeat window: rerolls before falling back to scanning the pool.
+_MAX_REROLLS = 32
+
+
+class ShuffleBag:
+    """Every index in range(size) once per round, in random order.
+
+    The shuffled order is never built: each pick does one Fisher-Yates
+    step from a seeded random.Random, keeping only the positions swapped
+    so far. A snapshot is just the seed and how far the round got, and
+    restoring one replays that many steps."""
+
+    __slots__ = ("size", "seed", "pos", "avoid", "last", "_rng", "_swaps")
+
+    def __init__(self, size: int, seed=None, pos: int = 0, avoid=None, last=None):
+        self.size = size
+        self.last = None
+        self._start(seed, avoid)
+        for _ in range(min(pos, size)):
+            self._draw()
+        # A mark() made after the last draw wins over what replaying the
+        # draws left here.
+        if last is not None and 0 <= last < size:
+            self.last = last
+
+    def _start(self, seed=None, avoid=None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.pos = 0
+        # The index the previous round ended on - a new round never
+        # starts with it.
+        self.avoid = avoid
+        self._rng = random.Random(self.seed)
+        # position -> index, for positions a draw has swapped into
+        self._swaps = {}
+
+    def _draw(self) -> int:
+        pos, swaps, rng = self.pos, self._swaps, self._rng
+        j = rng.randrange(pos, self.size)
+        if pos == 0 and self.avoid is not None and self.size > 1:
+            while swaps.get(j, j) == self.avoid:
+                j = rng.randrange(pos, self.size)
+        value = swaps.get(j, j)
+        swaps[j] = swaps.pop(pos, pos)
+        self.pos = pos + 1
+        self.last = value
+        return value
+
+    def pick(self) -> int:
+        if self.pos >= self.size:
+            self._start(avoid=self.last)
+        return self._draw()
+
+    def mark(self, index: int):
+        """An index was used outside the bag (picked by hand) - at least
+        don't open the next round with it."""
+        self.last = index
+
+    def snapshot(self) -> dict:
+        return {"seed": self.seed, "pos": self.pos, "size": self.size, "avoid": self.avoid, "last": self.last}
+
+    @classmethod
+    def restore(cls, snapshot, size: int):
+        if snapshot and "seed" in snapshot and snapshot.get("size") == size:
+            return cls(size, snapshot["seed"], snapshot.get("pos", 0), snapshot.get("avoid"), snapshot.get("last"))
+        return cls(size)
+
+
+class RepeatWindow:
+    """Random index in range(size), never one of the last `window`."""
+
+    __slots__ = ("size", "recent", "_counts")
+
+    def __init__(self, size: int, window: int, recent=()):
+        self.size = size
+        self.recent = deque(maxlen=max(0, min(window, size - 1)))
+        self._counts = {}
+        for index in recent:
+            if 0 <= index < size:
+                self._push(index)
+
+    def _push(self, index: int):
+        recent, counts = self.recent, self._counts
+        if recent.maxlen == 0:
+            return
+        if len(recent) == recent.maxlen:
+            oldest = recent[0]
+            if counts[oldest] == 1:
+                del counts[oldest]
+            else:
+                counts[oldest] -= 1
+        recent.append(index)
+        counts[index] = counts.get(index, 0) + 1
+
+    def pick(self) -> int:
+        counts = self._counts
+        for _ in range(_MAX_REROLLS):
+            index = random.randrange(self.size)
+            if index not in counts:
+                break
+        else:
+            index = random.choice([i for i in range(self.size) if i not in counts])
+        self._push(index)
+        return index
+
+    def mark(self, index: int):
+        self._push(index)
+
+    def snapshot(self) -> dict:
+        return {"size": self.size, "recent": list(self.recent)}
+
+    @classmethod
+    def restore(cls, snapshot, size: int, window: int):
+        if snapshot and "recent" in snapshot and snapshot.get("size") == size:
+            return cls(size, window, snapshot["recent"])
+        return cls(size, window)
+
+
+class ShuffleBagSampler:
+    def __init__(self, window: int = ROTATION_WINDOW, max_bags: int = MAX_ACTIVE_BAGS):
+        self.window = window
+        self.max_bags = max_bags
+        # key -> ShuffleBag/RepeatWindow, least recently used first
+        self._bags = OrderedDict()
+
+    def __len__(self):
+        return len(self._bags)
+
+    def _restore(self, snapshot, size: int):
+        if self.window > 0:
+            return RepeatWindow.restore(snapshot, size, self.window)
+        return ShuffleBag.restore(snapshot, size)
+
+    def _get(self, key: str, size: int):
+        bag = self._bags.get(key)
+        if bag is None:
+            bag = self._restore(load_rotation().get("bags", {}).get(key), size)
+            self._bags[key] = bag
+        elif bag.size != size:
+            bag = self._bags[key] = self._restore(None, size)
+        self._bags.move_to_end(key)
+        while len(self._bags) > self.max_bags:
+            self._bags.popitem(last=False)
+        return bag
+
+    def _persist(self, key: str, bag):
+        rotation = load_rotation()
+        bags = rotation.setdefault("bags", {})
+        bags.pop(key, None)  # re-insert at the end: dict order is age order
+        bags[key] = bag.snapshot()
+        while len(bags) > MAX_PERSISTED_BAGS:
+            del bags[next(iter(bags))]
+        save_rotation(rotation)
+
+    def pick(self, key: str, size: int) -> int:
+        """Next index in range(size) for `key`'s pool (size must be > 0)."""
+        if size <= 1:
+            return 0
+        bag = self._get(key, size)
+        index = bag.pick()
+        self._persist(key, bag)
+        return index
+
+    def mark(self, key: str, index: int, size: int):
+        """Record that `index` was used without going through pick()
+        (e.g. a template chosen by hand), so rotation accounts for it
+        where it can."""
+        if size <= 1:
+            return
+        bag = self._get(key, size)
+        bag.mark(index)
+        self._persist(key, bag)
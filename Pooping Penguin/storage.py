@@ -0,0 +1,268 @@
+"""
+Storage backends behind config.py's load_*/save_* helpers.
+
+A backend answers signature(path) (changes whenever the stored document
+does, None if there isn't one), read(path) (setting read_size to the
+bytes it read) and write(path, data), split into prepare() (snapshot,
+on the event loop) and commit() (the I/O, on config.py's thread).
+JsonBackend keeps one file per document under data/; SqliteBackend
+keeps every document in one database, one row per ROW_LAYOUT node, so a
+save only touches the rows that changed. Pick one with STORAGE_BACKEND
+("json" or "sqlite"), and move data between them with
+`python storage.py import` / `export`.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+# document name (file name without extension) -> paths whose children
+# are stored as individual rows ("*" matches any key), see SqliteBackend.
+# Documents without
+# an entry get DEFAULT_ROW_LAYOUT (one row per top-level key).
+ROW_LAYOUT = {
+    "vote_settings": [("language",), ("autoreact",), ("repeat_threshold",), ("features",)],
+    "votes": [("sessions",), ("sessions", "*", "voters")],
+    "keyword_sets": [("sets",), ("sets", "*", "keywords"), ("sets", "*", "responses")],
+    "copypasta_sets": [("types",), ("types", "*", "templates")],
+    "rotation": [("bags",)],
+}
+DEFAULT_ROW_LAYOUT = [()]
+
+
+class StorageError(Exception):
+    """Raised for an unknown backend name or an unusable database."""
+
+
+def _document_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class JsonBackend:
+    name = "json"
+    read_size = 0
+
+    def signature(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def read(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.read_size = len(raw)
+        return json.loads(raw.decode("utf-8"))
+
+    def prepare(self, path, data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def write(self, path, data):
+        return self.commit(path, self.prepare(path, data))
+
+    def commit(self, path, payload):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return len(payload)
+
+    def close(self):
+        pass
+
+
+def _is_opened(path, layout):
+    """True if the node at `path` is stored as an empty shell plus one
+    row per child (it's one of the layout paths, or on the way to one)."""
+    for pattern in layout:
+        if len(pattern) < len(path):
+            continue
+        if all(p == "*" or p == k for p, k in zip(pattern, path)):
+            return True
+    return False
+
+
+def _flatten(node, layout, path=(), rows=None):
+    if rows is None:
+        rows = {}
+    key = json.dumps(path, ensure_ascii=False)
+    if isinstance(node, (dict, list)) and _is_opened(path, layout):
+        if isinstance(node, dict):
+            rows[key] = "{}"
+            children = node.items()
+        else:
+            rows[key] = "[]"
+            children = enumerate(node)
+        for child_key, child in children:
+            _flatten(child, layout, path + (child_key,), rows)
+    else:
+        rows[key] = json.dumps(node, ensure_ascii=False)
+    return rows
+
+
+def _assemble(rows):
+    decoded = sorted(
+        ((tuple(json.loads(key)), json.loads(value)) for key, value in rows.items()),
+        key=lambda item: (len(item[0]), item[0]))
+    if not decoded or decoded[0][0] != ():
+        return None
+    nodes = {(): decoded[0][1]}
+    for path, value in decoded[1:]:
+        parent = nodes.get(path[:-1])
+        if isinstance(parent, dict):
+            parent[path[-1]] = value
+        elif isinstance(parent, list):
+            parent.append(value)
+        else:
+            continue  # orphaned row - its parent was replaced inline
+        nodes[path] = value
+    return nodes[()]
+
+
+class SqliteBackend:
+    """Every document in one sqlite3 database (WAL mode). A row's key is
+    its JSON-encoded path in the document and its value the node's JSON,
+    or an empty {} / [] for a node opened by ROW_LAYOUT, whose children
+    are rows of their own. write() diffs against the rows last read or
+    written, so only the rows that changed are touched."""
+
+    name = "sqlite"
+    read_size = 0
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            name    TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rows (
+            document TEXT NOT NULL,
+            path     TEXT NOT NULL,
+            value    TEXT NOT NULL,
+            PRIMARY KEY (document, path)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Writes may come from a different thread than reads (config.py's
+        # flusher), so one connection is shared behind a lock instead of
+        # sqlite3's default one-connection-per-thread rule.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # document name -> {path: value} as last read/written, the
+        # baseline write() diffs against
+        self._rows = {}
+
+    def signature(self, path):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM documents WHERE name = ?", (_document_name(path),)).fetchone()
+        return row[0] if row else None
+
+    def read(self, path):
+        name = _document_name(path)
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT path, value FROM rows WHERE document = ?", (name,)))
+            self._rows[name] = rows
+        self.read_size = sum(len(key) + len(value) for key, value in rows.items())
+        return _assemble(rows) if rows else None
+
+    def prepare(self, path, data):
+        return _flatten(data, ROW_LAYOUT.get(_document_name(path), DEFAULT_ROW_LAYOUT))
+
+    def write(self, path, data):
+        return self.commit(path, self.prepare(path, data))
+
+    def commit(self, path, new_rows):
+        name = _document_name(path)
+        with self._lock:
+            old_rows = self._rows.get(name)
+            if old_rows is None:
+                old_rows = dict(self._conn.execute(
+                    "SELECT path, value FROM rows WHERE document = ?", (name,)))
+            changed = [(name, key, value) for key, value in new_rows.items() if old_rows.get(key) != value]
+            removed = [(name, key) for key in old_rows if key not in new_rows]
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                if removed:
+                    self._conn.executemany("DELETE FROM rows WHERE document = ? AND path = ?", removed)
+                if changed:
+                    self._conn.executemany(
+                        "INSERT INTO rows (document, path, value) VALUES (?, ?, ?) "
+                        "ON CONFLICT (document, path) DO UPDATE SET value = excluded.value", changed)
+                self._conn.execute(
+                    "INSERT INTO documents (name, version) VALUES (?, 1) "
+                    "ON CONFLICT (name) DO UPDATE SET version = version + 1", (name,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # Not if BEGIN itself failed (e.g. "database is locked"):
+                # ROLLBACK would raise over the real error.
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                self._rows.pop(name, None)
+                raise
+            self._rows[name] = new_rows
+        return sum(len(key) + len(value) for _, key, value in changed)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_backend(kind, db_path):
+    """Build the backend named by STORAGE_BACKEND ("json" or "sqlite")."""
+    kind = (kind or "json").lower()
+    if kind == "json":
+        return JsonBackend()
+    if kind == "sqlite":
+        return SqliteBackend(db_path)
+    raise StorageError(f"Unknown STORAGE_BACKEND '{kind}' (expected 'json' or 'sqlite').")
+
+
+def _copy_documents(source, target, paths):
+    for path in paths:
+        data = source.read(path)
+        if data is None:
+            print(f"skipped {os.path.basename(path)} (nothing stored yet)")
+            continue
+        target.write(path, data)
+        print(f"copied {os.path.basename(path)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import config
+
+    parser = argparse.ArgumentParser(description="Copy bot data between the JSON files and the SQLite database.")
+    parser.add_argument("direction", choices=("import", "export"),
+                        help="import: data/*.json -> SQLite, export: SQLite -> data/*.json")
+    args = parser.parse_args()
+
+    json_backend = JsonBackend()
+    sqlite_backend = SqliteBackend(config.DATABASE_FILE)
+    if args.direction == "import":
+        _copy_documents(json_backend, sqlite_backend, config.DOCUMENT_FILES)
+    else:
+        _copy_documents(sqlite_backend, json_backend, config.DOCUMENT_FILES)
+    sqlite_backend.close()
@@ -0,0 +1,110 @@
+"""
+Full-text search behind the Search button of the !keyword list and
+!copypasta list menus.
+
+TextIndex is an inverted index of casefolded 1- and 2-character grams
+over every set/type id, keyword, response and template, so Chinese text
+(no spaces between words) searches as well as English. A query
+intersects its grams' postings, confirms the substring on what's left,
+and ranks records by FIELD_WEIGHTS. The managers update it as they
+write; it's rebuilt only after a reload from storage.
+"""
+from collections import defaultdict
+
+# Score for each matching entry, by field.
+FIELD_WEIGHTS = {"id": 40, "keyword": 20, "response": 4, "template": 4}
+# Added when the query is the whole entry, or the start of it, for
+# these fields - "cry" should put a set called "cry" first.
+EXACT_BONUS = {"id": 100, "keyword": 30}
+PREFIX_BONUS = {"id": 30, "keyword": 10}
+
+
+def _normalize(text: str) -> str:
+    return text.casefold()
+
+
+def _grams(text: str) -> set:
+    """Every distinct 1- and 2-character gram of `text`."""
+    grams = set(text)
+    grams.update(map(str.__add__, text, text[1:]))
+    return grams
+
+
+class TextIndex:
+    def __init__(self):
+        # entry id -> (record, field, normalized text, original text)
+        self._entries = {}
+        # gram -> {entry id, ...}
+        self._postings = defaultdict(set)
+        # (record, field, original text) -> [entry id, ...] - a list,
+        # since the same response can be in a set twice
+        self._by_text = defaultdict(list)
+        # record -> {entry id, ...}
+        self._by_record = defaultdict(set)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, record, field: str, text: str):
+        entry_id = self._next_id
+        self._next_id += 1
+        normalized = _normalize(text)
+        self._entries[entry_id] = (record, field, normalized, text)
+        self._by_text[(record, field, text)].append(entry_id)
+        self._by_record[record].add(entry_id)
+        for gram in _grams(normalized):
+            self._postings[gram].add(entry_id)
+
+    def _drop(self, entry_id):
+        record, field, normalized, text = self._entries.pop(entry_id)
+        for gram in _grams(normalized):
+            posting = self._postings[gram]
+            posting.discard(entry_id)
+            if not posting:
+                del self._postings[gram]
+        key = (record, field, text)
+        self._by_text[key].remove(entry_id)
+        if not self._by_text[key]:
+            del self._by_text[key]
+        self._by_record[record].discard(entry_id)
+        if not self._by_record[record]:
+            del self._by_record[record]
+
+    def discard(self, record, field: str, text: str):
+        """Remove one entry added with exactly these arguments, if any."""
+        ids = self._by_text.get((record, field, text))
+        if ids:
+            self._drop(ids[-1])
+
+    def remove_record(self, record):
+        """Remove every entry belonging to `record`."""
+        for entry_id in list(self._by_record.get(record, ())):
+            self._drop(entry_id)
+
+    def search(self, query: str, limit: int = None) -> list:
+        """Records with an entry containing `query` (case-insensitive),
+        best match first - see the module docstring for the scoring."""
+        query = _normalize(query or "")
+        if not query:
+            return []
+        # Bigrams are far more selective than single characters, so a
+        # longer query only looks at those.
+        grams = set(query) if len(query) == 1 else set(map(str.__add__, query, query[1:]))
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+        scores = defaultdict(int)
+        for entry_id in candidates:
+            record, field, text, _ = self._entries[entry_id]
+            if query not in text:
+                continue
+            score = FIELD_WEIGHTS.get(field, 1)
+            if text == query:
+                score += EXACT_BONUS.get(field, 0)
+            elif text.startswith(query):
+                score += PREFIX_BONUS.get(field, 0)
+            scores[record] += score
+
+        ranked = sorted(scores, key=lambda record: (-scores[record], record))
+        return ranked if limit is None else ranked[:limit]
@@ -0,0 +1,190 @@
+"""
+Engine behind !vto's vote sessions: keeps every open session in memory,
+owns their deadlines and closes them when time runs out, without a
+sleeping task per vote.
+
+Each open session is a VoteSession keyed by the vote message's id, with
+a set of voters and a lock vote_cog.py holds while counting a vote.
+Deadlines sit in a heap served by one scheduler task; an expired
+session is handed to the registry's `on_expire` coroutine. Sessions
+(with their deadline and guild id) are saved to votes.json through
+config.py, and recover() closes or re-arms them after a restart.
+"""
+import asyncio
+import heapq
+import time
+
+from config import load_votes, save_votes
+
+
+class VoteSession:
+    __slots__ = ("message_id", "target", "required_votes", "admin_only", "duration",
+                 "voters", "channel_id", "guild_id", "deadline", "lock", "closed")
+
+    def __init__(self, message_id: int, target: int, required_votes: int, admin_only: bool,
+                 duration: float, channel_id: int, guild_id=None, deadline=None, voters=()):
+        self.message_id = message_id
+        self.target = target
+        self.required_votes = required_votes
+        self.admin_only = admin_only
+        self.duration = duration  # timeout length, seconds
+        self.voters = set(voters)
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.deadline = deadline
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            message_id=int(data["message_id"]),
+            target=int(data["target"]),
+            required_votes=data["required_votes"],
+            admin_only=data["admin_only"],
+            duration=data["duration"],
+            channel_id=int(data["channel_id"]),
+            guild_id=data.get("guild_id"),
+            deadline=data.get("deadline"),
+            voters=data.get("voters", ()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "message_id": self.message_id,
+            "target": self.target,
+            "required_votes": self.required_votes,
+            "admin_only": self.admin_only,
+            "duration": self.duration,
+            "voters": sorted(self.voters),
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "deadline": self.deadline,
+        }
+
+
+class VoteRegistry:
+    def __init__(self, on_expire):
+        # async def on_expire(session: VoteSession) - called once per
+        # session that runs out of time
+        self.on_expire = on_expire
+        # message id -> VoteSession, for every open vote
+        self._sessions = {}
+        for data in load_votes()["sessions"].values():
+            try:
+                session = VoteSession.from_dict(data)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[vote_registry.py] skipping unreadable vote session {data!r}: {e!r}")
+                continue
+            self._sessions[session.message_id] = session
+        # (deadline, message id) for every armed session, earliest first.
+        # May hold stale entries for sessions that already ended.
+        self._heap = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        # on_expire() tasks still running, so they aren't garbage-collected
+        self._closing = set()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    # -- lifecycle -----------------------------------------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def recover(self) -> int:
+        """Close every session that's already overdue and arm the rest;
+        returns how many were re-armed."""
+        now = time.time()
+        overdue = []
+        armed = 0
+        for session in self._sessions.values():
+            if session.deadline is None or session.deadline <= now:
+                overdue.append(session)
+            else:
+                self._arm(session.deadline, session.message_id)
+                armed += 1
+        for session in overdue:
+            self._expire(session)
+        return armed
+
+    # -- sessions --------------------------------------------------------
+    def get(self, message_id: int):
+        """The open session for a vote message, or None."""
+        return self._sessions.get(message_id)
+
+    def open(self, session: VoteSession):
+        """Store a new session (which must have a deadline) and arm its
+        timer."""
+        self._sessions[session.message_id] = session
+        votes = load_votes()
+        votes["sessions"][str(session.message_id)] = session.to_dict()
+        save_votes(votes)
+        self._arm(session.deadline, session.message_id)
+
+    def add_voter(self, session: VoteSession, user_id: int) -> bool:
+        """Count user_id's vote; False if they'd already voted."""
+        if user_id in session.voters:
+            return False
+        session.voters.add(user_id)
+        votes = load_votes()
+        stored = votes["sessions"].get(str(session.message_id))
+        if stored is not None:
+            stored.setdefault("voters", []).append(user_id)
+            save_votes(votes)
+        return True
+
+    def remove(self, session: VoteSession):
+        """End a session early (e.g. it passed). Its timer is left to
+        lapse on its own."""
+        session.closed = True
+        if self._sessions.get(session.message_id) is session:
+            del self._sessions[session.message_id]
+        votes = load_votes()
+        if votes["sessions"].pop(str(session.message_id), None) is not None:
+            save_votes(votes)
+
+    # -- scheduler -----------------------------------------------------
+    def _arm(self, deadline: float, message_id: int):
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (deadline, message_id))
+        if earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    def _expire(self, session: VoteSession):
+        self.remove(session)
+        task = asyncio.get_running_loop().create_task(self.on_expire(session))
+        self._closing.add(task)
+        task.add_done_callback(self._expired)
+
+    def _expired(self, task):
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[vote_registry.py] closing a vote session failed: {task.exception()!r}")
+
+    async def _run(self):
+        heap = self._heap
+        while True:
+            self._wakeup.clear()
+            if not heap:
+                await self._wakeup.wait()
+                continue
+            delay = heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            deadline, message_id = heapq.heappop(heap)
+            session = self._sessions.get(message_id)
+            # Skip entries for sessions that already ended (or were
+            # replaced by a newer session on the same message).
+            if session is not None and session.deadline == deadline:
+                self._expire(session)